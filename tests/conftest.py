@@ -0,0 +1,20 @@
+import pytest
+from rdflib.namespace import SH
+
+
+def _summary(results_graph):
+    return sorted(
+        (
+            str(results_graph.value(r, SH.focusNode)),
+            str(results_graph.value(r, SH.sourceConstraintComponent)),
+            str(results_graph.value(r, SH.resultSeverity)),
+            str(results_graph.value(r, SH.value)),
+        )
+        for r in results_graph.objects(None, SH.result)
+    )
+
+
+@pytest.fixture()
+def summary():
+    """Sorts a results graph's results into comparable tuples"""
+    return _summary
@@ -0,0 +1,119 @@
+import pickle
+import sys
+from pathlib import Path
+
+import pytest
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.namespace import RDF, SKOS
+
+sys.path.append(str(Path(__file__).parent.parent.absolute()))
+from vocexcel import convert, validation
+from vocexcel.cache import ValidationCache, graph_fingerprint
+from vocexcel.report import ValidationReport
+from vocexcel.validation import ValidationFailed, validate_with_profile
+
+tests_dir_path = Path(__file__).parent
+
+
+def relabelled(g: Graph) -> Graph:
+    """A copy of g with new blank node ids, its triples added in reverse order"""
+    bnodes = {}
+
+    def term(t):
+        if isinstance(t, BNode):
+            return bnodes.setdefault(t, BNode())
+        return t
+
+    copy = Graph()
+    for s, p, o in reversed(sorted(g)):
+        copy.add((term(s), p, term(o)))
+    return copy
+
+
+@pytest.mark.parametrize("file_name", ["eg-invalid.ttl", "043_exhaustive.ttl"])
+def test_fingerprint(file_name):
+    g = Graph().parse(tests_dir_path / file_name)
+
+    assert graph_fingerprint(relabelled(g)) == graph_fingerprint(g)
+    changed = relabelled(g)
+    changed.add((URIRef("http://example.com/x"), RDF.type, SKOS.Concept))
+    assert graph_fingerprint(changed) != graph_fingerprint(g)
+
+
+def test_fingerprint_shared_blank_nodes():
+    x = URIRef("http://example.com/x")
+    b = BNode()
+    g = Graph()
+    g.add((x, SKOS.related, b))
+    g.add((x, SKOS.broader, b))
+    g.add((b, SKOS.prefLabel, Literal("b")))
+    # the same, except for two blank nodes rather than one
+    other = Graph()
+    other.add((x, SKOS.related, BNode("a")))
+    other.add((x, SKOS.broader, BNode("b")))
+    other.add((BNode("a"), SKOS.prefLabel, Literal("b")))
+    other.add((BNode("b"), SKOS.prefLabel, Literal("b")))
+
+    assert graph_fingerprint(relabelled(g)) == graph_fingerprint(g)
+    assert graph_fingerprint(other) != graph_fingerprint(g)
+
+
+def test_validate_with_profile(monkeypatch):
+    validated = []
+    _validate = validation._validate
+
+    def counting_validate(*args):
+        validated.append(args)
+        return _validate(*args)
+
+    monkeypatch.setattr(validation, "_validate", counting_validate)
+    cache = ValidationCache()
+    g = Graph().parse(tests_dir_path / "eg-invalid.ttl")
+    for _ in range(2):
+        with pytest.raises(ValidationFailed) as e:
+            validate_with_profile(g, cache=cache)
+    assert len(validated) == 1
+
+    with pytest.raises(ValidationFailed):
+        validate_with_profile(relabelled(g), cache=cache)
+    assert len(validated) == 1
+
+    # warnings allowed
+    with pytest.raises(ValidationFailed):
+        validate_with_profile(g, error_level=3, cache=cache)
+    assert len(validated) == 2
+
+    with pytest.raises(ValidationFailed) as uncached:
+        validate_with_profile(g, cache=None)
+    assert len(validated) == 3
+    assert str(uncached.value.report) == str(e.value.report)
+
+
+def test_disk(tmp_path):
+    g = convert.excel_to_rdf(tests_dir_path / "063_simple1.xlsx", output_format="graph")
+    cache = ValidationCache(directory=tmp_path)
+    with pytest.raises(ValidationFailed) as e:
+        validate_with_profile(g, cache=cache)
+    assert len(list(tmp_path.glob("*.report"))) == 1
+
+    key = cache.key(g, "vocpub-46", 1, "native")
+    report = ValidationCache(directory=tmp_path).get(key)
+    assert report is not None
+    assert report.to_dict() == e.value.report.to_dict()
+    assert ValidationCache().get(key) is None
+
+    # files that aren't JSON reports, such as pickles, are ignored
+    path = next(tmp_path.glob("*.report"))
+    path.write_bytes(pickle.dumps({"version": 1}))
+    assert ValidationCache(directory=tmp_path).get(key) is None
+
+
+def test_eviction(tmp_path):
+    report = ValidationReport(True, [], "vocpub-46")
+    cache = ValidationCache(maxsize=2, directory=tmp_path, max_bytes=0)
+    for i in range(3):
+        cache.put((str(i), "vocpub-46", "", 1, "native"), report)
+
+    assert len(cache) == 2
+    assert ("0", "vocpub-46", "", 1, "native") not in cache
+    assert list(tmp_path.glob("*.report")) == []
@@ -0,0 +1,67 @@
+import sys
+from pathlib import Path
+
+import openpyxl
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent.absolute()))
+from vocexcel import convert
+from vocexcel.checks import CellProblems
+
+tests_dir_path = Path(__file__).parent
+
+
+def broken_workbook(tmp_path, cells):
+    """A copy of 070_simple1.xlsx with cells, keyed by sheet then coordinate, set to new values"""
+    wb = openpyxl.load_workbook(tests_dir_path / "070_simple1.xlsx")
+    for sheet, values in cells.items():
+        for coordinate, value in values.items():
+            wb[sheet][coordinate] = value
+    path = tmp_path / "broken.xlsx"
+    wb.save(path)
+    return path
+
+
+def test_problems_are_collected(tmp_path):
+    path = broken_workbook(
+        tmp_path,
+        {
+            "Concept Scheme": {"B4": None, "B13": "Unknown"},
+            "Concepts": {"B6": None, "C4": None, "A4": "not an IRI"},
+        },
+    )
+    with pytest.raises(CellProblems) as e:
+        convert.excel_to_rdf(path, output_format="graph")
+
+    assert e.value.complete
+    assert [(p.sheet, p.cell) for p in e.value.problems] == [
+        ("Concept Scheme", "B4"),
+        ("Concept Scheme", "B13"),
+        ("Concepts", "A4"),
+        ("Concepts", "C4"),
+        ("Concepts", "B6"),
+    ]
+    assert str(e.value).startswith("Your vocabulary has 5 problem(s):\n")
+    assert "Concepts!B6: You must provide a Preferred Label" in str(e.value)
+
+
+def test_max_problems(tmp_path):
+    path = broken_workbook(tmp_path, {"Concepts": {"C4": None, "C5": None, "C6": None}})
+    with pytest.raises(CellProblems) as e:
+        convert.excel_to_rdf(path, output_format="graph", max_problems=2)
+
+    assert not e.value.complete
+    assert len(e.value.problems) == 2
+    assert str(e.value).startswith("Your vocabulary has at least 2 problems.")
+
+    with pytest.raises(CellProblems) as e:
+        convert.excel_to_rdf(path, output_format="graph", max_problems=None)
+    assert len(e.value.problems) == 3
+
+
+def test_language_tag(tmp_path):
+    path = broken_workbook(tmp_path, {"Concepts": {"B4": "Motorway@not a tag"}})
+    with pytest.raises(CellProblems) as e:
+        convert.excel_to_rdf(path, output_format="graph")
+
+    assert [(p.sheet, p.cell) for p in e.value.problems] == [("Concepts", "B4")]
@@ -0,0 +1,161 @@
+import bz2
+import gzip
+import lzma
+import sys
+from pathlib import Path
+
+import pytest
+from rdflib import Graph, compare
+
+sys.path.append(str(Path(__file__).parent.parent.absolute()))
+from vocexcel import convert
+from vocexcel.__main__ import main
+from vocexcel.utils import ConversionError, rdf_file_format
+from vocexcel.validation import ValidationFailed
+
+tests_dir_path = Path(__file__).parent
+FORMATS = ["longturtle", "xml", "json-ld", "nt"]
+
+
+@pytest.fixture(scope="module")
+def expected():
+    g = convert.excel_to_rdf(tests_dir_path / "070_simple1.xlsx", output_format="graph")
+    return g, {f: g.serialize(format=f) for f in FORMATS}
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_several_formats(expected, jobs):
+    g, texts = expected
+    outputs = convert.excel_to_rdf(
+        tests_dir_path / "070_simple1.xlsx",
+        output_format=FORMATS + ["graph"],
+        validate=True,
+        jobs=jobs,
+    )
+
+    assert list(outputs) == FORMATS + ["graph"]
+    assert compare.isomorphic(outputs["graph"], g)
+    assert outputs["longturtle"] == texts["longturtle"]
+    for f in ["xml", "json-ld", "nt"]:
+        assert compare.isomorphic(Graph().parse(data=outputs[f], format=f), g)
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_named_after_one_path(expected, tmp_path, jobs):
+    _, texts = expected
+    assert (
+        convert.excel_to_rdf(
+            tests_dir_path / "070_simple1.xlsx",
+            output_format=FORMATS,
+            output_file_path=tmp_path / "vocab.ttl",
+            jobs=jobs,
+        )
+        is None
+    )
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "vocab.json-ld",
+        "vocab.nt",
+        "vocab.rdf",
+        "vocab.ttl",
+    ]
+    assert (tmp_path / "vocab.ttl").read_text(encoding="utf-8") == texts["longturtle"]
+
+
+def test_destinations(tmp_path):
+    main(
+        [
+            str(tests_dir_path / "070_simple1.xlsx"),
+            "-f",
+            "longturtle",
+            "nt",
+            "-o",
+            str(tmp_path / "a.ttl"),
+            str(tmp_path / "b.txt"),
+        ]
+    )
+
+    assert (tmp_path / "a.ttl").exists()
+    assert len(Graph().parse(tmp_path / "b.txt", format="nt")) > 0
+
+    with pytest.raises(ConversionError):
+        convert.excel_to_rdf(
+            tests_dir_path / "070_simple1.xlsx",
+            output_format=["longturtle", "turtle"],
+            output_file_path=tmp_path / "vocab.ttl",
+        )
+    with pytest.raises(ConversionError):
+        convert.excel_to_rdf(
+            tests_dir_path / "070_simple1.xlsx",
+            output_format=["longturtle", "nt"],
+            output_file_path=[tmp_path / "vocab.ttl"],
+        )
+
+
+@pytest.mark.parametrize(
+    "file_name, opener", [("vocab.ttl.gz", gzip.open), ("vocab.ttl.bz2", bz2.open)]
+)
+def test_compressed(expected, tmp_path, file_name, opener):
+    _, texts = expected
+    convert.excel_to_rdf(
+        tests_dir_path / "070_simple1.xlsx",
+        output_file_path=tmp_path / file_name,
+    )
+
+    with opener(tmp_path / file_name, "rt", encoding="utf-8") as f:
+        assert f.read() == texts["longturtle"]
+
+
+def test_compressed_formats(expected, tmp_path):
+    g, _ = expected
+    # nt is streamed straight into the compressed file
+    convert.excel_to_rdf(
+        tests_dir_path / "070_simple1.xlsx",
+        output_format="nt",
+        output_file_path=tmp_path / "streamed.nt.xz",
+    )
+    with lzma.open(tmp_path / "streamed.nt.xz") as f:
+        assert compare.isomorphic(Graph().parse(f, format="nt"), g)
+
+    main(
+        [
+            str(tests_dir_path / "070_simple1.xlsx"),
+            "-f",
+            "xml",
+            "nt",
+            "-o",
+            str(tmp_path / "vocab.ttl"),
+            "--compress",
+            "gzip",
+        ]
+    )
+    for name, rdf_format in [("vocab.rdf.gz", "xml"), ("vocab.nt.gz", "nt")]:
+        with gzip.open(tmp_path / name) as f:
+            assert compare.isomorphic(Graph().parse(f, format=rdf_format), g)
+
+
+def test_compressed_input(tmp_path):
+    compressed = tmp_path / "eg-invalid.ttl.gz"
+    with gzip.open(compressed, "wb") as f:
+        f.write((tests_dir_path / "eg-invalid.ttl").read_bytes())
+
+    assert rdf_file_format(compressed) == "ttl"
+    # the file is read and validated, and fails validation
+    with pytest.raises(ValidationFailed):
+        convert.rdf_to_excel(compressed)
+
+
+def test_compressed_input_output_path(tmp_path, monkeypatch):
+    compressed = tmp_path / "eg-valid.ttl.gz"
+    with gzip.open(compressed, "wb") as f:
+        f.write((tests_dir_path / "eg-valid.ttl").read_bytes())
+    # eg-valid.ttl predates the vocpub-46 profile, and blank_043.xlsx isn't shipped
+    monkeypatch.setattr(convert, "validate_with_profile", lambda g, **kwargs: None)
+
+    assert (
+        convert.rdf_to_excel(
+            compressed, template_file_path=tests_dir_path / "043_simple_valid.xlsx"
+        )
+        == tmp_path / "eg-valid.xlsx"
+    )
+    assert (tmp_path / "eg-valid.xlsx").exists()
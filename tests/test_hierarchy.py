@@ -0,0 +1,59 @@
+import sys
+from pathlib import Path
+
+import pytest
+from rdflib import Graph, URIRef
+from rdflib.namespace import RDF, SKOS
+
+sys.path.append(str(Path(__file__).parent.parent.absolute()))
+from vocexcel import convert
+from vocexcel.hierarchy import HierarchyIndex
+from vocexcel.utils import add_top_concepts
+
+tests_dir_path = Path(__file__).parent
+
+EX = "http://example.com/"
+
+
+def test_hierarchy_index():
+    h = HierarchyIndex()
+    for c in ["a", "b", "c"]:
+        h.add_concept(URIRef(EX + c))
+    h.add_narrower(URIRef(EX + "a"), URIRef(EX + "b"))
+    h.add_narrower(URIRef(EX + "b"), URIRef(EX + "c"))
+
+    assert len(h) == 3
+    assert h.top_concepts() == [URIRef(EX + "a")]
+    assert h.narrower(URIRef(EX + "a")) == [URIRef(EX + "b")]
+    assert h.broader(URIRef(EX + "c")) == [URIRef(EX + "b")]
+    assert h.broader(URIRef(EX + "a")) == []
+
+
+@pytest.mark.parametrize(
+    "file_name",
+    ["043_simple_valid.xlsx", "063_simple1.xlsx", "070_simple1.xlsx"],
+)
+def test_excel_to_rdf_hierarchy(file_name):
+    h = HierarchyIndex()
+    g = convert.excel_to_rdf(
+        tests_dir_path / file_name, output_format="graph", hierarchy=h
+    )
+
+    assert set(h.concepts) == set(g.subjects(RDF.type, SKOS.Concept))
+    assert set(h.top_concepts()) == set(g.objects(None, SKOS.hasTopConcept))
+    for c, n in g.subject_objects(SKOS.narrower):
+        assert n in h.narrower(c)
+        assert c in h.broader(n)
+
+
+def test_add_top_concepts():
+    g = Graph()
+    g.add((URIRef(EX), RDF.type, SKOS.ConceptScheme))
+    for c in ["a", "b"]:
+        g.add((URIRef(EX + c), RDF.type, SKOS.Concept))
+    g.add((URIRef(EX + "a"), SKOS.narrower, URIRef(EX + "b")))
+
+    add_top_concepts(g)
+
+    assert list(g.objects(URIRef(EX), SKOS.hasTopConcept)) == [URIRef(EX + "a")]
+    assert list(g.subjects(SKOS.topConceptOf, URIRef(EX))) == [URIRef(EX + "a")]
@@ -0,0 +1,115 @@
+import sys
+from pathlib import Path
+
+import pyshacl
+import pytest
+from rdflib import BNode, Literal, URIRef
+from rdflib.namespace import RDF, SKOS
+
+sys.path.append(str(Path(__file__).parent.parent.absolute()))
+from vocexcel import convert
+from vocexcel.incremental import (
+    IncrementalValidation,
+    changed_nodes,
+    validate_incremental,
+)
+from vocexcel.shapes import SHAPES
+from vocexcel.utils import ConversionError
+
+tests_dir_path = Path(__file__).parent
+
+
+@pytest.fixture
+def graphs():
+    g = convert.excel_to_rdf(tests_dir_path / "070_simple1.xlsx", output_format="graph")
+    g2 = convert.excel_to_rdf(
+        tests_dir_path / "070_simple1.xlsx", output_format="graph"
+    )
+    return g, g2
+
+
+def test_changed_nodes(graphs):
+    g, g2 = graphs
+    assert changed_nodes(g, g2) == set()
+
+    c = next(g2.subjects(RDF.type, SKOS.Concept))
+    g2.remove((c, SKOS.definition, None))
+    g2.add((URIRef("http://example.com/new"), RDF.type, SKOS.Concept))
+    assert changed_nodes(g, g2) == {c, URIRef("http://example.com/new")}
+
+
+@pytest.mark.parametrize("allow_warnings", [False, True])
+def test_validate_incremental(graphs, allow_warnings, summary):
+    g, g2 = graphs
+    _, results, _ = pyshacl.validate(
+        g, shacl_graph=SHAPES.get("vocpub-46"), allow_warnings=allow_warnings
+    )
+
+    # break one Concept, then fix another's earlier problems by removing it
+    concepts = list(g2.subjects(RDF.type, SKOS.Concept))
+    g2.remove((concepts[0], SKOS.definition, None))
+    g2.add((concepts[0], SKOS.prefLabel, Literal("another label", lang="en")))
+    g2.remove((concepts[1], None, None))
+    g2.remove((None, None, concepts[1]))
+
+    full = pyshacl.validate(
+        g2, shacl_graph=SHAPES.get("vocpub-46"), allow_warnings=allow_warnings
+    )
+    incremental = validate_incremental(g, results, g2, allow_warnings=allow_warnings)
+
+    assert incremental[0] == full[0]
+    assert summary(incremental[1]) == summary(full[1])
+    assert any(f == str(concepts[0]) for f, *_ in summary(incremental[1]))
+
+
+@pytest.mark.parametrize("edit", ["concept", "scheme"])
+def test_validate_incremental_scheme_violations(edit, summary):
+    # this vocabulary's ConceptScheme has violations, of shapes validating its agents with an sh:or
+    g = convert.excel_to_rdf(
+        tests_dir_path / "030_languages.xlsx", output_format="graph"
+    )
+    g2 = convert.excel_to_rdf(
+        tests_dir_path / "030_languages.xlsx", output_format="graph"
+    )
+    _, results, _ = pyshacl.validate(g, shacl_graph=SHAPES.get("vocpub-46"))
+    cs = next(g2.subjects(RDF.type, SKOS.ConceptScheme))
+    assert any(f == str(cs) for f, *_ in summary(results))
+
+    if edit == "concept":
+        g2.remove(
+            (sorted(g2.subjects(RDF.type, SKOS.Concept))[0], SKOS.prefLabel, None)
+        )
+    else:
+        g2.remove((cs, SKOS.definition, None))
+
+    full = pyshacl.validate(g2, shacl_graph=SHAPES.get("vocpub-46"))
+    incremental = validate_incremental(g, results, g2)
+    assert incremental[0] == full[0]
+    assert summary(incremental[1]) == summary(full[1])
+
+
+def test_validate_incremental_blank_nodes(graphs, summary):
+    g, g2 = graphs
+    _, results, _ = pyshacl.validate(g, shacl_graph=SHAPES.get("vocpub-46"))
+
+    cs = next(g2.subjects(RDF.type, SKOS.ConceptScheme))
+    g2.add((cs, URIRef("http://www.w3.org/ns/prov#qualifiedDerivation"), BNode()))
+
+    full = pyshacl.validate(g2, shacl_graph=SHAPES.get("vocpub-46"))
+    incremental = validate_incremental(g, results, g2)
+    assert summary(incremental[1]) == summary(full[1])
+
+
+def test_excel_to_rdf_incremental():
+    incremental = IncrementalValidation()
+    for _ in range(2):
+        try:
+            convert.excel_to_rdf(
+                tests_dir_path / "070_simple1.xlsx",
+                validate=True,
+                incremental=incremental,
+            )
+        except ConversionError:
+            pass
+        assert incremental.graph is not None
+        assert incremental.profile == "vocpub-46"
@@ -0,0 +1,123 @@
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from rdflib import BNode, Graph, Literal, URIRef, compare
+from rdflib.namespace import RDF, RDFS, SDO, SKOS, XSD
+
+sys.path.append(str(Path(__file__).parent.parent.absolute()))
+from vocexcel import convert
+from vocexcel.jsonld import MAX_DEPTH, write_vocab_jsonld
+
+tests_dir_path = Path(__file__).parent
+EX = "http://example.com/"
+
+
+def _parse(text: str) -> Graph:
+    return Graph().parse(data=text, format="json-ld")
+
+
+@pytest.mark.parametrize(
+    "file_name", ["070_simple1.xlsx", "060_simple.xlsx", "043_simple_valid.xlsx"]
+)
+def test_same_triples(file_name, tmp_path):
+    g = convert.excel_to_rdf(tests_dir_path / file_name, output_format="graph")
+    text = convert.excel_to_rdf(
+        tests_dir_path / file_name, output_format="vocab-json-ld"
+    )
+
+    assert compare.isomorphic(_parse(text), g)
+    convert.excel_to_rdf(
+        tests_dir_path / file_name,
+        output_format="vocab-json-ld",
+        output_file_path=tmp_path / "vocab.jsonld.gz",
+    )
+    with gzip.open(tmp_path / "vocab.jsonld.gz") as f:
+        assert compare.isomorphic(Graph().parse(f, format="json-ld"), g)
+
+
+def test_nested():
+    text = convert.excel_to_rdf(
+        tests_dir_path / "070_simple1.xlsx", output_format="vocab-json-ld"
+    )
+    document = json.loads(text)
+    g = _parse(text)
+
+    scheme = document["@graph"][0]
+    assert scheme["@id"] == "http://test.com/myVocab"
+    assert scheme["@type"] == "ConceptScheme"
+    assert isinstance(scheme["schema:creator"], dict)
+
+    def walk(node):
+        yield node
+        for child in node.get("hasTopConcept", []) + node.get("narrower", []):
+            if isinstance(child, dict):
+                yield from walk(child)
+
+    # every Concept is nested in the scheme's tree, once
+    nested = [n["@id"] for n in walk(scheme)][1:]
+    assert sorted(nested) == sorted(str(c) for c in g.subjects(RDF.type, SKOS.Concept))
+    # followed by the Collection, then the publisher
+    assert [n["@type"] for n in document["@graph"][1:]] == [
+        "Collection",
+        "schema:Organization",
+    ]
+
+
+def test_shapes():
+    g = Graph()
+    scheme, a, b, c = (URIRef(EX + n) for n in ["voc", "a", "b", "c"])
+    g.add((scheme, RDF.type, SKOS.ConceptScheme))
+    g.add((scheme, SKOS.hasTopConcept, a))
+    g.add((scheme, SKOS.hasTopConcept, b))
+    for concept in [a, b, c]:
+        g.add((concept, RDF.type, SKOS.Concept))
+        g.add((concept, SKOS.prefLabel, Literal(f"{concept} ☃", lang="en")))
+    # c has two broader concepts, and is nested under only one of them
+    g.add((a, SKOS.narrower, c))
+    g.add((b, SKOS.narrower, c))
+    g.add((c, SKOS.notation, Literal("1.1", datatype=XSD.token)))
+    # an agent referred to twice, and two blank nodes referred to only by each other
+    agent, x, y = BNode(), BNode(), BNode()
+    g.add((scheme, SDO.creator, agent))
+    g.add((scheme, SDO.publisher, agent))
+    g.add((agent, SDO.name, Literal("Someone")))
+    g.add((x, RDFS.seeAlso, y))
+    g.add((y, RDFS.seeAlso, x))
+
+    text = write_vocab_jsonld(g)
+    assert compare.isomorphic(_parse(text), g)
+    assert text.count('"@id": "http://example.com/c"') == 1
+
+
+def test_blank_nodes_and_literals():
+    g = Graph()
+    scheme, a, b = (URIRef(EX + n) for n in ["voc", "a", "b"])
+    g.add((scheme, RDF.type, SKOS.ConceptScheme))
+    # a blank node concept, inlined under the scheme, with narrower concepts and members of its own
+    top = BNode()
+    g.add((scheme, SKOS.hasTopConcept, top))
+    g.add((top, RDF.type, SKOS.Concept))
+    g.add((top, SKOS.narrower, a))
+    g.add((top, SKOS.narrower, BNode()))
+    g.add((top, SKOS.member, b))
+    g.add((a, RDF.type, SKOS.Concept))
+    # literals under terms whose values are IRIs
+    g.add((b, SKOS.member, Literal("not an IRI")))
+    g.add((b, SKOS.member, Literal("nor this", lang="en")))
+    g.add((b, SKOS.related, Literal("1", datatype=XSD.integer)))
+
+    assert compare.isomorphic(_parse(write_vocab_jsonld(g)), g)
+
+
+def test_deep():
+    g = Graph()
+    concepts = [URIRef(f"{EX}{i}") for i in range(MAX_DEPTH * 3)]
+    g.add((URIRef(EX), SKOS.hasTopConcept, concepts[0]))
+    for broader, narrower in zip(concepts, concepts[1:]):
+        g.add((broader, SKOS.narrower, narrower))
+        g.add((broader, RDF.type, SKOS.Concept))
+
+    assert compare.isomorphic(_parse(write_vocab_jsonld(g)), g)
@@ -0,0 +1,88 @@
+import io
+import sys
+from pathlib import Path
+
+import pytest
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.collection import Collection
+from rdflib.namespace import RDF, RDFS, SKOS, XSD
+
+sys.path.append(str(Path(__file__).parent.parent.absolute()))
+from vocexcel import convert
+from vocexcel.longturtle import LongTurtleWriter, write_longturtle
+
+tests_dir_path = Path(__file__).parent
+
+
+@pytest.mark.parametrize(
+    "file_name",
+    [
+        "040_exhaustive.xlsx",
+        "043_exhaustive.xlsx",
+        "060_simple.xlsx",
+        "063_simple1.xlsx",
+        "070_simple1.xlsx",
+    ],
+)
+def test_workbooks(file_name):
+    g = convert.excel_to_rdf(
+        tests_dir_path / file_name, output_format="graph", validate=False
+    )
+
+    assert LongTurtleWriter.supports(g)
+    assert write_longturtle(g) == g.serialize(format="longturtle")
+
+
+@pytest.mark.parametrize("file_name", ["eg-valid.ttl", "043_exhaustive.ttl"])
+def test_rdf_files(file_name):
+    g = Graph().parse(tests_dir_path / file_name)
+
+    assert write_longturtle(g) == g.serialize(format="longturtle")
+
+
+def test_other_shapes():
+    g = Graph()
+    ex = "http://example.com/"
+    g.bind("ex", ex)
+    shared, inlined = BNode(), BNode()
+    g.add((URIRef(ex + "Thing"), RDF.type, RDFS.Class))
+    g.add((URIRef(ex + "a"), RDF.type, URIRef(ex + "Thing")))
+    g.add((URIRef(ex + "a"), SKOS.related, shared))
+    g.add((URIRef(ex + "b"), SKOS.related, shared))
+    g.add((URIRef(ex + "a"), SKOS.note, inlined))
+    g.add((inlined, RDFS.label, Literal("two\nlines", lang="en")))
+    g.add((shared, RDFS.label, Literal("1.0", datatype=XSD.decimal)))
+    # no prefix is bound for these, so one is generated for the predicate only
+    g.add((URIRef("http://other.org/x"), URIRef("http://other.org/p"), Literal(1)))
+    g.add((URIRef("http://other.org/x"), URIRef("http://other.org/p"), Literal(2)))
+    g.add((BNode(), SKOS.note, Literal("unreferenced")))
+    items = BNode()
+    Collection(g, items, [Literal("x"), URIRef(ex + "c"), BNode()])
+    g.add((URIRef(ex + "b"), SKOS.member, items))
+
+    assert write_longturtle(g) == g.serialize(format="longturtle")
+
+
+def test_destinations(tmp_path):
+    g = convert.excel_to_rdf(
+        tests_dir_path / "070_simple1.xlsx", output_format="graph", validate=False
+    )
+    expected = g.serialize(format="longturtle")
+
+    binary = io.BytesIO()
+    assert write_longturtle(g, binary) is None
+    assert binary.getvalue().decode() == expected
+
+    text = io.StringIO()
+    write_longturtle(g, text)
+    assert text.getvalue() == expected
+
+    write_longturtle(g, tmp_path / "vocab.ttl")
+    assert (tmp_path / "vocab.ttl").read_text(encoding="utf-8") == expected
+
+    convert.excel_to_rdf(
+        tests_dir_path / "070_simple1.xlsx",
+        output_file_path=tmp_path / "converted.ttl",
+        validate=False,
+    )
+    assert (tmp_path / "converted.ttl").read_text(encoding="utf-8") == expected
@@ -157,3 +157,41 @@ def test_concept_iri():
                 "http://example.com/working-iri/c/2",
             ],
         )
+
+
+def test_vocabulary_to_graph():
+    cs = ConceptScheme(
+        uri="https://example.com/thing",
+        title="Things",
+        description="Some things",
+        created="2020-04-02",
+        modified="2020-04-02",
+        creator="GSQ",
+        publisher="GSQ",
+        provenance="Made up",
+    )
+    concepts = [
+        Concept(
+            uri="https://example.com/thing/x",
+            pref_label="Thing X",
+            definition="Fake def for Thing X",
+            children=["https://example.com/thing/y"],
+        ),
+        Concept(
+            uri="https://example.com/thing/y",
+            pref_label="Thing Y",
+            definition="Fake def for Thing Y",
+        ),
+    ]
+    v = Vocabulary(concept_scheme=cs, concepts=concepts, collections=[])
+    g = v.to_graph()
+
+    assert list(g.objects(URIRef(cs.uri), SKOS.hasTopConcept)) == [
+        URIRef("https://example.com/thing/x")
+    ]
+    assert g.namespace_manager.store.namespace("cs") == URIRef(cs.uri)
+
+    # the same triples can be added to an existing graph
+    g2 = Graph()
+    v.to_graph(g2)
+    assert g2.isomorphic(g)
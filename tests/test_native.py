@@ -0,0 +1,99 @@
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+from rdflib import Graph
+
+sys.path.append(str(Path(__file__).parent.parent.absolute()))
+from vocexcel import convert
+from vocexcel.native import (
+    NativeValidator,
+    UnsupportedShapes,
+    native_validator,
+    parity,
+    validate_native,
+)
+from vocexcel.shapes import SHAPES
+from vocexcel.utils import ConversionError
+from vocexcel.validation import validate_with_profile
+
+tests_dir_path = Path(__file__).parent
+
+
+def test_vocpub_is_native():
+    assert isinstance(native_validator("vocpub-46"), NativeValidator)
+    # compiled once per shapes graph
+    assert native_validator("vocpub-46") is native_validator("vocpub-46")
+
+
+@pytest.mark.parametrize(
+    "file_name",
+    [
+        "060_simple.xlsx",
+        "063_simple1.xlsx",
+        "070_simple1.xlsx",
+        "eg-valid.ttl",
+        "eg-invalid.ttl",
+        "043_exhaustive.ttl",
+    ],
+)
+@pytest.mark.parametrize("allow_warnings", [False, True])
+def test_parity(file_name, allow_warnings):
+    if file_name.endswith(".ttl"):
+        g = Graph().parse(tests_dir_path / file_name)
+    else:
+        g = convert.excel_to_rdf(tests_dir_path / file_name, output_format="graph")
+
+    assert parity(g, allow_warnings=allow_warnings) == []
+
+
+def test_unsupported_shapes():
+    shapes = Graph().parse(
+        data="""
+        PREFIX sh: <http://www.w3.org/ns/shacl#>
+        PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
+
+        <http://example.com/shape>
+            sh:targetClass skos:Concept ;
+            sh:property [
+                sh:path skos:notation ;
+                sh:pattern "^[0-9]+$" ;
+            ] ;
+        .
+        """,
+        format="turtle",
+    )
+    with pytest.raises(UnsupportedShapes):
+        NativeValidator(shapes)
+
+
+def test_validate_native():
+    g = Graph().parse(tests_dir_path / "eg-invalid.ttl")
+    conforms, results_graph, results_text = validate_native(g)
+
+    assert not conforms
+    assert results_text.startswith("Validation Report\nConforms: False\n")
+    # pyshacl validates what can't be validated natively, such as Turtle strings
+    data = (tests_dir_path / "eg-invalid.ttl").read_text()
+    assert validate_native(data)[0] == conforms
+
+
+def test_validate_with_profile_messages(tmp_path):
+    g = Graph().parse(tests_dir_path / "eg-invalid.ttl")
+    logs = {}
+    for engine in ["native", "pyshacl"]:
+        log_file = tmp_path / f"{engine}.log"
+        with pytest.raises(ConversionError) as e:
+            validate_with_profile(g, log_file=str(log_file), engine=engine)
+        logging.shutdown()
+        logs[engine] = (str(e.value), sorted(log_file.read_text().splitlines()))
+
+    assert logs["native"] == logs["pyshacl"]
+    assert len(logs["native"][1]) > 0
+
+
+def test_validate_with_profile_engine():
+    g = Graph().parse(tests_dir_path / "eg-valid.ttl")
+    with pytest.raises(ValueError):
+        validate_with_profile(g, engine="other")
@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+import pyshacl
+import pytest
+from rdflib import Graph
+
+sys.path.append(str(Path(__file__).parent.parent.absolute()))
+from vocexcel import convert
+from vocexcel.parallel import partition, validate_parallel
+from vocexcel.shapes import SHAPES
+
+tests_dir_path = Path(__file__).parent
+
+
+@pytest.mark.parametrize(
+    "file_name", ["063_simple1.xlsx", "070_simple1.xlsx", "eg-invalid.ttl"]
+)
+@pytest.mark.parametrize("allow_warnings", [False, True])
+def test_validate_parallel(file_name, allow_warnings, summary):
+    if file_name.endswith(".ttl"):
+        g = Graph().parse(tests_dir_path / file_name)
+    else:
+        g = convert.excel_to_rdf(tests_dir_path / file_name, output_format="graph")
+    full = pyshacl.validate(
+        g, shacl_graph=SHAPES.get("vocpub-46"), allow_warnings=allow_warnings
+    )
+
+    for jobs in [2, 3]:
+        conforms, results_graph, _ = validate_parallel(
+            g, allow_warnings=allow_warnings, jobs=jobs
+        )
+        assert conforms == full[0]
+        assert summary(results_graph) == summary(full[1])
+
+
+def test_partition():
+    g = convert.excel_to_rdf(tests_dir_path / "070_simple1.xlsx", output_format="graph")
+    parts = partition(g, SHAPES.get("vocpub-46"), 3)
+
+    assert len(parts) == 3
+    # every triple is in some part, and every named node is given by exactly one
+    assert set(g) == {t for triples, _ in parts for t in triples}
+    owned = [n for _, nodes in parts for n in nodes]
+    assert len(owned) == len(set(owned))
+
+
+def test_excel_to_rdf_jobs():
+    g = convert.excel_to_rdf(
+        tests_dir_path / "070_simple1.xlsx",
+        output_format="graph",
+        validate=True,
+        jobs=2,
+    )
+    assert len(g) > 0
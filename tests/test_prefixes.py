@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+
+from rdflib import Namespace, URIRef
+
+sys.path.append(str(Path(__file__).parent.parent.absolute()))
+from vocexcel.convert_043 import create_prefix_dict
+from vocexcel.prefixes import PrefixExpander
+from vocexcel.utils import expand_namespaces, load_workbook
+
+tests_dir_path = Path(__file__).parent
+
+
+def test_prefix_expander():
+    pe = PrefixExpander(
+        {
+            "ex:": Namespace("http://example.com/"),
+            "ex:a": "http://example.com/a-ns/",
+            "": "http://default.com/",
+        }
+    )
+
+    assert pe.expand("ex:thing") == "http://example.com/thing"
+    # only the prefix is replaced, not later occurrences of it
+    assert pe.expand("ex:thing-ex:other") == "http://example.com/thing-ex:other"
+    # the longest matching prefix wins
+    assert pe.expand("ex:a:thing") == "http://example.com/a-ns/thing"
+    assert pe.expand(":thing") == "http://default.com/thing"
+    assert pe.expand("other:thing") is None
+    assert pe.expand("http://example.com/thing") is None
+
+
+def test_prefix_expander_mapping():
+    pe = PrefixExpander({"ex:": "http://example.com/", "rc": "http://road-vocab.com/"})
+
+    assert list(pe) == ["ex", "rc"]
+    assert "ex" in pe and "ex:" in pe and "rc:" in pe
+    assert pe["ex:"] == pe["ex"] == "http://example.com/"
+    assert len(pe) == 2
+
+
+def test_expand_namespaces():
+    prefixes = {"ex:": "http://example.com/"}
+
+    assert expand_namespaces("ex:thing", prefixes) == URIRef("http://example.com/thing")
+    assert expand_namespaces("ex:thing", PrefixExpander(prefixes)) == URIRef(
+        "http://example.com/thing"
+    )
+    assert expand_namespaces("http://other.com/x", prefixes) == URIRef(
+        "http://other.com/x"
+    )
+    assert expand_namespaces("not an iri", prefixes) == "not an iri"
+
+
+def test_create_prefix_dict_043():
+    wb = load_workbook(tests_dir_path / "043_prefix_test.xlsx")
+    pe = create_prefix_dict(wb["Prefix Sheet"])
+
+    assert isinstance(pe, PrefixExpander)
+    assert pe.expand("surround:thing") == "http://surroundaustralia.com/thing"
@@ -0,0 +1,74 @@
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent.absolute()))
+from vocexcel import convert, profiles
+from vocexcel.__main__ import main
+from vocexcel.profiles import ProfileRegistry
+from vocexcel.shapes import SHAPES
+from vocexcel.validation import validate_with_profile
+
+tests_dir_path = Path(__file__).parent
+vocpub_path = Path(profiles.__file__).parent / "vocpub-46.ttl"
+
+
+@pytest.fixture()
+def registry(monkeypatch):
+    registry = ProfileRegistry({"vocpub-46": profiles.VOC_PUB_PROFILE_46})
+    monkeypatch.setattr(profiles, "PROFILES", registry)
+    return registry
+
+
+def test_register_directory(registry, tmp_path):
+    shutil.copy(vocpub_path, tmp_path / "in-house.ttl")
+
+    assert registry.register_directory(tmp_path) == ["in-house"]
+    profile = registry["in-house"]
+    # read from the shapes
+    assert profile.uri == "https://w3id.org/profile/vocpub/validator"
+    assert profile.label == "VocPub Validator"
+    assert profile.comment == "SHACL validator for the VocPub Profile"
+    assert registry.shapes_file("in-house") == tmp_path / "in-house.ttl"
+    # preloaded, without writing an artifact next to the Turtle
+    assert "in-house" in SHAPES
+    assert not (tmp_path / "in-house.shapes").exists()
+
+    g = convert.excel_to_rdf(tests_dir_path / "070_simple1.xlsx", output_format="graph")
+    assert validate_with_profile(g, profile="in-house", cache=None).conforms
+
+
+def test_directory_changes(registry, tmp_path):
+    registry.register_directory(tmp_path)
+    assert list(registry) == ["vocpub-46"]
+
+    # a new file is found when its token is looked up
+    shutil.copy(vocpub_path, tmp_path / "new.ttl")
+    assert "new" in registry
+    g = SHAPES.get("new")
+
+    # a changed file is reloaded
+    text = (tmp_path / "new.ttl").read_text()
+    (tmp_path / "new.ttl").write_text(text.replace("VocPub Validator", "New Validator"))
+    stat = os.stat(tmp_path / "new.ttl")
+    os.utime(tmp_path / "new.ttl", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    registry.refresh()
+    assert registry["new"].label == "New Validator"
+    assert SHAPES.get("new") is not g
+
+    # and a removed one unregistered
+    (tmp_path / "new.ttl").unlink()
+    registry.refresh()
+    assert "new" not in registry
+
+
+def test_cli(registry, tmp_path, capsys):
+    shutil.copy(vocpub_path, tmp_path / "in-house.ttl")
+    main(["--profilesdir", str(tmp_path), "-l"])
+
+    assert (
+        "in-house\thttps://w3id.org/profile/vocpub/validator" in capsys.readouterr().out
+    )
@@ -0,0 +1,70 @@
+import datetime
+import sys
+from pathlib import Path
+from tempfile import SpooledTemporaryFile
+
+import pytest
+from openpyxl import load_workbook
+
+sys.path.append(str(Path(__file__).parent.parent.absolute()))
+from vocexcel.readers import XlsxWorkbook
+from vocexcel.utils import ConversionError, sniff_template_version, to_date
+
+tests_dir_path = Path(__file__).parent
+
+
+@pytest.mark.parametrize(
+    "file_name", ["060_simple.xlsx", "063_simple1.xlsx", "070_simple1.xlsx"]
+)
+def test_values_match_openpyxl(file_name):
+    wb = load_workbook(tests_dir_path / file_name, data_only=True, read_only=True)
+    xwb = XlsxWorkbook(tests_dir_path / file_name)
+    assert xwb.sheetnames == wb.sheetnames
+
+    for sheet_name in ["Prefixes", "Concept Scheme", "Concepts", "Collections"]:
+        expected = wb[sheet_name].iter_rows(max_row=30, max_col=8, values_only=True)
+        actual = xwb[sheet_name].iter_rows(max_row=30, max_col=8)
+        for expected_row, actual_row in zip(expected, actual, strict=True):
+            for expected_value, actual_value in zip(expected_row, actual_row):
+                if isinstance(expected_value, datetime.datetime):
+                    # styles aren't read so dates come back as serial numbers
+                    assert to_date(actual_value) == expected_value.date()
+                else:
+                    assert actual_value == expected_value
+    wb.close()
+    xwb.close()
+
+
+def test_cell_access():
+    xwb = XlsxWorkbook(tests_dir_path / "070_simple1.xlsx")
+    assert xwb["Introduction"]["E4"].value == "0.7.0"
+    assert xwb["Concept Scheme"]["B3"].value == "http://test.com/myVocab"
+    assert xwb["Concept Scheme"]["Z999"].value is None
+    with pytest.raises(KeyError):
+        xwb["No Such Sheet"]
+    xwb.close()
+
+
+@pytest.mark.parametrize(
+    "file_name, version",
+    [
+        ("030_languages.xlsx", "0.3.0"),
+        ("040_simple.xlsx", "0.4.0"),
+        ("043_simple_valid.xlsx", "0.4.3"),
+        ("060_simple.xlsx", "0.6.0"),
+        ("063_simple1.xlsx", "0.6.3"),
+        ("070_simple1.xlsx", "0.7.0"),
+    ],
+)
+def test_sniff_template_version(file_name, version):
+    assert sniff_template_version(tests_dir_path / file_name) == version
+
+
+def test_sniff_template_version_unsupported():
+    with pytest.raises(ConversionError):
+        sniff_template_version(tests_dir_path / "060_simple2.xlsx")
+
+    with pytest.raises(ConversionError):
+        with SpooledTemporaryFile() as f:
+            f.write(b"not a zip file")
+            sniff_template_version(f)
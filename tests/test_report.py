@@ -0,0 +1,101 @@
+import json
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+from rdflib import Graph
+from rdflib.namespace import SH
+
+sys.path.append(str(Path(__file__).parent.parent.absolute()))
+from vocexcel import convert
+from vocexcel.report import Severity, ValidationReport
+from vocexcel.shapes import SHAPES
+from vocexcel.utils import ConversionError
+from vocexcel.validation import ValidationFailed, log_msg, validate_with_profile
+
+tests_dir_path = Path(__file__).parent
+
+
+def test_from_graph():
+    import pyshacl
+
+    g = Graph().parse(tests_dir_path / "eg-invalid.ttl")
+    conforms, results_graph, _ = pyshacl.validate(
+        g, shacl_graph=SHAPES.get("vocpub-46")
+    )
+    report = ValidationReport.from_graph(results_graph, profile="vocpub-46")
+
+    assert report.conforms == conforms is False
+    assert len(report) == len(list(results_graph.objects(None, SH.result)))
+    # most severe first, then grouped by focus node
+    severities = [r.severity for r in report]
+    assert severities == sorted(severities, reverse=True)
+    for focus_nodes in report.by_severity().values():
+        for focus_node, results in focus_nodes.items():
+            assert all(r.focus_node == focus_node for r in results)
+    assert report.count(Severity.VIOLATION) == len(
+        list(results_graph.subjects(SH.resultSeverity, SH.Violation))
+    )
+
+
+def test_rendering():
+    g = Graph().parse(tests_dir_path / "eg-invalid.ttl")
+    with pytest.raises(ValidationFailed) as e:
+        validate_with_profile(g, message_level=3)
+    report = e.value.report
+
+    result = next(iter(report))
+    # formatted as log_msg formats result dicts
+    result_dict = {
+        "focusNode": str(result.focus_node),
+        "resultMessage": result.message,
+        "resultSeverity": str(SH[result.severity.local_name]),
+        "sourceConstraintComponent": str(result.constraint_component),
+        "sourceShape": str(result.source_shape),
+    }
+    if result.value is not None:
+        result_dict["value"] = str(result.value)
+    assert result.text() == log_msg(result_dict, "placeholder")
+    assert result.text(coloured=True) == log_msg(result_dict, None)
+
+    text = str(report)
+    assert text.startswith(
+        f"Validation Report\nConforms: False\nResults ({len(report)}):\n"
+    )
+    assert text.count("Validation Result in ") == len(report)
+
+    d = json.loads(json.dumps(report.to_dict()))
+    assert d["profile"] == "vocpub-46"
+    assert d["conforms"] is False
+    assert sum(d["counts"].values()) == len(report)
+    assert set(d["results"]) == {"Violation", "Warning", "Info"}
+
+
+def test_validate_with_profile_returns_report():
+    g = convert.excel_to_rdf(tests_dir_path / "070_simple1.xlsx", output_format="graph")
+    report = validate_with_profile(g)
+
+    assert report.conforms
+    assert report.count() == 0
+
+
+def test_error_level(tmp_path):
+    g = Graph().parse(tests_dir_path / "eg-invalid.ttl")
+    with pytest.raises(ConversionError) as e:
+        validate_with_profile(g, error_level=3, log_file=str(tmp_path / "v.log"))
+    logging.shutdown()
+
+    assert isinstance(e.value, ValidationFailed)
+    assert e.value.report.count(Severity.VIOLATION) > 0
+    assert len(
+        (tmp_path / "v.log").read_text().split("Validation Result in ")
+    ) - 1 == len(e.value.report)
+
+
+@pytest.mark.parametrize("error_level", [0, 4])
+def test_out_of_range_error_level(error_level):
+    # treated as level 1, failing on results of any severity
+    g = Graph().parse(tests_dir_path / "eg-invalid.ttl")
+    with pytest.raises(ValidationFailed):
+        validate_with_profile(g, error_level=error_level, cache=None)
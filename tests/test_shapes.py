@@ -0,0 +1,97 @@
+import hashlib
+import os
+import pickle
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from rdflib import Graph
+from rdflib.compare import isomorphic
+from rdflib.namespace import RDF, SH
+
+sys.path.append(str(Path(__file__).parent.parent.absolute()))
+from vocexcel import profiles, shapes
+from vocexcel.shapes import ShapesCache
+from vocexcel.snapshot import read_snapshot
+
+
+def test_shapes_cache():
+    cache = ShapesCache()
+    g = cache.get("vocpub-46")
+
+    assert "vocpub-46" in cache
+    assert len(list(g.subjects(RDF.type, SH.NodeShape))) > 0
+    assert cache.get("vocpub-46") is g
+
+    # every thread gets the one parsed graph
+    with ThreadPoolExecutor(8) as pool:
+        graphs = list(pool.map(cache.get, ["vocpub-46"] * 32))
+    assert all(x is g for x in graphs)
+
+
+def test_shapes_cache_reloads_changed_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(shapes, "SHAPES_DIR", tmp_path)
+    shutil.copy(Path(shapes.__file__).parent / "vocpub-46.ttl", tmp_path / "test.ttl")
+    cache = ShapesCache()
+    g = cache.get("test")
+
+    stat = os.stat(tmp_path / "test.ttl")
+    os.utime(
+        tmp_path / "test.ttl", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000)
+    )
+    g2 = cache.get("test")
+
+    assert g2 is not g
+    assert len(g2) == len(g)
+    assert cache.get("test") is g2
+
+
+def test_compiled_shapes(tmp_path, monkeypatch):
+    monkeypatch.setattr(shapes, "SHAPES_DIR", tmp_path)
+    shutil.copy(Path(shapes.__file__).parent / "vocpub-46.ttl", tmp_path / "test.ttl")
+    ttl = Graph().parse(tmp_path / "test.ttl")
+
+    # no artifact yet: the Turtle is parsed, and no artifact is written while validating
+    assert shapes.load_compiled_shapes("test") is None
+    # with pyshacl's system triples added
+    assert len(shapes.load_shapes("test")) == len(ttl) + 2
+    assert not (tmp_path / "test.shapes").exists()
+
+    assert shapes.compile_shapes("test") == tmp_path / "test.shapes"
+    assert isomorphic(shapes.load_compiled_shapes("test"), ttl)
+
+    # a changed shapes file makes the artifact stale
+    with open(tmp_path / "test.ttl", "a") as f:
+        f.write("\n<http://example.com/a> a <http://example.com/B> .\n")
+    assert shapes.load_compiled_shapes("test") is None
+    assert len(shapes.load_shapes("test")) == len(ttl) + 3
+
+
+def test_compiled_shapes_not_unpickled(tmp_path, monkeypatch):
+    monkeypatch.setattr(shapes, "SHAPES_DIR", tmp_path)
+    shutil.copy(Path(shapes.__file__).parent / "vocpub-46.ttl", tmp_path / "test.ttl")
+    (tmp_path / "test.shapes").write_bytes(pickle.dumps({"version": 1}))
+    assert shapes.load_compiled_shapes("test") is None
+
+    # nor is an artifact whose content was changed
+    data = bytearray(shapes.compile_shapes("test").read_bytes())
+    data[-1] ^= 0xFF
+    (tmp_path / "test.shapes").write_bytes(bytes(data))
+    assert shapes.load_compiled_shapes("test") is None
+
+
+def test_shipped_compiled_shapes_are_current():
+    for profile in profiles.PROFILES:
+        assert shapes.load_compiled_shapes(profile) is not None
+
+
+def test_shipped_compiled_shapes_hashes():
+    # every shipped artifact was compiled from the Turtle next to it, as it is now
+    ttls = sorted(shapes.SHAPES_DIR.glob("*.ttl"))
+    assert ttls
+    for ttl in ttls:
+        snapshot = read_snapshot(ttl.with_suffix(".shapes"))
+        assert (
+            snapshot.metadata["sha256"] == hashlib.sha256(ttl.read_bytes()).hexdigest()
+        )
@@ -0,0 +1,78 @@
+import io
+import sys
+from pathlib import Path
+
+import pytest
+from rdflib import Dataset, Graph, URIRef, compare
+from rdflib.namespace import RDF, SKOS
+
+sys.path.append(str(Path(__file__).parent.parent.absolute()))
+from vocexcel import convert
+from vocexcel.sinks import GraphSink, NQuadsSink, NTriplesSink
+
+tests_dir_path = Path(__file__).parent
+
+
+@pytest.mark.parametrize(
+    "file_name",
+    [
+        "043_simple_valid.xlsx",
+        "060_simple.xlsx",
+        "063_simple1.xlsx",
+        "070_simple1.xlsx",
+    ],
+)
+def test_nt_streaming(file_name):
+    g = convert.excel_to_rdf(tests_dir_path / file_name, output_format="graph")
+    nt = convert.excel_to_rdf(tests_dir_path / file_name, output_format="nt")
+
+    assert compare.isomorphic(g, Graph().parse(data=nt, format="nt"))
+
+
+def test_nquads_streaming():
+    g = convert.excel_to_rdf(tests_dir_path / "070_simple1.xlsx", output_format="graph")
+    nq = convert.excel_to_rdf(
+        tests_dir_path / "070_simple1.xlsx", output_format="nquads"
+    )
+    d = Dataset().parse(data=nq, format="nquads")
+    named = d.graph(URIRef("http://test.com/myVocab"))
+
+    assert compare.isomorphic(g, named)
+    assert len(named) == len(d)
+
+
+def test_nt_streaming_validated(tmp_path):
+    g = convert.excel_to_rdf(tests_dir_path / "070_simple1.xlsx", output_format="graph")
+    output_file_path = tmp_path / "070_simple1.nt"
+    convert.excel_to_rdf(
+        tests_dir_path / "070_simple1.xlsx",
+        output_file_path=output_file_path,
+        output_format="nt",
+        validate=True,
+    )
+
+    assert compare.isomorphic(g, Graph().parse(output_file_path, format="nt"))
+
+
+def test_sinks():
+    s = URIRef("http://example.com/s")
+    triples = [
+        (URIRef("http://example.com/a"), URIRef("http://example.com/p"), s),
+        (s, RDF.type, SKOS.ConceptScheme),
+    ]
+
+    gs = GraphSink()
+    out = io.StringIO()
+    with NTriplesSink(out) as nts, NQuadsSink() as nqs:
+        for triple in triples:
+            gs.add(triple)
+            nts.add(triple)
+            nqs.add(triple)
+        nq = nqs.getvalue()
+
+    assert len(gs.graph) == 2
+    assert out.getvalue().splitlines()[0] == (
+        "<http://example.com/a> <http://example.com/p> <http://example.com/s> ."
+    )
+    # quads held back until the ConceptScheme is seen are named for it too
+    assert all(line.endswith("<http://example.com/s> .") for line in nq.splitlines())
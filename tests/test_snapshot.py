@@ -0,0 +1,101 @@
+import sys
+from pathlib import Path
+
+import pytest
+from rdflib import BNode, Graph, Literal, URIRef, compare
+from rdflib.namespace import RDF, SKOS, XSD
+
+sys.path.append(str(Path(__file__).parent.parent.absolute()))
+from vocexcel import convert
+from vocexcel.longturtle import write_longturtle
+from vocexcel.snapshot import (
+    SnapshotError,
+    load_snapshot,
+    read_snapshot,
+    snapshot_bytes,
+)
+
+tests_dir_path = Path(__file__).parent
+
+
+@pytest.fixture(scope="module")
+def vocab():
+    return convert.excel_to_rdf(
+        tests_dir_path / "070_simple1.xlsx", output_format="graph"
+    )
+
+
+def test_round_trip(vocab, tmp_path):
+    assert (
+        convert.excel_to_rdf(
+            tests_dir_path / "070_simple1.xlsx",
+            output_format="snapshot",
+            output_file_path=tmp_path / "vocab.vocsnap",
+        )
+        is None
+    )
+    g = load_snapshot(tmp_path / "vocab.vocsnap")
+
+    assert compare.isomorphic(g, vocab)
+    # the prefixes are kept, so the graph is written as the original is
+    assert write_longturtle(g) == write_longturtle(vocab)
+
+    data = convert.excel_to_rdf(
+        tests_dir_path / "070_simple1.xlsx", output_format="snapshot"
+    )
+    assert compare.isomorphic(load_snapshot(data), vocab)
+
+
+def test_terms():
+    g = Graph()
+    g.bind("ex", "http://example.com/")
+    b = BNode()
+    s = URIRef("http://example.com/ü")
+    literals = [
+        Literal("plain"),
+        Literal("label", lang="en-GB"),
+        Literal("2023-01-01", datatype=XSD.date),
+        Literal("not a date", datatype=XSD.date),
+        Literal("multi\nline ☃"),
+        Literal(""),
+    ]
+    for o in literals:
+        g.add((s, SKOS.note, o))
+    g.add((s, SKOS.related, b))
+    g.add((b, RDF.type, SKOS.Concept))
+
+    snapshot = read_snapshot(snapshot_bytes(g))
+    assert len(snapshot) == len(g)
+    assert compare.isomorphic(snapshot.graph(), g)
+    assert set(snapshot.triples((s, SKOS.note, None))) == {
+        (s, SKOS.note, o) for o in literals
+    }
+    assert snapshot.value(s, SKOS.related) == b
+    assert (b, RDF.type, SKOS.Concept) in snapshot
+    assert (b, RDF.type, SKOS.Collection) not in snapshot
+    assert list(snapshot.triples((None, None, URIRef("http://nowhere.com")))) == []
+
+
+def test_view(vocab):
+    snapshot = read_snapshot(snapshot_bytes(vocab))
+
+    assert snapshot.scheme == URIRef("http://test.com/myVocab")
+    concepts = set(vocab.subjects(RDF.type, SKOS.Concept))
+    assert set(s for s, _, _ in snapshot.triples((None, RDF.type, SKOS.Concept))) == (
+        concepts
+    )
+    for concept in concepts:
+        assert set(snapshot.triples((concept, None, None))) == set(
+            vocab.triples((concept, None, None))
+        )
+
+
+def test_corrupt(vocab):
+    data = bytearray(snapshot_bytes(vocab))
+    with pytest.raises(SnapshotError):
+        read_snapshot(b"not a snapshot")
+    data[-1] ^= 0xFF
+    with pytest.raises(SnapshotError):
+        read_snapshot(bytes(data))
+    with pytest.raises(SnapshotError):
+        read_snapshot(bytes(data), verify=False)
@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+
+import pytest
+from rdflib import URIRef, compare
+from rdflib.namespace import SKOS
+
+sys.path.append(str(Path(__file__).parent.parent.absolute()))
+from vocexcel import convert
+from vocexcel.convert_070 import extract_concept_scheme, extract_prefixes, extract_vocab
+from vocexcel.utils import load_workbook
+
+tests_dir_path = Path(__file__).parent
+
+
+@pytest.mark.parametrize(
+    "file_name",
+    ["060_simple.xlsx", "062_simple1.xlsx", "063_simple1.xlsx", "070_simple1.xlsx"],
+)
+def test_read_only(file_name):
+    g1 = convert.excel_to_rdf(tests_dir_path / file_name, output_format="graph")
+    g2 = convert.excel_to_rdf(
+        tests_dir_path / file_name, output_format="graph", read_only=True
+    )
+    assert compare.isomorphic(g1, g2)
+
+
+@pytest.mark.parametrize(
+    "file_name",
+    ["060_simple.xlsx", "062_simple1.xlsx", "063_simple1.xlsx", "070_simple1.xlsx"],
+)
+def test_xlsx_reader(file_name):
+    g1 = convert.excel_to_rdf(tests_dir_path / file_name, output_format="graph")
+    g2 = convert.excel_to_rdf(
+        tests_dir_path / file_name, output_format="graph", reader="xlsx"
+    )
+    assert compare.isomorphic(g1, g2)
+
+
+def test_extract_concept_scheme_read_only():
+    wb = load_workbook(tests_dir_path / "070_simple1.xlsx", read_only=True)
+    prefixes = extract_prefixes(wb["Prefixes"])
+    cs, cs_iri = extract_concept_scheme(wb["Concept Scheme"], prefixes)
+    wb.close()
+
+    assert str(cs_iri) == "http://test.com/myVocab"
+    assert len(cs) > 0
+
+
+def test_extract_vocab():
+    wb = load_workbook(tests_dir_path / "070_simple1.xlsx")
+    g = extract_vocab(wb)
+    wb.close()
+
+    cs_iri = URIRef("http://test.com/myVocab")
+    assert (cs_iri, SKOS.hasTopConcept, URIRef("http://road-vocab.com/secondary")) in g
+    assert ("cs", cs_iri) in list(g.namespaces())
+    assert compare.isomorphic(
+        g,
+        convert.excel_to_rdf(
+            tests_dir_path / "070_simple1.xlsx", output_format="graph"
+        ),
+    )
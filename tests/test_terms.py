@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+
+from rdflib import Literal, URIRef
+from rdflib.namespace import XSD
+
+sys.path.append(str(Path(__file__).parent.parent.absolute()))
+from vocexcel.terms import TermFactory
+
+
+def test_term_factory():
+    terms = TermFactory()
+
+    a = terms.uriref("http://example.com/a")
+    assert a == URIRef("http://example.com/a")
+    assert terms.uriref("http://example.com/a") is a
+
+    note = terms.literal("Created for testing", lang="en")
+    assert note == Literal("Created for testing", lang="en")
+    assert terms.literal("Created for testing", lang="en") is note
+    assert terms.literal("Created for testing") is not note
+
+    date = terms.literal("2022-01-01", datatype=XSD.date)
+    assert terms.literal("2022-01-01", datatype=XSD.date) is date
+
+    assert terms.stats() == {
+        "hits": 3,
+        "misses": 4,
+        "hit_rate": 3 / 7,
+        "urirefs": 1,
+        "literals": 3,
+    }
+
+    terms.clear()
+    assert terms.hits == terms.misses == 0
+    assert terms.hit_rate == 0.0
+
+
+def test_term_factory_typed():
+    terms = TermFactory()
+
+    # 1, 1.0 and True are equal as dict keys, but make different Literals
+    assert terms.literal(1).datatype == XSD.integer
+    assert terms.literal(1.0).datatype == XSD.double
+    assert terms.literal(True).datatype == XSD.boolean
+
+
+def test_term_factory_bounded():
+    terms = TermFactory(maxsize=2)
+    for i in range(5):
+        terms.uriref(f"http://example.com/{i}")
+
+    assert terms.stats()["urirefs"] == 2
@@ -0,0 +1,126 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from pyshacl.shape import Shape
+from rdflib import URIRef
+from rdflib.namespace import RDF, SKOS
+
+sys.path.append(str(Path(__file__).parent.parent.absolute()))
+from vocexcel import convert
+from vocexcel.__main__ import main
+from vocexcel.timing import ShapeTimings, _timed_validate, recording
+from vocexcel.validation import validate_with_profile
+
+tests_dir_path = Path(__file__).parent
+REQUIREMENT_2_3_4 = "<https://w3id.org/profile/vocpub/validator/Requirement-2.3.4>"
+
+
+@pytest.fixture(scope="module")
+def vocab():
+    return convert.excel_to_rdf(
+        tests_dir_path / "070_simple1.xlsx", output_format="graph"
+    )
+
+
+@pytest.mark.parametrize("engine", ["native", "pyshacl"])
+def test_timings(vocab, engine):
+    timings = ShapeTimings()
+    report = validate_with_profile(vocab, engine=engine, timings=timings)
+
+    assert report.conforms
+    assert timings.engine == engine
+    rows = timings.rows()
+    assert [r["seconds"] for r in rows] == sorted(
+        (r["seconds"] for r in rows), reverse=True
+    )
+    # the shape targeting every Concept
+    concepts = len(list(vocab.subjects(RDF.type, SKOS.Concept)))
+    row = next(r for r in rows if r["shape"] == REQUIREMENT_2_3_4)
+    assert row["kind"] == "NodeShape"
+    assert row["focusNodes"] == concepts
+    assert row["seconds"] <= timings.total_seconds
+    assert any(r["kind"] == "PropertyShape" and r["path"] for r in rows)
+
+    table = timings.table()
+    assert table.splitlines()[0].split() == [
+        "Milliseconds",
+        "%",
+        "Focus",
+        "nodes",
+        "Calls",
+        "Kind",
+        "Shape",
+    ]
+    assert table.splitlines()[-1].startswith(f"Validated with {engine} in ")
+    assert json.loads(json.dumps(timings.to_dict()))["shapes"] == rows
+
+
+def test_timings_are_recorded_once(vocab):
+    first = ShapeTimings()
+    validate_with_profile(vocab, engine="pyshacl", timings=first)
+    # nothing is recorded outside of timed validations
+    validate_with_profile(vocab, engine="pyshacl", cache=None)
+    second = ShapeTimings()
+    validate_with_profile(vocab, engine="pyshacl", timings=second)
+
+    def counts(timings):
+        return sorted((r["shape"], r["focusNodes"], r["calls"]) for r in timings.rows())
+
+    assert counts(first) == counts(second)
+
+
+@pytest.mark.parametrize("executor", [False, True])
+def test_pyshacl_signatures(executor):
+    # pyshacl 0.18's Shape.validate has no executor parameter, later versions' do
+    class Shape:
+        node = URIRef("http://example.com/shape")
+
+        if executor:
+
+            def validate(self, executor, target_graph, focus=None):
+                return executor, target_graph, focus
+
+        else:
+
+            def validate(self, target_graph, focus=None, abort_on_first=False):
+                return target_graph, focus, abort_on_first
+
+    Shape.validate = _timed_validate(Shape.validate)
+    timings = ShapeTimings()
+    with recording(timings):
+        # the arguments are passed on unchanged
+        if executor:
+            assert Shape().validate("x", "g", ["a", "b"]) == ("x", "g", ["a", "b"])
+            Shape().validate("x", "g", focus="a")
+            Shape().validate("x", "g")
+        else:
+            assert Shape().validate("g", ["a", "b"], True) == ("g", ["a", "b"], True)
+            Shape().validate("g", focus="a")
+            Shape().validate("g")
+
+    assert timings.timings[Shape.node].focus_nodes == 3
+    assert timings.timings[Shape.node].calls == 3
+
+
+def test_patch_restored(vocab):
+    validate, focus_nodes = Shape.validate, Shape.focus_nodes
+    outer, inner = ShapeTimings(), ShapeTimings()
+    with recording(outer):
+        with recording(inner):
+            pass
+        # still patched, and recording into the outer timings again
+        assert Shape.validate is not validate
+        validate_with_profile(vocab, engine="pyshacl", cache=None)
+    assert outer.timings and not inner.timings
+    assert Shape.validate is validate
+    assert Shape.focus_nodes is focus_nodes
+
+
+def test_cli(capsys):
+    main([str(tests_dir_path / "070_simple1.xlsx"), "-v", "--timings"])
+
+    err = capsys.readouterr().err
+    assert "Milliseconds" in err
+    assert REQUIREMENT_2_3_4 in err
@@ -1,6 +1,13 @@
+import shutil
+
+import openpyxl
+import pytest
 from fastapi.testclient import TestClient
 from rdflib import Graph
 
+from vocexcel import utils
+from vocexcel.utils import get_template_version as utils_get_template_version
+
 
 def test(client: TestClient):
     with open("tests/062_simple1.xlsx", "rb") as file:
@@ -13,3 +20,112 @@ def test(client: TestClient):
         graph = Graph()
         graph.parse(data=response.text)
         assert len(graph) > 0
+
+
+def test_vocab_json_ld(client: TestClient):
+    with open("tests/070_simple1.xlsx", "rb") as file:
+        files = {"upload_file": file}
+        response = client.post(
+            "/api/v1/convert", files=files, params={"output_format": "vocab-json-ld"}
+        )
+
+    assert response.status_code == 200
+    assert "application/ld+json" in response.headers.get("content-type")
+    assert response.json()["@graph"][0]["@type"] == "ConceptScheme"
+
+    graph = Graph()
+    graph.parse(data=response.text, format="json-ld")
+    assert len(graph) > 0
+
+
+def test_not_a_template(client: TestClient):
+    files = {"upload_file": ("vocab.xlsx", b"not an Excel workbook")}
+    response = client.post("/api/v1/convert", files=files)
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("route", ["/api/v1/convert", "/api/v1/validate"])
+def test_sniffed_once(client: TestClient, monkeypatch, route):
+    sniffed = []
+
+    def get_template_version(wb):
+        sniffed.append(wb)
+        return utils_get_template_version(wb)
+
+    monkeypatch.setattr(utils, "get_template_version", get_template_version)
+    with open("tests/070_simple1.xlsx", "rb") as file:
+        response = client.post(route, files={"upload_file": file})
+
+    assert response.status_code == 200
+    assert len(sniffed) == 1
+
+
+def test_cell_problems(client: TestClient, tmp_path):
+    wb = openpyxl.load_workbook("tests/070_simple1.xlsx")
+    wb["Concepts"]["C4"] = None
+    wb["Concepts"]["C6"] = None
+    wb.save(tmp_path / "vocab.xlsx")
+    with open(tmp_path / "vocab.xlsx", "rb") as file:
+        files = {"upload_file": file}
+        response = client.post("/api/v1/convert", files=files)
+
+    assert response.status_code == 400
+    assert "Concepts!C4" in response.json()["detail"]
+    assert "Concepts!C6" in response.json()["detail"]
+
+
+@pytest.mark.parametrize(
+    "file_name, conforms",
+    [["tests/070_simple1.xlsx", True], ["tests/063_simple1.xlsx", False]],
+)
+def test_validate(client: TestClient, file_name, conforms):
+    with open(file_name, "rb") as file:
+        files = {"upload_file": file}
+        response = client.post("/api/v1/validate", files=files)
+
+    assert response.status_code == 200
+    report = response.json()
+    assert report["conforms"] is conforms
+    assert (report["counts"]["Violation"] == 0) is conforms
+    for focus_nodes in report["results"].values():
+        for focus_node, results in focus_nodes.items():
+            assert all(r["focusNode"] == focus_node for r in results)
+
+
+def test_validate_with_profiles_dir(tmp_path, monkeypatch):
+    from vocexcel import profiles
+    from vocexcel.web.app import create_app
+    from vocexcel.web.settings import Settings
+
+    registry = profiles.ProfileRegistry({"vocpub-46": profiles.VOC_PUB_PROFILE_46})
+    monkeypatch.setattr(profiles, "PROFILES", registry)
+    monkeypatch.setattr(Settings, "VOCEXCEL_PROFILES_DIR", str(tmp_path))
+    shutil.copy("vocexcel/vocpub-46.ttl", tmp_path / "in-house.ttl")
+    client = TestClient(create_app())
+
+    with open("tests/070_simple1.xlsx", "rb") as file:
+        files = {"upload_file": file}
+        response = client.post(
+            "/api/v1/validate", params={"profile": "in-house"}, files=files
+        )
+
+    assert response.status_code == 200
+    assert response.json()["profile"] == "in-house"
+    assert response.json()["conforms"] is True
+
+
+def test_validate_timings(client: TestClient):
+    with open("tests/070_simple1.xlsx", "rb") as file:
+        files = {"upload_file": file}
+        response = client.post(
+            "/api/v1/validate", params={"timings": True}, files=files
+        )
+
+    assert response.status_code == 200
+    timings = response.json()["timings"]
+    assert timings["engine"] == "native"
+    assert len(timings["shapes"]) > 0
+    assert {"shape", "kind", "path", "seconds", "focusNodes", "calls"} == set(
+        timings["shapes"][0]
+    )
@@ -1,10 +1,23 @@
-import sys
 import argparse
-from pathlib import Path
 import logging
+import sys
+from pathlib import Path
+
 from vocexcel import profiles
-from vocexcel.utils import EXCEL_FILE_ENDINGS, KNOWN_TEMPLATE_VERSIONS, KNOWN_FILE_ENDINGS, RDF_FILE_ENDINGS, ConversionError
+from vocexcel.cache import VALIDATION_CACHE
 from vocexcel.convert import excel_to_rdf, rdf_to_excel
+from vocexcel.sinks import STREAMING_FORMATS
+from vocexcel.timing import ShapeTimings
+from vocexcel.utils import (
+    COMPRESSION_FILE_ENDINGS,
+    DEFAULT_READER_BACKEND,
+    EXCEL_FILE_ENDINGS,
+    KNOWN_TEMPLATE_VERSIONS,
+    RDF_FILE_ENDINGS,
+    READER_BACKENDS,
+    ConversionError,
+    rdf_file_format,
+)
 
 
 def main(args=None):
@@ -46,6 +59,46 @@ def main(args=None):
         action="store_true"
     )
 
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="The number of worker processes to validate in. Validating in several processes is faster for large "
+        "vocabularies",
+        type=int,
+        default=1,
+    )
+
+    parser.add_argument(
+        "--engine",
+        help="What to validate with. native is a fast validator for profiles using only simple SHACL, such as "
+        "vocpub, that falls back to pyshacl for others. parity validates with both and logs any differences",
+        choices=["native", "pyshacl", "parity"],
+        default="native",
+    )
+
+    parser.add_argument(
+        "--timings",
+        help="Print how long validating with each of the profile's shapes took, slowest first. Applies when "
+        "validating",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--maxproblems",
+        help="The number of problems found in the Excel workbook's cells after which checking stops. Applies to "
+        "templates 0.5.0 and later",
+        type=int,
+        default=100,
+    )
+
+    parser.add_argument(
+        "--cachedir",
+        help="A directory to keep validation reports in, so that vocabularies that haven't changed aren't validated "
+        "again",
+        type=Path,
+        required=False,
+    )
+
     parser.add_argument(
         "-p",
         "--profile",
@@ -56,10 +109,21 @@ def main(args=None):
         default="vocpub-46",
     )
 
+    parser.add_argument(
+        "--profilesdir",
+        help="A directory of the Turtle files of SHACL shapes of more profiles, each named by its profile's token, "
+        "such as myprofile.ttl for the profile myprofile",
+        type=Path,
+        required=False,
+    )
+
     parser.add_argument(
         "-o",
         "--outputfile",
-        help="An optionally-provided output file path. If not provided, output is to standard out.",
+        help="An optionally-provided output file path. If not provided, output is to standard out. When converting "
+        "to several output formats, give either an output file for each format or one file to name them all after, "
+        "such as vocab.ttl for vocab.ttl, vocab.rdf and vocab.json-ld",
+        nargs="+",
         required=False,
     )
 
@@ -67,10 +131,39 @@ def main(args=None):
         "-f",
         "--outputformat",
         help="An optionally-provided output format for RDF outputs. 'graph' returns the in-memory graph object, "
-        "not serialized RDF.",
+        "not serialized RDF. 'nt' and 'nquads' are written out line by line as the workbook is read, unless "
+        "validating. 'snapshot' is a compact binary form of the vocabulary that vocexcel.snapshot.load_snapshot() "
+        "loads much faster than RDF can be parsed. 'vocab-json-ld' is JSON-LD with a fixed @context and the Concepts "
+        "nested under the ConceptScheme. Give several formats to convert to each of them at once: the vocabulary is "
+        "read and validated once and the formats are written in up to -j (--jobs) worker processes.",
+        nargs="+",
+        required=False,
+        choices=["longturtle", "turtle", "xml", "json-ld", "nt", "nquads", "snapshot", "vocab-json-ld", "graph"],
+        default=["longturtle"],
+    )
+
+    parser.add_argument(
+        "--compress",
+        help="Compress the output files as they are written, adding the compression's suffix, such as .gz, to their "
+        "names. Output files already ending with .gz, .bz2 or .xz are compressed without this flag",
+        choices=["gzip", "bz2", "xz"],
         required=False,
-        choices=["longturtle", "turtle", "xml", "json-ld", "graph"],
-        default="longturtle",
+    )
+
+    parser.add_argument(
+        "-r",
+        "--readonly",
+        help="Stream the rows of the Excel workbook rather than loading it fully into memory. Reduces memory use "
+        "for large vocabularies. Applies to templates 0.5.0 and later",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--reader",
+        help="The workbook reader backend. 'xlsx' is VocExcel's own reader that parses only the sheets used in "
+        "conversion. Applies to templates 0.5.0 and later",
+        choices=READER_BACKENDS,
+        default=DEFAULT_READER_BACKEND,
     )
 
     parser.add_argument(
@@ -121,6 +214,9 @@ def main(args=None):
         parser.print_help()
         parser.exit()
 
+    if args.profilesdir is not None:
+        profiles.PROFILES.register_directory(args.profilesdir)
+
     if args.listprofiles:
         s = "Profiles\nToken\tIRI\n-----\t-----\n"
         for k, v in profiles.PROFILES.items():
@@ -137,33 +233,69 @@ def main(args=None):
             f"Known template versions: {', '.join(sorted(KNOWN_TEMPLATE_VERSIONS, reverse=True))}"
         )
     elif args.file_to_convert:
-        if not args.file_to_convert.suffix.lower().endswith(tuple(KNOWN_FILE_ENDINGS)):
+        if args.cachedir is not None:
+            VALIDATION_CACHE.configure(directory=args.cachedir)
+
+        is_excel_file = args.file_to_convert.suffix.lower().endswith(tuple(EXCEL_FILE_ENDINGS))
+        if not is_excel_file and rdf_file_format(args.file_to_convert) is None:
             print(
-                "Files for conversion must either end with .xlsx (Excel) or one of the known RDF file endings, '{}'".format(
-                    "', '".join(RDF_FILE_ENDINGS.keys())
+                "Files for conversion must either end with .xlsx (Excel) or one of the known RDF file endings, '{}', "
+                "optionally compressed with one of the endings '{}'".format(
+                    "', '".join(RDF_FILE_ENDINGS.keys()),
+                    "', '".join(COMPRESSION_FILE_ENDINGS.keys()),
                 )
             )
             parser.exit()
 
         # input file looks like an Excel file, so convert Excel -> RDF
-        if args.file_to_convert.suffix.lower().endswith(tuple(EXCEL_FILE_ENDINGS)):
+        if is_excel_file:
+            output_format = args.outputformat[0] if len(args.outputformat) == 1 else args.outputformat
+            output_file_path = args.outputfile
+            if args.compress is not None:
+                if output_file_path is None:
+                    parser.error("Give an output file (-o) to compress the output")
+                ending = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz"}[args.compress]
+                output_file_path = [
+                    p if p.lower().endswith(ending) else p + ending for p in output_file_path
+                ]
+            if output_file_path is not None and len(output_file_path) == 1:
+                output_file_path = output_file_path[0]
+            if output_file_path is None and not isinstance(output_format, str):
+                parser.error("Give an output file (-o) to convert to several output formats")
+            # streamed formats are written straight to standard out, and snapshots as bytes
+            if output_file_path is None and (
+                output_format in STREAMING_FORMATS or output_format == "vocab-json-ld"
+            ):
+                output_file_path = sys.stdout
+            elif output_file_path is None and output_format == "snapshot":
+                output_file_path = sys.stdout.buffer
+            timings = ShapeTimings() if args.timings and args.validate else None
             try:
                 o = excel_to_rdf(
                     args.file_to_convert,
                     profile=args.profile,
                     sheet_name=args.sheet,
-                    output_file_path=args.outputfile,
-                    output_format=args.outputformat,
+                    output_file_path=output_file_path,
+                    output_format=output_format,
                     error_level=int(args.errorlevel),
                     message_level=int(args.messagelevel),
                     log_file=args.logfile,
                     validate=args.validate,
+                    read_only=args.readonly,
+                    reader=args.reader,
+                    jobs=args.jobs,
+                    engine=args.engine,
+                    max_problems=args.maxproblems,
+                    timings=timings,
                 )
-                if args.outputfile is None:
+                if output_file_path is None:
                     print(o)
             except ConversionError as err:
                 logging.error("{0}".format(err))
                 return 1
+            finally:
+                if timings is not None and timings.timings:
+                    print(timings.table(), file=sys.stderr)
 
         # RDF file ending, so convert RDF -> Excel
         else:
@@ -171,7 +303,7 @@ def main(args=None):
                 o = rdf_to_excel(
                     args.file_to_convert,
                     profile=args.profile,
-                    output_file_path=args.outputfile,
+                    output_file_path=args.outputfile[0] if args.outputfile else None,
                     template_file_path=args.templatefile,
                     error_level=int(args.errorlevel),
                     message_level=int(args.messagelevel),
@@ -0,0 +1,315 @@
+"""A cache of validation reports, keyed by what determines them
+
+The same vocabularies are validated again and again: by CI re-runs, by repeated uploads of the same workbook and by
+batch jobs reprocessing unchanged workbooks. validate_with_profile() looks each graph up in VALIDATION_CACHE before
+validating it and returns the cached report if it has one.
+
+Reports are keyed by a canonical fingerprint of the data graph, the profile, the SHA-256 of the profile's shapes file,
+the error level, which decides whether warnings are allowed, and the validation engine. The fingerprint is the SHA-256
+of the graph's sorted triples, each blank node written as the hash of everything below it, so it doesn't depend on
+blank node ids or on the order triples were added in. Graphs whose blank nodes aren't trees, which the hashes can't
+tell apart, are fingerprinted with rdflib's canonicalisation instead.
+
+Reports are kept in memory, the most recently used maxsize of them. If given a directory, the cache also keeps them
+on disk, removing the least recently used files once they take up more than max_bytes:
+
+    VALIDATION_CACHE.configure(directory=Path.home() / ".cache" / "vocexcel")
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from rdflib import BNode, ConjunctiveGraph, Graph, Literal, URIRef
+from rdflib.compare import to_isomorphic
+from rdflib.term import Node
+
+from vocexcel.report import Severity, ValidationReport, ValidationResult
+from vocexcel.shapes import shapes_file
+
+MAX_SIZE = 128
+MAX_BYTES = 256 * 1024 * 1024
+# increment when the layout of cached reports changes
+CACHED_REPORT_VERSION = 2
+
+CacheKey = Tuple[str, str, str, int, str]
+
+
+class _NotATree(Exception):
+    pass
+
+
+def _term(t: Node) -> str:
+    if isinstance(t, URIRef):
+        return f"<{t}>"
+    # repr() escapes line breaks, so no literal can be confused with a run of triples
+    return f"{str(t)!r}^^{t.datatype}@{t.language}"
+
+
+def _bnode_hashes(triples: List[tuple]) -> Dict[BNode, str]:
+    """Blank node -> the hash of its description, including that of the blank nodes in it"""
+    descriptions: Dict[BNode, list] = {}
+    parents: Set[BNode] = set()
+    for s, p, o in triples:
+        if isinstance(s, BNode):
+            descriptions.setdefault(s, []).append((p, o))
+        if isinstance(o, BNode):
+            if o in parents:
+                raise _NotATree()
+            parents.add(o)
+
+    hashes: Dict[BNode, str] = {}
+
+    def describe(node: BNode, path: set) -> str:
+        if node in hashes:
+            return hashes[node]
+        if node in path:
+            raise _NotATree()
+        path.add(node)
+        lines = sorted(
+            f"{_term(p)} {describe(o, path) if isinstance(o, BNode) else _term(o)}"
+            for p, o in descriptions.get(node, [])
+        )
+        path.discard(node)
+        hashes[node] = "_:" + hashlib.sha256("\n".join(lines).encode()).hexdigest()
+        return hashes[node]
+
+    for node in descriptions.keys() | parents:
+        describe(node, set())
+    return hashes
+
+
+def graph_fingerprint(g: Graph) -> str:
+    """The SHA-256 of g's triples, the same for every graph isomorphic to g"""
+    triples = list(g)
+    try:
+        bnodes = _bnode_hashes(triples)
+    except (_NotATree, RecursionError):
+        return f"rgda1:{to_isomorphic(g).graph_digest():x}"
+
+    def term(t: Node) -> str:
+        return bnodes[t] if isinstance(t, BNode) else _term(t)
+
+    lines = sorted(f"{term(s)} {_term(p)} {term(o)}" for s, p, o in triples)
+    return hashlib.sha256("\n".join(lines).encode()).hexdigest()
+
+
+class _ProfileHashes:
+    """Profile token -> SHA-256 of its shapes file, read again only if the file's modification time changes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hashes: Dict[str, Tuple[int, str]] = {}
+
+    def get(self, profile: str) -> str:
+        path = shapes_file(profile)
+        mtime = path.stat().st_mtime_ns
+        with self._lock:
+            cached = self._hashes.get(profile)
+            if cached is None or cached[0] != mtime:
+                cached = self._hashes[profile] = (
+                    mtime,
+                    hashlib.sha256(path.read_bytes()).hexdigest(),
+                )
+            return cached[1]
+
+
+PROFILE_HASHES = _ProfileHashes()
+
+
+def _encode_term(t: Optional[Node]):
+    # reports are written as JSON, so reading a cache file can't run code, and don't depend on the rdflib version
+    if t is None:
+        return None
+    if isinstance(t, URIRef):
+        return 0, str(t)
+    if isinstance(t, BNode):
+        return 1, str(t)
+    return 2, str(t), t.datatype and str(t.datatype), t.language
+
+
+def _decode_term(t) -> Optional[Node]:
+    if t is None:
+        return None
+    if t[0] == 0:
+        return URIRef(t[1])
+    if t[0] == 1:
+        return BNode(t[1])
+    return Literal(t[1], datatype=t[2], lang=t[3])
+
+
+def _encode(report: ValidationReport) -> bytes:
+    return json.dumps(
+        {
+            "version": CACHED_REPORT_VERSION,
+            "conforms": report.conforms,
+            "profile": report.profile,
+            "results": [
+                (
+                    int(r.severity),
+                    _encode_term(r.focus_node),
+                    _encode_term(r.source_shape),
+                    _encode_term(r.constraint_component),
+                    r.message,
+                    _encode_term(r.path),
+                    _encode_term(r.value),
+                )
+                for r in report.results
+            ],
+        }
+    ).encode("utf-8")
+
+
+def _decode(data: dict) -> Optional[ValidationReport]:
+    if not isinstance(data, dict) or data.get("version") != CACHED_REPORT_VERSION:
+        return None
+    results: List[ValidationResult] = [
+        ValidationResult(
+            Severity(severity),
+            _decode_term(focus_node),
+            _decode_term(source_shape),
+            _decode_term(constraint_component),
+            message,
+            _decode_term(path),
+            _decode_term(value),
+        )
+        for severity, focus_node, source_shape, constraint_component, message, path, value in data[
+            "results"
+        ]
+    ]
+    return ValidationReport(data["conforms"], results, data["profile"])
+
+
+class ValidationCache:
+    """Cache key -> validation report, in memory and optionally on disk, safe to share between threads"""
+
+    def __init__(
+        self,
+        maxsize: int = MAX_SIZE,
+        directory: Optional[Path] = None,
+        max_bytes: int = MAX_BYTES,
+    ):
+        self._lock = threading.Lock()
+        self._reports: "OrderedDict[CacheKey, ValidationReport]" = OrderedDict()
+        self.maxsize = maxsize
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def configure(
+        self,
+        maxsize: Optional[int] = None,
+        directory: Optional[Path] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        with self._lock:
+            if maxsize is not None:
+                self.maxsize = maxsize
+                while len(self._reports) > maxsize:
+                    self._reports.popitem(last=False)
+            if directory is not None:
+                self.directory = Path(directory)
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(
+        data_graph: Graph, profile: str, error_level: int, engine: str
+    ) -> Optional[CacheKey]:
+        """The key of data_graph's report, or None if it can't be cached"""
+        if not isinstance(data_graph, Graph) or isinstance(
+            data_graph, ConjunctiveGraph
+        ):
+            return None
+        return (
+            graph_fingerprint(data_graph),
+            profile,
+            PROFILE_HASHES.get(profile),
+            error_level,
+            engine,
+        )
+
+    def _path(self, key: CacheKey) -> Path:
+        name = hashlib.sha256("\n".join(str(k) for k in key).encode()).hexdigest()
+        return Path(self.directory) / f"{name}.report"
+
+    def get(self, key: CacheKey) -> Optional[ValidationReport]:
+        with self._lock:
+            report = self._reports.get(key)
+            if report is not None:
+                self._reports.move_to_end(key)
+                return report
+        if self.directory is None:
+            return None
+
+        path = self._path(key)
+        try:
+            report = _decode(json.loads(path.read_bytes()))
+            # the least recently used files are removed first
+            os.utime(path)
+        except (OSError, ValueError, TypeError, KeyError, IndexError):
+            return None
+        if report is not None:
+            self._remember(key, report)
+        return report
+
+    def put(self, key: CacheKey, report: ValidationReport):
+        self._remember(key, report)
+        if self.directory is None:
+            return
+        try:
+            path = self._path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(_encode(report))
+            os.replace(tmp, path)
+            self._evict()
+        except OSError:
+            # an unwritable cache directory only means reports aren't kept on disk
+            pass
+
+    def _remember(self, key: CacheKey, report: ValidationReport):
+        with self._lock:
+            self._reports[key] = report
+            self._reports.move_to_end(key)
+            while len(self._reports) > self.maxsize:
+                self._reports.popitem(last=False)
+
+    def _evict(self):
+        files = []
+        for path in Path(self.directory).glob("*.report"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime_ns, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files, key=lambda f: f[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        with self._lock:
+            self._reports.clear()
+        if self.directory is not None:
+            for path in Path(self.directory).glob("*.report"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def __contains__(self, key: CacheKey) -> bool:
+        return key in self._reports
+
+    def __len__(self) -> int:
+        return len(self._reports)
+
+
+VALIDATION_CACHE = ValidationCache()
@@ -0,0 +1,125 @@
+"""Cheap checks of a workbook's cells, made as the 0.6.x and 0.7.0 templates' rows are extracted
+
+Before adding a row's triples, the extractors check that its required cells have values, that its IRIs are HTTP IRIs,
+that status and derivation mode values are known and that language tags are well-formed. Rather than stopping at the
+first problem, a CellChecks collects them all with the sheet and cell they are in. Once it has one, the extractors
+only check the rest of the rows: the workbook won't be converted, so there is no point building its graph, or
+validating it. raise_for_problems() then raises a single CellProblems error listing them all.
+
+So that workbooks with very many problems are rejected without reading them to the end, a CellChecks raises as soon
+as it has max_problems problems.
+"""
+import re
+from datetime import date
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+from rdflib import URIRef
+
+from vocexcel.prefixes import PrefixExpander
+from vocexcel.utils import (
+    ConversionError,
+    expand_namespaces,
+    split_and_tidy_to_strings,
+    string_is_http_iri,
+    to_date,
+)
+
+MAX_PROBLEMS = 100
+# BCP 47 language tags, in the form rdflib accepts
+LANGUAGE_TAG = re.compile(r"^[a-zA-Z]+(?:-[a-zA-Z0-9]+)*$")
+
+
+class CellProblem(NamedTuple):
+    sheet: str
+    cell: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.sheet}!{self.cell}: {self.message}"
+
+
+class CellProblems(ConversionError):
+    """The problems found in a workbook's cells"""
+
+    def __init__(self, problems: List[CellProblem], complete: bool = True):
+        self.problems = list(problems)
+        self.complete = complete
+        if complete:
+            summary = f"Your vocabulary has {len(problems)} problem(s):"
+        else:
+            summary = f"Your vocabulary has at least {len(problems)} problems. Checking stopped at:"
+        super().__init__("\n".join([summary] + [str(p) for p in problems]))
+
+
+class CellChecks:
+    """The problems found so far in a workbook's cells, raising CellProblems once there are max_problems of them"""
+
+    def __init__(self, max_problems: Optional[int] = MAX_PROBLEMS):
+        self.max_problems = max_problems
+        self.problems: List[CellProblem] = []
+
+    def add(self, sheet, cell: str, message: str):
+        self.problems.append(CellProblem(sheet.title, cell, message))
+        if self.max_problems is not None and len(self.problems) >= self.max_problems:
+            raise CellProblems(self.problems, complete=False)
+
+    def raise_for_problems(self):
+        if self.problems:
+            raise CellProblems(self.problems)
+
+    def required(self, sheet, cell: str, value, message: str) -> bool:
+        if value is None:
+            self.add(sheet, cell, message)
+            return False
+        return True
+
+    def iri(
+        self, sheet, cell: str, value, prefixes: Optional[PrefixExpander] = None
+    ) -> Optional[Union[URIRef, str]]:
+        """The value, prefixes expanded if given, if it's an HTTP IRI"""
+        iri = expand_namespaces(value, prefixes) if prefixes is not None else value
+        iri_conv = string_is_http_iri(str(iri))
+        if not iri_conv[0]:
+            self.add(sheet, cell, iri_conv[1])
+            return None
+        return iri
+
+    def iris(self, sheet, cell: str, value, prefixes: PrefixExpander) -> list:
+        """The IRIs in a comma- or line-separated list, prefixes expanded"""
+        iris = []
+        for s in split_and_tidy_to_strings(value):
+            iri = self.iri(sheet, cell, s.strip(), prefixes)
+            if iri is not None:
+                iris.append(iri)
+        return iris
+
+    def date(self, sheet, cell: str, value) -> Optional[date]:
+        try:
+            return to_date(value)
+        except ConversionError as e:
+            self.add(sheet, cell, str(e))
+            return None
+
+    def one_of(self, sheet, cell: str, value, allowed: dict, what: str) -> bool:
+        if value not in allowed:
+            self.add(
+                sheet,
+                cell,
+                f"You have supplied a {what} of {value} but it is not recognised. "
+                f"If supplied, it must be one of {', '.join(allowed.keys())}",
+            )
+            return False
+        return True
+
+    def label(self, sheet, cell: str, value: str) -> Tuple[str, Optional[str]]:
+        """A label's text and, if written as text@lang, its language tag"""
+        value = value.strip()
+        if "@" not in value:
+            return value, None
+        text, _, lang = value.rpartition("@")
+        if not LANGUAGE_TAG.match(lang):
+            self.add(
+                sheet, cell, f"The language tag '{lang}' of '{value}' is not valid"
+            )
+            return text, None
+        return text, lang
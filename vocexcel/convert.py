@@ -4,6 +4,7 @@ from typing import BinaryIO, Literal, Optional
 from pydantic.error_wrappers import ValidationError
 
 from vocexcel import models
+from vocexcel.checks import MAX_PROBLEMS
 from vocexcel.convert_021 import (
     extract_concepts_and_collections as extract_concepts_and_collections_021,
 )
@@ -31,16 +32,27 @@ from vocexcel.convert_043 import (
 from vocexcel.convert_060 import excel_to_rdf as excel_to_rdf_060
 from vocexcel.convert_063 import excel_to_rdf as excel_to_rdf_063
 from vocexcel.convert_070 import excel_to_rdf as excel_to_rdf_070
+from vocexcel.export import write_outputs
+from vocexcel.hierarchy import HierarchyIndex
+from vocexcel.incremental import IncrementalValidation
+from vocexcel.sinks import STREAMING_FORMATS, make_sink
+from vocexcel.timing import ShapeTimings
 from vocexcel.utils import (
+    COMPRESSION_FILE_ENDINGS,
+    DEFAULT_READER_BACKEND,
     RDF_FILE_ENDINGS,
     ConversionError,
-    get_template_version,
+    compression_file_ending,
     load_template,
     load_workbook,
-    validate_with_profile,
+    open_file,
+    rdf_file_format,
+    sniff_template_version,
 )
+from vocexcel.validation import validate_with_profile
 
 TEMPLATE_VERSION = None
+STREAMABLE_TEMPLATE_VERSIONS = ["0.5.0", "0.6.0", "0.6.1", "0.6.2", "0.6.3", "0.7.0"]
 
 
 def excel_to_rdf(
@@ -48,16 +60,90 @@ def excel_to_rdf(
     profile="vocpub-46",
     sheet_name: Optional[str] = None,
     output_file_path: Optional[Path] = None,
-    output_format: Literal["turtle", "xml", "json-ld", "graph"] = "longturtle",
+    output_format: Literal[
+        "longturtle",
+        "turtle",
+        "xml",
+        "json-ld",
+        "nt",
+        "nquads",
+        "snapshot",
+        "vocab-json-ld",
+        "graph",
+    ] = "longturtle",
     error_level=1,  # TODO: list Literal possible values
     message_level=1,  # TODO: list Literal possible values
     log_file: Optional[Path] = None,
     validate: Optional[bool] = False,
+    read_only: Optional[bool] = False,
+    reader: Literal["openpyxl", "xlsx"] = DEFAULT_READER_BACKEND,
+    hierarchy: Optional[HierarchyIndex] = None,
+    incremental: Optional[IncrementalValidation] = None,
+    jobs: int = 1,
+    engine: str = "native",
+    max_problems: Optional[int] = MAX_PROBLEMS,
+    timings: Optional[ShapeTimings] = None,
 ):
-    """Converts a sheet within an Excel workbook to an RDF file"""
-    wb = load_workbook(file_to_convert_path)
-    template_version = get_template_version(wb)
+    """Converts a sheet within an Excel workbook to an RDF file
+
+    read_only: stream the workbook's rows rather than loading every cell. Templates 0.5.0+ only
+    reader: the workbook reader backend, "openpyxl" or "xlsx". Templates 0.5.0+ only
+    hierarchy: a HierarchyIndex to index the vocabulary's Concept hierarchy into
+    incremental: an IncrementalValidation, kept between conversions, to only validate what changed
+    jobs: the number of worker processes to validate and write outputs in
+    engine: the validation engine, "native", "pyshacl" or "parity"
+    output_format: a format, or a list of formats to write the one graph in
+    max_problems: the number of workbook problems to stop checking at, or None to check every cell
+    timings: a ShapeTimings to record the time spent validating with each shape in
+    """
+    template_version = sniff_template_version(file_to_convert_path)
+    if template_version in STREAMABLE_TEMPLATE_VERSIONS:
+        wb = load_workbook(file_to_convert_path, read_only=read_only, backend=reader)
+    else:
+        # the pre-0.5.0 extractors rely on random access to cells
+        wb = load_workbook(file_to_convert_path)
 
+    try:
+        return _convert_workbook(
+            wb,
+            template_version,
+            profile,
+            sheet_name,
+            output_file_path,
+            output_format,
+            error_level,
+            message_level,
+            log_file,
+            validate,
+            hierarchy,
+            incremental,
+            jobs,
+            engine,
+            max_problems,
+            timings,
+        )
+    finally:
+        wb.close()
+
+
+def _convert_workbook(
+    wb,
+    template_version,
+    profile,
+    sheet_name,
+    output_file_path,
+    output_format,
+    error_level,
+    message_level,
+    log_file,
+    validate,
+    hierarchy=None,
+    incremental=None,
+    jobs=1,
+    engine="native",
+    max_problems=MAX_PROBLEMS,
+    timings=None,
+):
     if template_version in ["0.7.0"]:
         return excel_to_rdf_070(
             wb,
@@ -69,6 +155,12 @@ def excel_to_rdf(
             message_level,
             log_file,
             template_version,
+            hierarchy,
+            incremental,
+            jobs,
+            engine,
+            max_problems,
+            timings,
         )
 
     # The way the voc is made - which Excel sheets to use - is dependent on the particular template version
@@ -83,6 +175,12 @@ def excel_to_rdf(
             message_level,
             log_file,
             template_version,
+            hierarchy,
+            incremental,
+            jobs,
+            engine,
+            max_problems,
+            timings,
         )
 
     elif template_version in ["0.5.0", "0.6.0", "0.6.1"]:
@@ -95,6 +193,12 @@ def excel_to_rdf(
             error_level,
             message_level,
             log_file,
+            hierarchy,
+            incremental,
+            jobs,
+            engine,
+            max_problems,
+            timings,
         )
 
     elif template_version in ["0.4.3", "0.4.4"]:
@@ -146,9 +250,19 @@ def excel_to_rdf(
             raise ConversionError(f"ConceptScheme processing error: {e}")
 
     # Build the total vocab
-    vocab_graph = models.Vocabulary(
+    vocab = models.Vocabulary(
         concept_scheme=cs, concepts=concepts, collections=collections
-    ).to_graph()
+    )
+
+    if output_format in STREAMING_FORMATS and not validate:
+        # write the triples out as they are made rather than building a graph
+        with make_sink(output_format, output_file_path) as sink:
+            vocab.to_graph(sink, hierarchy)
+            if output_file_path is None:
+                return sink.getvalue()
+        return
+
+    vocab_graph = vocab.to_graph(hierarchy=hierarchy)
 
     if validate:
         validate_with_profile(
@@ -157,15 +271,13 @@ def excel_to_rdf(
             error_level=error_level,
             message_level=message_level,
             log_file=log_file,
+            incremental=incremental,
+            jobs=jobs,
+            engine=engine,
+            timings=timings,
         )
 
-    if output_file_path is not None:
-        vocab_graph.serialize(destination=str(output_file_path), format=output_format)
-    else:  # print to std out
-        if output_format == "graph":
-            return vocab_graph
-        else:
-            return vocab_graph.serialize(format=output_format)
+    return write_outputs(vocab_graph, output_format, output_file_path, jobs)
 
 
 def rdf_to_excel(
@@ -177,29 +289,33 @@ def rdf_to_excel(
     message_level=1,
     log_file=None,
 ):
+    """Converts an RDF file, which may be compressed, as vocab.ttl.gz is, to an Excel workbook"""
     if type(file_to_convert_path) is str:
         file_to_convert_path = Path(file_to_convert_path)
-    if not file_to_convert_path.name.endswith(tuple(RDF_FILE_ENDINGS.keys())):
+    rdf_format = rdf_file_format(file_to_convert_path)
+    if rdf_format is None:
         raise ValueError(
-            "Files for conversion to Excel must end with one of the RDF file formats: '{}'".format(
-                "', '".join(RDF_FILE_ENDINGS.keys())
+            "Files for conversion to Excel must end with one of the RDF file formats: '{}', optionally followed by "
+            "one of the compression suffixes '{}'".format(
+                "', '".join(RDF_FILE_ENDINGS.keys()),
+                "', '".join(COMPRESSION_FILE_ENDINGS.keys()),
             )
         )
 
+    from rdflib import Graph
+    from rdflib.namespace import DCAT, DCTERMS, OWL, PROV, RDF, RDFS, SKOS
+
+    with open_file(file_to_convert_path, "rb") as f:
+        g = Graph().parse(f, format=rdf_format)
+
     validate_with_profile(
-        str(file_to_convert_path),
+        g,
         profile=profile,
         error_level=error_level,
         message_level=message_level,
         log_file=log_file,
     )
     # the RDF is valid so extract data and create Excel
-    from rdflib import Graph
-    from rdflib.namespace import DCAT, DCTERMS, OWL, PROV, RDF, RDFS, SKOS
-
-    g = Graph().parse(
-        str(file_to_convert_path), format=RDF_FILE_ENDINGS[file_to_convert_path.suffix]
-    )
 
     if template_file_path is None:
         wb = load_template(file_path=(Path(__file__).parent / "blank_043.xlsx"))
@@ -363,7 +479,10 @@ def rdf_to_excel(
     if output_file_path is not None:
         dest = output_file_path
     else:
-        dest = file_to_convert_path.with_suffix(".xlsx")
+        # vocab.ttl.gz is written to vocab.xlsx
+        dest = file_to_convert_path
+        if compression_file_ending(dest):
+            dest = dest.with_suffix("")
+        dest = dest.with_suffix(".xlsx")
     wb.save(filename=dest)
     return dest
-
@@ -6,12 +6,14 @@ from pydantic import ValidationError
 
 try:
     import models
+    from prefixes import PrefixExpander
     from utils import ConversionError, load_workbook, split_and_tidy_to_strings
 except ImportError:
     import sys
 
     sys.path.append("..")
     from vocexcel import models
+    from vocexcel.prefixes import PrefixExpander
     from vocexcel.utils import ConversionError, load_workbook, split_and_tidy_to_strings
 
 
@@ -27,7 +29,7 @@ def only_one_colon_in_str(string):
 
 
 # function in creating a dictionary / recalling from a dictionary.
-def create_prefix_dict(s: Worksheet):
+def create_prefix_dict(s: Worksheet) -> PrefixExpander:
     # create an empty dict
     prefix_dict = {}
 
@@ -49,7 +51,7 @@ def create_prefix_dict(s: Worksheet):
                     raise ConversionError(
                         f"Prefix processing error, sheet {s}, row {row}, error: {e}"
                     )
-    return prefix_dict
+    return PrefixExpander(prefix_dict)
 
 
 # prefix and namespace use without list output
@@ -60,10 +62,9 @@ def using_prefix_and_namespace_non_list_output(cell_value, prefix, s: Worksheet,
             pass
         elif only_one_colon_in_str(c):
             split_c_prefix = c.split(":")[0]
-            split_c_added_component = c.split(":")[1]
 
             if split_c_prefix in prefix:
-                c = prefix[split_c_prefix] + split_c_added_component
+                c = prefix.expand(c)
             else:
                 print(
                     f"the prefix used: '{split_c_prefix}' in sheet {s} and row {row} "
@@ -87,10 +88,9 @@ def using_prefix_and_namespace_cs(cell_value, prefix):
             pass
         elif only_one_colon_in_str(c):
             split_c_prefix = c.split(":")[0]
-            split_c_added_component = c.split(":")[1]
 
             if split_c_prefix in prefix:
-                c = prefix[split_c_prefix] + split_c_added_component
+                c = prefix.expand(c)
             else:
                 print(
                     f"the prefix used: '{split_c_prefix}' in the concept scheme page"
@@ -117,10 +117,9 @@ def using_prefix_and_namespace(cell_value, prefix, s: Worksheet, row):
                     pass
                 elif only_one_colon_in_str(c):
                     split_c_prefix = c.split(":")[0]
-                    split_c_added_component = c.split(":")[1]
 
                     if split_c_prefix in prefix:
-                        c = prefix[split_c_prefix] + split_c_added_component
+                        c = prefix.expand(c)
                     else:
                         print(
                             f"the prefix used: '{split_c_prefix}' in sheet {s} and row {row} "
@@ -4,237 +4,261 @@ from typing import Optional
 
 from openpyxl.workbook.workbook import Workbook
 from openpyxl.worksheet.worksheet import Worksheet
-from rdflib import BNode, Graph, Literal, Namespace, URIRef
+from rdflib import BNode, Graph, Literal, Namespace
 from rdflib.namespace import OWL, PROV, RDF, RDFS, SDO, SKOS, XSD
 
 REG = Namespace("http://purl.org/linked-data/registry#")
 
 try:
     import models
+    from checks import MAX_PROBLEMS, CellChecks
+    from export import write_outputs
+    from hierarchy import HierarchyIndex
+    from incremental import IncrementalValidation
+    from prefixes import PrefixExpander
+    from sinks import STREAMING_FORMATS, make_sink
+    from terms import TERMS
+    from timing import ShapeTimings
     from utils import (
         STATUSES,
         VOCDERMODS,
         ConversionError,
-        add_top_concepts,
+        add_triples,
         bind_namespaces,
-        expand_namespaces,
         id_from_iri,
+        iter_sheet_rows,
         load_workbook,
         make_agent,
         make_iri,
-        split_and_tidy_to_iris,
+        read_sheet_values,
         split_and_tidy_to_strings,
         string_from_iri,
-        string_is_http_iri,
-        validate_with_profile,
     )
+    from validation import validate_with_profile
 except ImportError:
     import sys
 
     sys.path.append("..")
     from vocexcel import models
+    from vocexcel.checks import MAX_PROBLEMS, CellChecks
+    from vocexcel.export import write_outputs
+    from vocexcel.hierarchy import HierarchyIndex
+    from vocexcel.incremental import IncrementalValidation
+    from vocexcel.prefixes import PrefixExpander
+    from vocexcel.sinks import STREAMING_FORMATS, make_sink
+    from vocexcel.terms import TERMS
+    from vocexcel.timing import ShapeTimings
     from vocexcel.utils import (
         STATUSES,
         VOCDERMODS,
         ConversionError,
-        add_top_concepts,
+        add_triples,
         bind_namespaces,
-        expand_namespaces,
         id_from_iri,
+        iter_sheet_rows,
         load_workbook,
         make_agent,
         make_iri,
-        split_and_tidy_to_iris,
+        read_sheet_values,
         split_and_tidy_to_strings,
         string_from_iri,
-        string_is_http_iri,
-        validate_with_profile,
     )
+    from vocexcel.validation import validate_with_profile
 
 
-def extract_prefixes(sheet: Worksheet) -> dict[str, Namespace]:
+def extract_prefixes(sheet: Worksheet) -> PrefixExpander:
     prefixes = {}
-    i = 3
-    while True:
-        pre = sheet[f"A{i}"].value
-        if pre is None:
-            break
-        else:
-            proper_pre = str(pre) if str(pre).endswith(":") else str(pre) + ":"
-            prefixes[proper_pre] = sheet[f"B{i}"].value
+    for pre, ns in iter_sheet_rows(sheet, min_row=3, max_col=2):
+        prefixes[pre] = ns
 
-        i += 1
-
-    return prefixes
+    return PrefixExpander(prefixes)
 
 
 def extract_concept_scheme(
-    sheet: Worksheet, prefixes, template_version="0.7.0"
+    sheet: Worksheet,
+    prefixes,
+    template_version="0.7.0",
+    g=None,
+    checks: Optional[CellChecks] = None,
 ) -> tuple[Graph, str]:
-    iri_s = sheet["B3"].value
-    title = sheet["B4"].value
-    description = sheet["B5"].value
-    created = sheet["B6"].value
-    modified = sheet["B7"].value
-    creator = sheet["B8"].value
-    publisher = sheet["B9"].value
+    own_checks = checks is None
+    if own_checks:
+        checks = CellChecks()
+    cells = read_sheet_values(sheet, "B3:B16")
+    iri_s = cells["B3"]
+    title = cells["B4"]
+    description = cells["B5"]
+    created = cells["B6"]
+    modified = cells["B7"]
+    creator = cells["B8"]
+    publisher = cells["B9"]
     if template_version == "0.6.2":
-        custodian = sheet["B12"].value
-        version = str(sheet["B10"].value).strip("'")
-        history_note = sheet["B11"].value
+        custodian = cells["B12"]
+        version = str(cells["B10"]).strip("'")
+        history_note = cells["B11"]
+        history_note_cell = "B11"
         status = None
         derived_from = None
         voc_der_mod = None
         themes = None
     else:  # 0.6.3
-        custodian = sheet["B10"].value
-        version = str(sheet["B11"].value).strip("'")
-        history_note = sheet["B12"].value
-        status = sheet["B13"].value
-        derived_from = sheet["B14"].value
-        voc_der_mod = sheet["B15"].value
-        themes = split_and_tidy_to_strings(sheet["B16"].value)
-
-    if iri_s is None:
-        raise ConversionError(
-            "Your vocabulary has no IRI. Please add it to the Concept Scheme sheet"
-        )
-    else:
-        iri = make_iri(iri_s, prefixes)
-
-    if title is None:
-        raise ConversionError(
-            "Your vocabulary has no title. Please add it to the Concept Scheme sheet"
-        )
-
-    if description is None:
-        raise ConversionError(
-            "Your vocabulary has no description. Please add it to the Concept Scheme sheet"
-        )
-
-    if created is None:
-        raise ConversionError(
-            "Your vocabulary has no created date. Please add it to the Concept Scheme sheet"
-        )
-
-    if modified is None:
-        raise ConversionError(
-            "Your vocabulary has no modified date. Please add it to the Concept Scheme sheet"
-        )
-
-    if creator is None:
-        raise ConversionError(
-            "Your vocabulary has no creator. Please add it to the Concept Scheme sheet"
-        )
-
-    if publisher is None:
-        raise ConversionError(
-            "Your vocabulary has no publisher. Please add it to the Concept Scheme sheet"
-        )
-
-    if history_note is None:
-        raise ConversionError(
-            "Your vocabulary has no History Note statement. Please add it to the Concept Scheme sheet"
+        custodian = cells["B10"]
+        version = str(cells["B11"]).strip("'")
+        history_note = cells["B12"]
+        history_note_cell = "B12"
+        status = cells["B13"]
+        derived_from = cells["B14"]
+        voc_der_mod = cells["B15"]
+        themes = split_and_tidy_to_strings(cells["B16"])
+
+    iri = None
+    if checks.required(
+        sheet,
+        "B3",
+        iri_s,
+        "Your vocabulary has no IRI. Please add it to the Concept Scheme sheet",
+    ):
+        iri = checks.iri(sheet, "B3", iri_s, prefixes)
+
+    for cell, value, what in [
+        ("B4", title, "title"),
+        ("B5", description, "description"),
+        ("B6", created, "created date"),
+        ("B7", modified, "modified date"),
+        ("B8", creator, "creator"),
+        ("B9", publisher, "publisher"),
+        (history_note_cell, history_note, "History Note statement"),
+    ]:
+        checks.required(
+            sheet,
+            cell,
+            value,
+            f"Your vocabulary has no {what}. Please add it to the Concept Scheme sheet",
         )
+    if created is not None:
+        created = checks.date(sheet, "B6", created)
+    if modified is not None:
+        modified = checks.date(sheet, "B7", modified)
 
-    if status is not None and status not in STATUSES:
-        raise ConversionError(
-            f"You have supplied a status for your vocab of {status} but it is not recognised. "
-            f"If supplied, it must be one of {', '.join(STATUSES.keys())}"
-        )
+    if status is not None:
+        checks.one_of(sheet, "B13", status, STATUSES, "status for your vocab")
 
     if derived_from is not None:
-        if voc_der_mod is None:
-            raise ConversionError(
-                "If you supply a 'Derived From' value - IRI of another vocab - "
-                "you must also supply a 'Derivation Mode' value"
+        if checks.required(
+            sheet,
+            "B15",
+            voc_der_mod,
+            "If you supply a 'Derived From' value - IRI of another vocab - "
+            "you must also supply a 'Derivation Mode' value",
+        ):
+            checks.one_of(
+                sheet,
+                "B15",
+                voc_der_mod,
+                VOCDERMODS,
+                "vocab derivation mode for your vocab",
             )
 
-        if voc_der_mod not in VOCDERMODS:
-            raise ConversionError(
-                f"You have supplied a vocab derivation mode for your vocab of {voc_der_mod} but it is not recognised. "
-                f"If supplied, it must be one of {', '.join(VOCDERMODS.keys())}"
-            )
+        derived_from = checks.iri(sheet, "B14", derived_from, prefixes)
 
-        derived_from = make_iri(derived_from, prefixes)
+    if checks.problems:
+        if own_checks:
+            checks.raise_for_problems()
+        return g, iri
 
-    g = Graph(bind_namespaces="rdflib")
+    if g is None:
+        g = Graph(bind_namespaces="rdflib")
+        bind_namespaces(g, prefixes)
     g.add((iri, RDF.type, SKOS.ConceptScheme))
     g.add((iri, SKOS.prefLabel, Literal(title, lang="en")))
     g.add((iri, SKOS.definition, Literal(description, lang="en")))
-    g.add((iri, SDO.dateCreated, Literal(created.date(), datatype=XSD.date)))
-    g.add((iri, SDO.dateModified, Literal(modified.date(), datatype=XSD.date)))
-    g.add((iri, SKOS.historyNote, Literal(history_note, lang="en")))
+    g.add((iri, SDO.dateCreated, TERMS.literal(created, datatype=XSD.date)))
+    g.add((iri, SDO.dateModified, TERMS.literal(modified, datatype=XSD.date)))
+    g.add((iri, SKOS.historyNote, TERMS.literal(history_note, lang="en")))
 
-    g += make_agent(creator, SDO.creator, prefixes, iri)
+    make_agent(creator, SDO.creator, prefixes, iri, g)
 
-    g += make_agent(publisher, SDO.publisher, prefixes, iri)
+    make_agent(publisher, SDO.publisher, prefixes, iri, g)
 
     if custodian is not None:
         for _custodian in split_and_tidy_to_strings(custodian):
             ISOROLES = Namespace(
                 "http://def.isotc211.org/iso19115/-1/2018/CitationAndResponsiblePartyInformation/code/CI_RoleCode/"
             )
-            g += make_agent(_custodian, ISOROLES.custodian, prefixes, iri)
+            make_agent(_custodian, ISOROLES.custodian, prefixes, iri, g)
             g.bind("isoroles", ISOROLES)
 
     if version is not None:
-        g.add((iri, SDO.version, Literal(str(version))))
-        g.add((iri, OWL.versionIRI, URIRef(iri + "/" + str(version))))
+        g.add((iri, SDO.version, TERMS.literal(str(version))))
+        g.add((iri, OWL.versionIRI, TERMS.uriref(iri + "/" + str(version))))
 
     if status is not None:
-        g.add((iri, REG.status, URIRef(STATUSES[status])))
+        g.add((iri, REG.status, TERMS.uriref(STATUSES[status])))
 
     if derived_from is not None:
         qd = BNode()
         g.add((iri, PROV.qualifiedDerivation, qd))
-        g.add((qd, PROV.entity, URIRef(derived_from)))
-        g.add((qd, PROV.hadRole, URIRef(VOCDERMODS[voc_der_mod])))
+        g.add((qd, PROV.entity, TERMS.uriref(derived_from)))
+        g.add((qd, PROV.hadRole, TERMS.uriref(VOCDERMODS[voc_der_mod])))
 
     if themes is not None:
         for theme in themes:
             try:
                 theme = make_iri(theme, prefixes)
             except ConversionError:
-                theme = Literal(theme)
+                theme = TERMS.literal(theme)
             g.add((iri, SDO.keywords, theme))
 
-    bind_namespaces(g, prefixes)
     return g, iri
 
 
-def extract_concepts(sheet: Worksheet, prefixes, cs_iri) -> Graph:
-    g = Graph(bind_namespaces="rdflib")
-    i = 4
-    while True:
-        # get values
-        iri_s = sheet[f"A{i}"].value
-        pref_label = sheet[f"B{i}"].value
-        definition = sheet[f"C{i}"].value
-        alt_labels = sheet[f"D{i}"].value
-        narrower = sheet[f"E{i}"].value
-        history_note = sheet[f"F{i}"].value
-        source = sheet[f"G{i}"].value
-        home = sheet[f"H{i}"].value
-
-        # check values
-        if iri_s is None:
-            break
-
-        iri = expand_namespaces(iri_s, prefixes)
-        iri_conv = string_is_http_iri(str(iri))
-        if not iri_conv[0]:
-            raise ConversionError(iri_conv[1])
-
-        if pref_label is None:
-            raise ConversionError(
-                f"You must provide a Preferred Label for Concept {iri_s}"
-            )
-
-        if definition is None:
-            raise ConversionError(f"You must provide a Definition for Concept {iri_s}")
-
-        i += 1
+def extract_concepts(
+    sheet: Worksheet,
+    prefixes,
+    cs_iri,
+    g=None,
+    hierarchy: Optional[HierarchyIndex] = None,
+    checks: Optional[CellChecks] = None,
+) -> Graph:
+    own_checks = checks is None
+    if own_checks:
+        checks = CellChecks()
+    if g is None:
+        g = Graph(bind_namespaces="rdflib")
+        bind_namespaces(g, prefixes)
+    for row, (
+        iri_s,
+        pref_label,
+        definition,
+        alt_labels,
+        narrower,
+        history_note,
+        source,
+        home,
+    ) in enumerate(iter_sheet_rows(sheet, min_row=4, max_col=8), start=4):
+        iri = checks.iri(sheet, f"A{row}", iri_s, prefixes)
+        if checks.required(
+            sheet,
+            f"B{row}",
+            pref_label,
+            f"You must provide a Preferred Label for Concept {iri_s}",
+        ):
+            pref_label, lang = checks.label(sheet, f"B{row}", pref_label)
+        checks.required(
+            sheet,
+            f"C{row}",
+            definition,
+            f"You must provide a Definition for Concept {iri_s}",
+        )
+        narrowers = (
+            checks.iris(sheet, f"E{row}", narrower, prefixes)
+            if narrower is not None
+            else []
+        )
+        if home is not None:
+            checks.iri(sheet, f"H{row}", home.strip())
+        if checks.problems:
+            continue
 
         # ignore example Concepts
         if iri_s in [
@@ -244,71 +268,87 @@ def extract_concepts(sheet: Worksheet, prefixes, cs_iri) -> Graph:
         ]:
             continue
 
+        if hierarchy is not None:
+            hierarchy.add_concept(iri)
+
         # create Graph
         g.add((iri, RDF.type, SKOS.Concept))
         g.add((iri, SKOS.inScheme, cs_iri))
         if str(iri).startswith(str(cs_iri)):
             g.add((iri, RDFS.isDefinedBy, cs_iri))
-        if "@" in pref_label:
-            val, lang = pref_label.strip().split("@")
-            g.add((iri, SKOS.prefLabel, Literal(val, lang=lang)))
-        else:
-            g.add((iri, SKOS.prefLabel, Literal(pref_label.strip(), lang="en")))
+        g.add((iri, SKOS.prefLabel, Literal(pref_label, lang=lang or "en")))
         g.add((iri, SKOS.definition, Literal(definition.strip(), lang="en")))
 
         if alt_labels is not None:
             for al in split_and_tidy_to_strings(alt_labels):
                 g.add((iri, SKOS.altLabel, Literal(al, lang="en")))
 
-        if narrower is not None:
-            for n in split_and_tidy_to_iris(narrower, prefixes):
-                g.add((iri, SKOS.narrower, n))
+        for n in narrowers:
+            g.add((iri, SKOS.narrower, n))
+            if hierarchy is not None:
+                hierarchy.add_narrower(iri, n)
 
         if history_note is not None:
-            g.add((iri, SKOS.historyNote, Literal(history_note.strip())))
+            g.add((iri, SKOS.historyNote, TERMS.literal(history_note.strip())))
 
         if source is not None:
             for _source in split_and_tidy_to_strings(source):
                 g.add(
-                    (iri, SDO.citation, Literal(_source.strip(), datatype=XSD.anyURI))
+                    (
+                        iri,
+                        SDO.citation,
+                        TERMS.literal(_source.strip(), datatype=XSD.anyURI),
+                    )
                 )
 
         if home is not None:
-            g.add((iri, RDFS.isDefinedBy, URIRef(home.strip())))
+            g.add((iri, RDFS.isDefinedBy, TERMS.uriref(home.strip())))
 
-    bind_namespaces(g, prefixes)
+    if own_checks:
+        checks.raise_for_problems()
     return g
 
 
-def extract_collections(sheet: Worksheet, prefixes, cs_iri) -> Graph:
-    g = Graph(bind_namespaces="rdflib")
-    i = 4
-    while True:
-        # get values
-        iri_s = sheet[f"A{i}"].value
-        pref_label = sheet[f"B{i}"].value
-        definition = sheet[f"C{i}"].value
-        members = sheet[f"D{i}"].value
-        history_note = sheet[f"E{i}"].value
-
-        # check values
-        if iri_s is None:
-            break
-
-        iri = expand_namespaces(iri_s, prefixes)
-        iri_conv = string_is_http_iri(str(iri))
-        if not iri_conv[0]:
-            raise ConversionError(iri_conv[1])
-
-        if pref_label is None:
-            raise ConversionError(
-                f"You must provide a Preferred Label for Collection {iri_s}"
-            )
-
-        if definition is None:
-            raise ConversionError(
-                f"You must provide a Definition for Collection {iri_s}"
-            )
+def extract_collections(
+    sheet: Worksheet,
+    prefixes,
+    cs_iri,
+    g=None,
+    checks: Optional[CellChecks] = None,
+) -> Graph:
+    own_checks = checks is None
+    if own_checks:
+        checks = CellChecks()
+    if g is None:
+        g = Graph(bind_namespaces="rdflib")
+        bind_namespaces(g, prefixes)
+    for row, (
+        iri_s,
+        pref_label,
+        definition,
+        members,
+        history_note,
+    ) in enumerate(iter_sheet_rows(sheet, min_row=4, max_col=5), start=4):
+        iri = checks.iri(sheet, f"A{row}", iri_s, prefixes)
+        checks.required(
+            sheet,
+            f"B{row}",
+            pref_label,
+            f"You must provide a Preferred Label for Collection {iri_s}",
+        )
+        checks.required(
+            sheet,
+            f"C{row}",
+            definition,
+            f"You must provide a Definition for Collection {iri_s}",
+        )
+        member_iris = (
+            checks.iris(sheet, f"D{row}", members, prefixes)
+            if members is not None
+            else []
+        )
+        if checks.problems:
+            continue
 
         # create Graph
         g.add((iri, RDF.type, SKOS.Collection))
@@ -319,81 +359,106 @@ def extract_collections(sheet: Worksheet, prefixes, cs_iri) -> Graph:
         g.add((iri, SKOS.prefLabel, Literal(pref_label, lang="en")))
         g.add((iri, SKOS.definition, Literal(definition, lang="en")))
 
-        if members is not None:
-            for n in split_and_tidy_to_iris(members, prefixes):
-                g.add((iri, SKOS.member, n))
+        for n in member_iris:
+            g.add((iri, SKOS.member, n))
 
         if history_note is not None:
-            g.add((iri, SKOS.historyNote, Literal(history_note.strip())))
+            g.add((iri, SKOS.historyNote, TERMS.literal(history_note.strip())))
 
-        i += 1
-
-    bind_namespaces(g, prefixes)
+    if own_checks:
+        checks.raise_for_problems()
     return g
 
 
-def extract_additions_concept_properties(sheet: Worksheet, prefixes) -> Graph:
-    g = Graph(bind_namespaces="rdflib")
-    i = 4
-    while True:
-        # get values
-        iri_s = sheet[f"A{i}"].value
-        related_s = sheet[f"B{i}"].value
-        close_s = sheet[f"C{i}"].value
-        exact_s = sheet[f"D{i}"].value
-        narrow_s = sheet[f"E{i}"].value
-        broad_s = sheet[f"F{i}"].value
-        notation_s = sheet[f"G{i}"].value
-        notation_type_s = sheet[f"H{i}"].value
-
-        # check values
-        if iri_s is None:
-            break
-
-        i += 1
-
+def extract_additions_concept_properties(
+    sheet: Worksheet, prefixes, g=None, checks: Optional[CellChecks] = None
+) -> Graph:
+    own_checks = checks is None
+    if own_checks:
+        checks = CellChecks()
+    if g is None:
+        g = Graph(bind_namespaces="rdflib")
+        bind_namespaces(g, prefixes)
+    for row, (
+        iri_s,
+        related_s,
+        close_s,
+        exact_s,
+        narrow_s,
+        broad_s,
+        notation_s,
+        notation_type_s,
+    ) in enumerate(iter_sheet_rows(sheet, min_row=4, max_col=8), start=4):
         # ignore example Concepts
         if iri_s in [
             "http://example.com/geology",
         ]:
             continue
 
-        # create Graph
-        iri = make_iri(iri_s, prefixes)
-        if related_s is not None:
-            related = make_iri(related_s, prefixes)
-            g.add((iri, SKOS.relatedMatch, related))
-
-        if close_s is not None:
-            close = make_iri(close_s, prefixes)
-            g.add((iri, SKOS.closeMatch, close))
-
-        if exact_s is not None:
-            exact = make_iri(exact_s, prefixes)
-            g.add((iri, SKOS.exactMatch, exact))
-
-        if narrow_s is not None:
-            narrow = make_iri(narrow_s, prefixes)
-            g.add((iri, SKOS.narrowMatch, narrow))
+        iri = checks.iri(sheet, f"A{row}", iri_s, prefixes)
+        matches = [
+            (predicate, checks.iri(sheet, f"{column}{row}", value, prefixes))
+            for column, value, predicate in [
+                ("B", related_s, SKOS.relatedMatch),
+                ("C", close_s, SKOS.closeMatch),
+                ("D", exact_s, SKOS.exactMatch),
+                ("E", narrow_s, SKOS.narrowMatch),
+                ("F", broad_s, SKOS.broadMatch),
+            ]
+            if value is not None
+        ]
+        notation_type = XSD.token
+        if notation_s is not None and notation_type_s is not None:
+            notation_type = checks.iri(sheet, f"H{row}", notation_type_s, prefixes)
+        if checks.problems:
+            continue
 
-        if broad_s is not None:
-            broad = make_iri(broad_s, prefixes)
-            g.add((iri, SKOS.broadMatch, broad))
+        # create Graph
+        for predicate, match in matches:
+            g.add((iri, predicate, match))
 
         if notation_s is not None:
-            if notation_type_s is not None:
-                notation_type = make_iri(notation_type_s, prefixes)
-            else:
-                notation_type = XSD.token
             g.add(
                 (
                     iri,
                     SKOS.notation,
-                    Literal(notation_s, datatype=notation_type),
+                    TERMS.literal(notation_s, datatype=notation_type),
                 )
             )
 
+    if own_checks:
+        checks.raise_for_problems()
+    return g
+
+
+def extract_vocab(
+    wb: Workbook,
+    template_version="0.7.0",
+    g=None,
+    hierarchy: Optional[HierarchyIndex] = None,
+    max_problems: Optional[int] = MAX_PROBLEMS,
+) -> Graph:
+    """Extracts the whole vocabulary into g, a Graph or sinks.TripleSink, or a new Graph, checking its cells"""
+    checks = CellChecks(max_problems)
+    prefixes = extract_prefixes(wb["Prefixes"])
+    if g is None:
+        g = Graph(bind_namespaces="rdflib")
     bind_namespaces(g, prefixes)
+
+    if hierarchy is None:
+        hierarchy = HierarchyIndex()
+    _, cs_iri = extract_concept_scheme(
+        wb["Concept Scheme"], prefixes, template_version, g, checks
+    )
+    extract_concepts(wb["Concepts"], prefixes, cs_iri, g, hierarchy, checks)
+    extract_collections(wb["Collections"], prefixes, cs_iri, g, checks)
+    extract_additions_concept_properties(
+        wb["Additional Concept Properties"], prefixes, g, checks
+    )
+    checks.raise_for_problems()
+    add_triples(g, hierarchy.top_concept_triples(cs_iri))
+    g.bind("cs", cs_iri)
+    g.bind("reg", REG)
     return g
 
 
@@ -401,7 +466,15 @@ def excel_to_rdf(
     wb: Workbook,
     output_file_path: Optional[Path] = None,
     output_format: TypeLiteral[
-        "longturtle", "turtle", "xml", "json-ld", "graph"
+        "longturtle",
+        "turtle",
+        "xml",
+        "json-ld",
+        "nt",
+        "nquads",
+        "snapshot",
+        "vocab-json-ld",
+        "graph",
     ] = "longturtle",
     validate: bool = False,
     profile="vocpub-46",
@@ -409,22 +482,25 @@ def excel_to_rdf(
     message_level=1,
     log_file: Optional[Path] = None,
     template_version="0.6.3",
+    hierarchy: Optional[HierarchyIndex] = None,
+    incremental: Optional[IncrementalValidation] = None,
+    jobs: int = 1,
+    engine: str = "native",
+    max_problems: Optional[int] = MAX_PROBLEMS,
+    timings: Optional[ShapeTimings] = None,
 ):
-    prefixes = extract_prefixes(wb["Prefixes"])
-    cs, cs_iri = extract_concept_scheme(
-        wb["Concept Scheme"], prefixes, template_version
-    )
-    cons = extract_concepts(wb["Concepts"], prefixes, cs_iri)
-    cols = extract_collections(wb["Collections"], prefixes, cs_iri)
-    extra = extract_additions_concept_properties(
-        wb["Additional Concept Properties"], prefixes
+    if output_format in STREAMING_FORMATS and not validate:
+        # write the triples out as they are extracted rather than building a graph
+        with make_sink(output_format, output_file_path) as sink:
+            extract_vocab(wb, template_version, sink, hierarchy, max_problems)
+            if output_file_path is None:
+                return sink.getvalue()
+        return
+
+    g = extract_vocab(
+        wb, template_version, hierarchy=hierarchy, max_problems=max_problems
     )
 
-    g = cs + cons + cols + extra
-    g = add_top_concepts(g)
-    g.bind("cs", cs_iri)
-    g.bind("reg", REG)
-
     if validate:
         validate_with_profile(
             g,
@@ -432,12 +508,10 @@ def excel_to_rdf(
             error_level=error_level,
             message_level=message_level,
             log_file=log_file,
+            incremental=incremental,
+            jobs=jobs,
+            engine=engine,
+            timings=timings,
         )
 
-    if output_file_path is not None:
-        g.serialize(destination=str(output_file_path), format=output_format)
-    else:  # print to std out
-        if output_format == "graph":
-            return g
-        else:
-            return g.serialize(format=output_format)
+    return write_outputs(g, output_format, output_file_path, jobs)
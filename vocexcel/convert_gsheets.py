@@ -7,6 +7,7 @@ from pydantic import ValidationError
 try:
     import models
     import profiles
+    from prefixes import PrefixExpander
     from utils import ConversionError, split_and_tidy_to_strings
 except:
     import sys
@@ -14,12 +15,9 @@ except:
     sys.path.append("..")
     from vocexcel import models, profiles
     from vocexcel.convert import log_msg, validate_with_profile
-    from vocexcel.utils import (
-        ConversionError,
-        log_msg,
-        split_and_tidy_to_strings,
-        validate_with_profile,
-    )
+    from vocexcel.prefixes import PrefixExpander
+    from vocexcel.utils import ConversionError, split_and_tidy_to_strings
+    from vocexcel.validation import log_msg, validate_with_profile
 
 ACCEPTED_TEMPLATE_VERSIONS = ["0.4.3"]
 SPREADSHEET_ID = None
@@ -49,7 +47,7 @@ def only_one_colon_in_str(string: str):
     return True
 
 
-def using_prefix_list_output(cell_value: list, prefix: dict):
+def using_prefix_list_output(cell_value: list, prefix: PrefixExpander):
     variables = []
     for i in cell_value:
         if cell_value is not None:
@@ -59,10 +57,9 @@ def using_prefix_list_output(cell_value: list, prefix: dict):
                     pass
                 elif only_one_colon_in_str(i):
                     split_c_prefix = c.split(":")[0]
-                    split_c_added_component = c.split(":")[1]
 
                     if split_c_prefix in prefix:
-                        c = prefix[split_c_prefix] + split_c_added_component
+                        c = prefix.expand(c)
                     else:
                         print(
                             f"The prefix used: {split_c_prefix} isn't included in the prefix sheet"
@@ -81,17 +78,16 @@ def using_prefix_list_output(cell_value: list, prefix: dict):
     return variables
 
 
-def using_prefix_non_list_output(cell_value, prefix: dict):
+def using_prefix_non_list_output(cell_value, prefix: PrefixExpander):
     c = cell_value
     if c is not None:
         if c.startswith("http"):
             pass
         elif only_one_colon_in_str(c):
             split_c_prefix = c.split(":")[0]
-            split_c_added_component = c.split(":")[1]
 
             if split_c_prefix in prefix:
-                c = prefix[split_c_prefix] + split_c_added_component
+                c = prefix.expand(c)
             else:
                 print(
                     f"The prefix used: '{split_c_prefix}' isn't included in the prefix sheet"
@@ -137,14 +133,14 @@ def rows_filled_out(c_sheet: dict):
     return variable
 
 
-def create_prefix_dict(prefix_s: dict):
+def create_prefix_dict(prefix_s: dict) -> PrefixExpander:
     prefix_dict = {}
     for index in range(1, rows_filled_out(prefix_s)):
         try:
             prefix_dict[read_cell(prefix_s, index, 0)] = read_cell(prefix_s, index, 1)
         except Exception as e:
             f"Prefix Processing Error, at the prefix sheet, row: {index}, {e}"
-    return prefix_dict
+    return PrefixExpander(prefix_dict)
 
 
 def extract_concept_scheme(concept_scheme_sheet: dict, prefix: dict):
@@ -0,0 +1,180 @@
+"""Writing a converted vocabulary's graph out in one or more formats
+
+The converters build and validate a vocabulary's graph once and then hand it to write_outputs(), whatever is asked of
+them: a single format written to a path or stream, or returned; or several formats at once. Several formats are
+written to a destination each, given as a list in the same order as the formats, or named after a single path by
+swapping its suffix for each format's:
+
+    excel_to_rdf(path, output_format=["longturtle", "xml", "json-ld", "nt"], output_file_path=Path("vocab.ttl"))
+
+writes vocab.ttl, vocab.rdf, vocab.json-ld and vocab.nt. If jobs is more than 1, the formats are serialised in that
+many worker processes at the same time, each of which is sent the graph's triples and prefixes.
+
+Paths ending with .gz, .bz2 or .xz after the format's own suffix, such as vocab.ttl.gz, are compressed as they are
+written, without writing the uncompressed file first. Named after vocab.ttl.gz, the formats above are written to
+vocab.ttl.gz, vocab.rdf.gz, vocab.json-ld.gz and vocab.nt.gz.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+from rdflib import Graph
+
+from vocexcel.jsonld import write_vocab_jsonld
+from vocexcel.longturtle import write_longturtle
+from vocexcel.sinks import STREAMING_FORMATS, write_graph
+from vocexcel.snapshot import write_snapshot
+from vocexcel.utils import ConversionError, compression_file_ending, open_file
+
+FORMAT_FILE_ENDINGS = {
+    "longturtle": ".ttl",
+    "turtle": ".ttl",
+    "xml": ".rdf",
+    "json-ld": ".json-ld",
+    "nt": ".nt",
+    "nquads": ".nq",
+    "snapshot": ".vocsnap",
+    "vocab-json-ld": ".jsonld",
+}
+
+
+def write_output(g: Graph, output_format: str, destination=None):
+    """Writes g in output_format to destination, a path or an open stream, or returns it if no destination is given
+
+    Paths ending with a compression suffix, such as vocab.ttl.gz, are compressed as they are written
+    """
+    if output_format in STREAMING_FORMATS:
+        return write_graph(g, output_format, destination)
+
+    if isinstance(destination, (Path, str)) and compression_file_ending(destination):
+        with open_file(destination, "wb") as f:
+            return write_output(g, output_format, f)
+
+    if output_format == "longturtle":
+        return write_longturtle(g, destination)
+
+    if output_format == "snapshot":
+        return write_snapshot(g, destination)
+
+    if output_format == "vocab-json-ld":
+        return write_vocab_jsonld(g, destination)
+
+    if isinstance(destination, (Path, str)):
+        g.serialize(destination=str(destination), format=output_format)
+    elif destination is not None:
+        g.serialize(destination=destination, format=output_format)
+    elif output_format == "graph":
+        return g
+    else:
+        return g.serialize(format=output_format)
+
+
+def output_paths(
+    output_formats: Sequence[str],
+    output_file_path: Union[Path, str, Sequence, None],
+) -> List:
+    """The destination of each of several formats: those of a list, the same for each format if None, or a path with
+    its suffix swapped for each format's, keeping any compression suffix"""
+    if output_file_path is None:
+        return [None] * len(output_formats)
+
+    if isinstance(output_file_path, (list, tuple)):
+        if len(output_file_path) != len(output_formats):
+            raise ConversionError(
+                f"You gave {len(output_file_path)} output files for {len(output_formats)} output formats. Give "
+                f"either one output file for each format, or one to name them all after"
+            )
+        destinations = list(output_file_path)
+    else:
+        path = Path(output_file_path)
+        compression = compression_file_ending(path) or ""
+        if compression:
+            path = path.with_suffix("")
+        destinations = []
+        for output_format in output_formats:
+            if output_format not in FORMAT_FILE_ENDINGS:
+                raise ConversionError(
+                    f"The output format {output_format} can't be written to a file"
+                )
+            destinations.append(
+                path.with_name(
+                    path.with_suffix(FORMAT_FILE_ENDINGS[output_format]).name
+                    + compression
+                )
+            )
+
+    paths = [Path(d) for d in destinations if isinstance(d, (Path, str))]
+    if len(set(paths)) != len(paths):
+        raise ConversionError(
+            f"The output formats {', '.join(output_formats)} would be written to the same file. Give an output file "
+            f"for each format"
+        )
+    return destinations
+
+
+def _write_part(args):
+    triples, namespaces, output_format, destination = args
+    g = Graph(bind_namespaces="none")
+    for prefix, namespace in namespaces:
+        g.bind(prefix, namespace)
+    g.addN((s, p, o, g) for s, p, o in triples)
+    return write_output(g, output_format, destination)
+
+
+def write_outputs(
+    g: Graph,
+    output_format: Union[str, Sequence[str]],
+    output_file_path=None,
+    jobs: int = 1,
+):
+    """Writes g in one format, as write_output() does, or in each of a list of formats
+
+    For a list of formats, returns a dict of format -> output of those formats that have no destination, or None if
+    they all do."""
+    if isinstance(output_format, str):
+        return write_output(g, output_format, output_file_path)
+
+    output_formats = list(output_format)
+    if len(set(output_formats)) != len(output_formats):
+        raise ConversionError("Each output format may only be given once")
+    destinations = output_paths(output_formats, output_file_path)
+
+    # the graph itself, and writing to open streams, can't be handed to another process
+    pooled = [
+        i
+        for i, (f, d) in enumerate(zip(output_formats, destinations))
+        if f != "graph" and (d is None or isinstance(d, (Path, str)))
+    ]
+    outputs: Dict[int, Optional[str]] = {}
+    pool = None
+    if jobs > 1 and len(pooled) > 1:
+        triples = list(g)
+        namespaces = list(g.namespaces())
+        pool = ProcessPoolExecutor(min(jobs, len(pooled)))
+        futures = {
+            i: pool.submit(
+                _write_part,
+                (triples, namespaces, output_formats[i], destinations[i]),
+            )
+            for i in pooled
+        }
+    else:
+        futures = {}
+
+    try:
+        # the rest are written while the workers write theirs
+        for i, (f, d) in enumerate(zip(output_formats, destinations)):
+            if i not in futures:
+                outputs[i] = write_output(g, f, d)
+        for i, future in futures.items():
+            outputs[i] = future.result()
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    returned = {
+        f: outputs[i]
+        for i, (f, d) in enumerate(zip(output_formats, destinations))
+        if d is None
+    }
+    return returned or None
@@ -0,0 +1,55 @@
+"""An index of a vocabulary's Concept hierarchy, filled in as Concepts are extracted
+
+Top concepts are read from the index rather than by querying the finished graph. Pass a HierarchyIndex to
+convert.excel_to_rdf() to query the hierarchy afterwards:
+
+    hierarchy = HierarchyIndex()
+    excel_to_rdf("vocab.xlsx", hierarchy=hierarchy)
+    hierarchy.top_concepts()
+"""
+from typing import Dict, Iterator, List
+
+from rdflib import URIRef
+from rdflib.namespace import SKOS
+
+
+class HierarchyIndex:
+    """Concept -> broader Concepts and Concept -> narrower Concepts, as given by skos:narrower"""
+
+    def __init__(self):
+        # dicts keep Concepts in the order they were added
+        self._concepts: Dict[URIRef, None] = {}
+        self._narrower: Dict[URIRef, List[URIRef]] = {}
+        self._broader: Dict[URIRef, List[URIRef]] = {}
+
+    def add_concept(self, concept: URIRef):
+        self._concepts[concept] = None
+
+    def add_narrower(self, concept: URIRef, narrower: URIRef):
+        self._narrower.setdefault(concept, []).append(narrower)
+        self._broader.setdefault(narrower, []).append(concept)
+
+    @property
+    def concepts(self) -> List[URIRef]:
+        return list(self._concepts)
+
+    def narrower(self, concept: URIRef) -> List[URIRef]:
+        return list(self._narrower.get(concept, []))
+
+    def broader(self, concept: URIRef) -> List[URIRef]:
+        return list(self._broader.get(concept, []))
+
+    def top_concepts(self) -> List[URIRef]:
+        """The Concepts that no other Concept indicates as being narrower than it"""
+        return [c for c in self._concepts if c not in self._broader]
+
+    def top_concept_triples(self, cs_iri: URIRef) -> Iterator[tuple]:
+        for c in self.top_concepts():
+            yield c, SKOS.topConceptOf, cs_iri
+            yield cs_iri, SKOS.hasTopConcept, c
+
+    def __contains__(self, concept: URIRef) -> bool:
+        return concept in self._concepts
+
+    def __len__(self) -> int:
+        return len(self._concepts)
@@ -0,0 +1,249 @@
+"""Incremental validation of a vocabulary against a profile's shapes
+
+When a workbook is converted again after a few of its Concepts were edited, only the nodes whose descriptions changed
+need validating again. An IncrementalValidation keeps the graph it last validated and its results, and on the next
+validation validates a graph of only the changed nodes, their blank nodes and their neighbours, keeping the results
+for those changed nodes and the earlier results for every other node. Pass one to convert.excel_to_rdf() with
+validate=True and keep it between conversions:
+
+    incremental = IncrementalValidation()
+    excel_to_rdf("vocab.xlsx", validate=True, incremental=incremental)
+    # ... edit a Concept
+    excel_to_rdf("vocab.xlsx", validate=True, incremental=incremental)
+
+The profile's shapes are assumed to look no further than a focus node's own description, its blank nodes and its
+immediate neighbours, as vocpub's do. The whole graph is validated instead when the results of nodes that didn't
+change may have: when blank nodes changed, when nodes were added or removed or their classes changed, when an
+unchanged node refers to a changed one by a property whose values the shapes validate with further shapes, or when a
+changed node is a shape's sh:targetNode. pyshacl's focus_nodes option isn't used, since it also filters the value
+nodes that nested shapes, such as those of an sh:or, are validated against, losing their results.
+"""
+from typing import Dict, FrozenSet, Optional, Set
+
+import pyshacl
+from rdflib import BNode, Graph, URIRef
+from rdflib.namespace import RDF, RDFS, SH
+from rdflib.term import Node
+
+from vocexcel.report import Results, finish_results, new_results_graph
+from vocexcel.shapes import SHAPES
+
+
+def _descriptions(g: Graph) -> Dict[Node, FrozenSet]:
+    """Node -> everything said about it, including about its blank nodes, for every named subject of g"""
+
+    def describe(node, seen):
+        return frozenset(
+            (
+                p,
+                describe(o, seen | {o})
+                if isinstance(o, BNode) and o not in seen
+                else o,
+            )
+            for p, o in g.predicate_objects(node)
+        )
+
+    return {
+        s: describe(s, {s}) for s in g.subjects(unique=True) if not isinstance(s, BNode)
+    }
+
+
+def changed_nodes(previous_graph: Graph, data_graph: Graph) -> Set[Node]:
+    """The named subjects whose descriptions differ between the graphs, including those only in one of them"""
+    before = _descriptions(previous_graph)
+    after = _descriptions(data_graph)
+    return {n for n in before.keys() | after.keys() if before.get(n) != after.get(n)}
+
+
+def _copy_result(source: Graph, result: Node, destination: Graph):
+    for p, o in source.predicate_objects(result):
+        destination.add((result, p, o))
+        if isinstance(o, BNode):
+            _copy_result(source, o, destination)
+
+
+def _results(results_graph: Graph):
+    for report in results_graph.subjects(RDF.type, SH.ValidationReport):
+        yield from results_graph.objects(report, SH.result)
+
+
+# constraints that validate value nodes by more than their own value, or their classes
+_DESCRIPTION_CONSTRAINTS = {SH.node, SH.property, SH.qualifiedValueShape}
+_LOGICAL_CONSTRAINTS = [SH["or"], SH["and"], SH.xone]
+
+
+def _constraints(shapes: Graph, shape: Node) -> Set[Node]:
+    """The constraint parameters of shape, including those of the shapes it combines with sh:or, sh:and, sh:xone
+    and sh:not"""
+    found = set()
+    for p, o in shapes.predicate_objects(shape):
+        found.add(p)
+        if p in _LOGICAL_CONSTRAINTS:
+            for member in shapes.items(o):
+                found.update(_constraints(shapes, member))
+        elif p == SH["not"]:
+            found.update(_constraints(shapes, o))
+    return found
+
+
+def _path_predicates(shapes: Graph, path: Node) -> Set[Node]:
+    """The predicates a property path is made of"""
+    if isinstance(path, URIRef):
+        return {path} if path != RDF.nil else set()
+    found = set()
+    for o in shapes.objects(path):
+        found.update(_path_predicates(shapes, o))
+    return found
+
+
+def _described_by(shapes: Graph) -> Set[Node]:
+    """The predicates whose values' descriptions, not just their classes, the shapes validate"""
+    predicates = set()
+    for shape, path in shapes.subject_objects(SH.path):
+        if _constraints(shapes, shape) & _DESCRIPTION_CONSTRAINTS:
+            predicates.update(_path_predicates(shapes, path))
+    return predicates
+
+
+def _neighbours_affected(
+    shapes: Graph, previous_graph: Graph, data_graph: Graph, changed: Set[Node]
+) -> bool:
+    """Whether the results of nodes that didn't change may have, so that the whole graph must be validated"""
+    graphs = (previous_graph, data_graph)
+    if any(isinstance(o, BNode) for g in graphs for n in changed for o in g.objects(n)):
+        return True
+    if any(
+        set(previous_graph.objects(n, RDF.type)) != set(data_graph.objects(n, RDF.type))
+        for n in changed
+    ):
+        return True
+    if changed & set(shapes.objects(None, SH.targetNode)):
+        return True
+    # inverse paths, other than those counting a class's instances, look at neighbours from the other side
+    if any(
+        o != RDF.type
+        for path in shapes.objects(None, SH.inversePath)
+        for o in _path_predicates(shapes, path)
+    ):
+        return True
+    described_by = _described_by(shapes)
+    return any(
+        s not in changed
+        for g in graphs
+        for n in changed
+        for p in described_by
+        for s in g.subjects(p, n)
+    )
+
+
+def _add_description(g: Graph, node: Node, destination: Graph):
+    for p, o in g.predicate_objects(node):
+        destination.add((node, p, o))
+        if isinstance(o, BNode) and (o, None, None) not in destination:
+            _add_description(g, o, destination)
+
+
+def _neighbourhood(data_graph: Graph, nodes: Set[Node]) -> Graph:
+    """The descriptions of nodes and of the nodes they refer to, the statements referring to them and the class
+    hierarchy: all the shapes need to validate nodes"""
+    g = Graph()
+    g += data_graph.triples((None, RDFS.subClassOf, None))
+    for n in nodes:
+        _add_description(data_graph, n, g)
+        for o in data_graph.objects(n):
+            if isinstance(o, URIRef):
+                _add_description(data_graph, o, g)
+        for s, p in data_graph.subject_predicates(n):
+            g.add((s, p, n))
+    return g
+
+
+def validate_incremental(
+    previous_graph: Graph,
+    previous_results: Graph,
+    data_graph: Graph,
+    profile: str = "vocpub-46",
+    allow_warnings: bool = False,
+) -> Results:
+    """Validates data_graph, given previous_graph and its results, re-validating only what changed"""
+    shapes = SHAPES.get(profile)
+    changed = changed_nodes(previous_graph, data_graph)
+    if _neighbours_affected(shapes, previous_graph, data_graph, changed):
+        return pyshacl.validate(
+            data_graph, shacl_graph=shapes, allow_warnings=allow_warnings
+        )
+
+    if changed:
+        _, changed_results, _ = pyshacl.validate(
+            _neighbourhood(data_graph, changed),
+            shacl_graph=shapes,
+            allow_warnings=allow_warnings,
+        )
+    else:
+        changed_results = Graph()
+
+    results_graph, report = new_results_graph(previous_results.namespaces())
+    conforms = True
+    # the earlier results for unchanged nodes stand, and the changed nodes' are replaced
+    for source, keep in (
+        (previous_results, lambda focus: focus not in changed),
+        (changed_results, lambda focus: focus in changed),
+    ):
+        for result in _results(source):
+            if not keep(source.value(result, SH.focusNode)):
+                continue
+            _copy_result(source, result, results_graph)
+            results_graph.add((report, SH.result, result))
+            if (
+                not allow_warnings
+                or source.value(result, SH.resultSeverity) == SH.Violation
+            ):
+                conforms = False
+    return finish_results(results_graph, report, conforms)
+
+
+class IncrementalValidation:
+    """The graph last validated and its results, from which the next validation is made incremental"""
+
+    def __init__(
+        self,
+        graph: Optional[Graph] = None,
+        results_graph: Optional[Graph] = None,
+        profile: Optional[str] = None,
+        allow_warnings: Optional[bool] = None,
+    ):
+        self.graph = graph
+        self.results_graph = results_graph
+        self.profile = profile
+        self.allow_warnings = allow_warnings
+
+    def validate(
+        self,
+        data_graph: Graph,
+        profile: str = "vocpub-46",
+        allow_warnings: bool = False,
+    ) -> Results:
+        """Validates data_graph, incrementally if it is validated as the previous graph was, and remembers it"""
+        if (
+            self.graph is None
+            or self.results_graph is None
+            or (self.profile is not None and self.profile != profile)
+            or (
+                self.allow_warnings is not None
+                and self.allow_warnings != allow_warnings
+            )
+        ):
+            conforms, results_graph, results_text = pyshacl.validate(
+                data_graph,
+                shacl_graph=SHAPES.get(profile),
+                allow_warnings=allow_warnings,
+            )
+        else:
+            conforms, results_graph, results_text = validate_incremental(
+                self.graph, self.results_graph, data_graph, profile, allow_warnings
+            )
+        self.graph = data_graph
+        self.results_graph = results_graph
+        self.profile = profile
+        self.allow_warnings = allow_warnings
+        return conforms, results_graph, results_text
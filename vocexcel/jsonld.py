@@ -0,0 +1,256 @@
+"""JSON-LD shaped like a vocabulary, for consumers that want its concepts as a tree
+
+rdflib's json-ld serializer writes each subject as a separate node, with full IRIs for every property, so consumers
+have to frame the document before they can walk a vocabulary's hierarchy, and it builds the whole document in memory
+first. write_vocab_jsonld() writes the same triples with a fixed @context, giving SKOS and the other vocabularies
+VocExcel uses short terms, and with each ConceptScheme's top concepts nested under it by skos:hasTopConcept, their
+narrower concepts under them by skos:narrower and so on:
+
+    {"@context": {...},
+    "@graph": [
+    {"@id": "http://example.com/voc", "@type": "ConceptScheme", "prefLabel": {...}, "hasTopConcept": [
+    {"@id": "http://example.com/voc/a", "@type": "Concept", ..., "narrower": [
+    {"@id": "http://example.com/voc/b", "@type": "Concept", ...}]}]},
+    {"@id": "http://example.com/voc/collection", "@type": "Collection", ...}]}
+
+A concept is nested under the first of its broader concepts to be written and referred to by IRI elsewhere. Concepts
+not reached from a ConceptScheme follow it, then Collections, then everything else. Blank nodes referred to once,
+such as agents, are nested where they are referred to. The document is written concept by concept, so its size
+doesn't add to the memory the graph takes.
+"""
+import io
+import json
+from pathlib import Path
+from typing import IO, Dict, Iterator, List, Optional, Union
+
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.namespace import RDF, SKOS
+from rdflib.term import Node
+
+from vocexcel.utils import open_file
+
+PREFIXES = {
+    "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
+    "owl": "http://www.w3.org/2002/07/owl#",
+    "xsd": "http://www.w3.org/2001/XMLSchema#",
+    "skos": "http://www.w3.org/2004/02/skos/core#",
+    "dcterms": "http://purl.org/dc/terms/",
+    "dcat": "http://www.w3.org/ns/dcat#",
+    "prov": "http://www.w3.org/ns/prov#",
+    "schema": "https://schema.org/",
+    "reg": "http://purl.org/linked-data/registry#",
+}
+# SKOS terms whose values are literals
+LITERAL_TERMS = [
+    "prefLabel",
+    "altLabel",
+    "hiddenLabel",
+    "notation",
+    "definition",
+    "note",
+    "scopeNote",
+    "historyNote",
+    "editorialNote",
+    "changeNote",
+    "example",
+]
+# SKOS terms whose values are IRIs, written as strings
+IRI_TERMS = [
+    "hasTopConcept",
+    "topConceptOf",
+    "inScheme",
+    "narrower",
+    "broader",
+    "related",
+    "member",
+    "exactMatch",
+    "closeMatch",
+    "broadMatch",
+    "narrowMatch",
+    "relatedMatch",
+]
+CONTEXT = {
+    **PREFIXES,
+    "ConceptScheme": "skos:ConceptScheme",
+    "Concept": "skos:Concept",
+    "Collection": "skos:Collection",
+    **{term: f"skos:{term}" for term in LITERAL_TERMS},
+    **{term: {"@id": f"skos:{term}", "@type": "@id"} for term in IRI_TERMS},
+}
+
+TERMS: Dict[URIRef, str] = {
+    SKOS[term]: term
+    for term in ["ConceptScheme", "Concept", "Collection"] + LITERAL_TERMS + IRI_TERMS
+}
+IRI_VALUED = {SKOS[term] for term in IRI_TERMS}
+# the predicates whose values are nested, written after a node's other properties
+NESTING = [SKOS.hasTopConcept, SKOS.narrower]
+# concepts deeper than this are written after the tree they are in, rather than nested
+MAX_DEPTH = 100
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+class VocabJsonLdWriter:
+    """Writes a vocabulary's graph as JSON-LD with its concepts nested under its ConceptScheme"""
+
+    def __init__(self, graph: Graph):
+        self.graph = graph
+        self._keys: Dict[URIRef, str] = {}
+
+    def compact(self, iri: URIRef) -> str:
+        """A term or compact IRI for iri, or iri itself"""
+        key = self._keys.get(iri)
+        if key is None:
+            key = TERMS.get(iri)
+            if key is None:
+                key = str(iri)
+                for prefix, namespace in PREFIXES.items():
+                    local = key[len(namespace) :]
+                    if (
+                        key.startswith(namespace)
+                        and local
+                        and not local.startswith("//")
+                    ):
+                        key = f"{prefix}:{local}"
+                        break
+            self._keys[iri] = key
+        return key
+
+    def _id(self, node: Node) -> str:
+        return f"_:{node}" if isinstance(node, BNode) else str(node)
+
+    def _literal(self, o: Literal, plain: bool = True):
+        if o.language is not None:
+            return {"@value": str(o), "@language": o.language}
+        if o.datatype is None:
+            return str(o) if plain else {"@value": str(o)}
+        return {"@value": str(o), "@type": self.compact(o.datatype)}
+
+    def _value(self, p: URIRef, o: Node):
+        if isinstance(o, Literal):
+            # a string under a term whose values are IRIs would be read as an IRI
+            return self._literal(o, plain=p not in IRI_VALUED)
+        if isinstance(o, BNode) and self._inlined(o):
+            return self._properties(o, anonymous=True)
+        if p in IRI_VALUED:
+            return self._id(o)
+        return {"@id": self._id(o)}
+
+    def _inlined(self, o: BNode) -> bool:
+        return self._references.get(o, 0) == 1 and o not in self._written
+
+    def _predicates(self, node: Node) -> Dict[URIRef, List[Node]]:
+        predicates: Dict[URIRef, List[Node]] = {}
+        for p, o in self.graph.predicate_objects(node):
+            predicates.setdefault(p, []).append(o)
+        return predicates
+
+    def _properties(self, node: Node, anonymous: bool = False) -> dict:
+        """node's properties, as a dict ready to be dumped. Those that nest are left for _node() to write, unless
+        node is anonymous, being written inside another node's properties"""
+        self._written.add(node)
+        predicates = self._predicates(node)
+        properties = {} if anonymous else {"@id": self._id(node)}
+        types = predicates.pop(RDF.type, None)
+        if types:
+            types = [self.compact(t) for t in sorted(types)]
+            properties["@type"] = types[0] if len(types) == 1 else types
+        if not anonymous:
+            for p in NESTING:
+                predicates.pop(p, None)
+        for key, p in sorted((self.compact(p), p) for p in predicates):
+            values = [self._value(p, o) for o in sorted(predicates[p])]
+            properties[key] = values[0] if len(values) == 1 else values
+        return properties
+
+    def _nestable(self, o: Node, depth: int) -> bool:
+        return (
+            isinstance(o, URIRef)
+            and depth < MAX_DEPTH
+            and o not in self._written
+            and (o, None, None) in self.graph
+        )
+
+    def _node(self, node: Node, depth: int = 0) -> Iterator[str]:
+        """node as a JSON object, with its nesting properties' values nested, in pieces"""
+        properties = self._properties(node)
+        nesting = [
+            (p, sorted(self.graph.objects(node, p)))
+            for p in NESTING
+            if (node, p, None) in self.graph
+        ]
+        if not nesting:
+            yield _dumps(properties)
+            return
+        yield _dumps(properties)[:-1]
+        for p, objects in nesting:
+            yield f", {_dumps(self.compact(p))}: ["
+            for i, o in enumerate(objects):
+                if i:
+                    yield ","
+                if self._nestable(o, depth + 1):
+                    yield "\n"
+                    yield from self._node(o, depth + 1)
+                else:
+                    yield _dumps(self._value(p, o))
+            yield "]"
+        yield "}"
+
+    def _roots(self) -> Iterator[Node]:
+        g = self.graph
+        yield from sorted(g.subjects(RDF.type, SKOS.ConceptScheme, unique=True))
+        yield from sorted(g.subjects(RDF.type, SKOS.Concept, unique=True))
+        yield from sorted(g.subjects(RDF.type, SKOS.Collection, unique=True))
+        subjects = sorted(
+            g.subjects(unique=True), key=lambda s: (isinstance(s, BNode), str(s))
+        )
+        for s in subjects:
+            # blank nodes referred to once are nested where they are referred to
+            if not isinstance(s, BNode) or self._references.get(s, 0) != 1:
+                yield s
+        # blank nodes referred to once, but only from each other
+        yield from subjects
+
+    def __iter__(self) -> Iterator[str]:
+        """The document, in pieces"""
+        self._written = set()
+        self._references: Dict[BNode, int] = {}
+        for o in self.graph.objects(unique=False):
+            if isinstance(o, BNode):
+                self._references[o] = self._references.get(o, 0) + 1
+
+        yield '{"@context": ' + _dumps(CONTEXT) + ',\n"@graph": ['
+        first = True
+        for node in self._roots():
+            if node in self._written:
+                continue
+            yield "\n" if first else ",\n"
+            first = False
+            yield from self._node(node)
+        yield "]}\n"
+
+
+def iter_vocab_jsonld(graph: Graph) -> Iterator[str]:
+    """graph as vocabulary-shaped JSON-LD, in pieces"""
+    return iter(VocabJsonLdWriter(graph))
+
+
+def write_vocab_jsonld(
+    graph: Graph, destination: Union[Path, str, IO, None] = None
+) -> Optional[str]:
+    """Writes graph as vocabulary-shaped JSON-LD to destination: a file path or an open binary or text stream. If no
+    destination is given, returns the text instead
+    """
+    if destination is None:
+        return "".join(iter_vocab_jsonld(graph))
+    if isinstance(destination, (Path, str)):
+        with open_file(destination, "wt") as f:
+            return write_vocab_jsonld(graph, f)
+    text = isinstance(destination, io.TextIOBase)
+    for piece in iter_vocab_jsonld(graph):
+        destination.write(piece if text else piece.encode("utf-8"))
+    return None
@@ -0,0 +1,339 @@
+"""A fast writer of rdflib's longturtle format for the graphs VocExcel produces
+
+rdflib's LongTurtleSerializer looks up each subject's triples in the store again when writing it, works out prefixed
+names afresh every time a term is written and encodes and writes each token separately. VocExcel's graphs, a
+ConceptScheme and its Concepts and Collections, each a subject with a handful of predicates and, for agents, blank
+nodes that are inlined, are written by it token by token: tens of thousands of subjects and hundreds of thousands of
+writes.
+
+LongTurtleWriter writes the same bytes. It indexes the graph by subject in the one pass that rdflib's serializer makes
+to count references and collect prefixes, remembers each term's prefixed name once the prefixes are known and
+encodes its output in large blocks. It follows the serializer's rules exactly: prefixes in use, sorted, then
+rdfs:Class instances, then the other subjects ordered by whether they are blank nodes, how often they are referenced
+and their IRI; rdf:type and rdfs:label first; blank nodes referenced once inlined and RDF lists written as such.
+
+Graphs it can't be sure of writing identically, those held in a store other than rdflib's in-memory one, or with a
+base IRI, are written by rdflib's serializer instead:
+
+    write_longturtle(g, "vocab.ttl")
+    with open("vocab.ttl", "wb") as f:
+        write_longturtle(g, f)
+    text = write_longturtle(g)
+"""
+import io
+from pathlib import Path
+from typing import IO, Dict, List, Optional, Union
+
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.namespace import RDF, RDFS
+from rdflib.plugins.serializers.longturtle import LongTurtleSerializer
+from rdflib.plugins.stores.memory import Memory
+from rdflib.term import Node
+
+# the serializer's text is encoded and written in blocks of at least this many characters
+BLOCK_SIZE = 1 << 16
+INDENT = LongTurtleSerializer.indentString
+RDF_NIL = RDF.nil
+RDF_TYPE = RDF.type
+
+
+class _Namer(LongTurtleSerializer):
+    """rdflib's serializer, used for its prefixed names, remembered once the prefixes in use are known"""
+
+    def __init__(self, store: Graph):
+        super().__init__(store)
+        self._names: Dict[Node, Optional[str]] = {}
+        self._verb_names: Dict[Node, Optional[str]] = {}
+        # the number of predicates seen so far: only they can have new prefixes generated for them
+        self._generations = 0
+        self._failed: Dict[tuple, int] = {}
+
+    def preprocess_name(self, node: Node, gen_prefix: bool):
+        """Names node as the serializer's preprocess() would, for the prefixes it adds"""
+        if not isinstance(node, URIRef):
+            return
+        names = self._verb_names if gen_prefix else self._names
+        if node in names:
+            return
+        key = (node, gen_prefix)
+        # a name that couldn't be made may be once another predicate has had a prefix generated for it
+        if self._failed.get(key) == self._generations:
+            return
+        if gen_prefix:
+            self._generations += 1
+        name = self.get_pname(node, gen_prefix)
+        if name is None:
+            self._failed[key] = self._generations
+        else:
+            names[node] = name
+
+    def name(self, node: Node, verb: bool) -> str:
+        names = self._verb_names if verb else self._names
+        try:
+            name = names[node]
+        except KeyError:
+            name = names[node] = self.get_pname(node, verb)
+        return name if name is not None else node.n3()
+
+    def datatype_name(self, datatype: URIRef) -> Optional[str]:
+        try:
+            return self._names[datatype]
+        except KeyError:
+            name = self._names[datatype] = self.get_pname(datatype, False)
+            return name
+
+
+class LongTurtleWriter:
+    """Writes a graph as rdflib's longturtle serializer does"""
+
+    def __init__(self, graph: Graph):
+        self.graph = graph
+
+    @staticmethod
+    def supports(graph: Graph, base: Optional[str] = None) -> bool:
+        return (
+            type(graph) is Graph
+            and isinstance(graph.store, Memory)
+            and base is None
+            and graph.base is None
+        )
+
+    def _index(self):
+        namer = self.namer = _Namer(self.graph)
+        keywords = namer.keywords
+        self.properties: Dict[Node, Dict[Node, List[Node]]] = {}
+        self.references: Dict[Node, int] = {}
+        properties = self.properties
+        references = self.references
+        preprocess_name = namer.preprocess_name
+        names = namer._names
+        verb_names = namer._verb_names
+        for s, p, o in self.graph.triples((None, None, None)):
+            references[o] = references.get(o, 0) + 1
+            predicates = properties.get(s)
+            if predicates is None:
+                predicates = properties[s] = {}
+            objects = predicates.get(p)
+            if objects is None:
+                predicates[p] = [o]
+            else:
+                objects.append(o)
+
+            # names are made in the order the serializer makes them, as that of generated prefixes depends on it
+            if s not in names:
+                preprocess_name(s, False)
+            if p not in verb_names and p not in keywords:
+                preprocess_name(p, True)
+            if isinstance(o, Literal):
+                if o.datatype and o.datatype not in names:
+                    preprocess_name(o.datatype, False)
+            elif o not in names:
+                preprocess_name(o, False)
+            if isinstance(p, BNode):
+                references[p] = references.get(p, 0) + 1
+
+        # terms the serializer writes specially
+        names[RDF_NIL] = verb_names[RDF_NIL] = "()"
+        verb_names[RDF_TYPE] = "a"
+
+    def _subjects(self) -> List[Node]:
+        members = [
+            s
+            for s, predicates in self.properties.items()
+            if RDFS.Class in predicates.get(RDF.type, ())
+        ]
+        members.sort()
+        seen = set(members)
+        references = self.references
+        recursable = [
+            (isinstance(s, BNode), references.get(s, 0), s)
+            for s in self.properties
+            if s not in seen
+        ]
+        recursable.sort()
+        return members + [s for _, _, s in recursable]
+
+    def _sorted_properties(self, subject: Node):
+        properties = self.properties.get(subject)
+        if not properties:
+            return []
+        ordered = []
+        for p, objects in properties.items():
+            objects.sort()
+        for p in self.namer.predicateOrder:
+            if p in properties:
+                ordered.append(p)
+        first = set(ordered)
+        ordered.extend(p for p in sorted(properties) if p not in first)
+        return [(p, properties[p]) for p in ordered]
+
+    def _label(self, node: Node, verb: bool = False) -> str:
+        if isinstance(node, Literal):
+            return node._literal_n3(
+                use_plain=True, qname_callback=self.namer.datatype_name
+            )
+        return self.namer.name(node, verb)
+
+    def _write_node(self, node: Node, newline: bool):
+        if not self._inline(node):
+            if not newline:
+                self._out.append(" ")
+            self._out.append(self._label(node))
+
+    def _inline(self, node: Node) -> bool:
+        """Writes a blank node referenced only once, or an RDF list, in place"""
+        if (
+            not isinstance(node, BNode)
+            or node in self.serialized
+            or self.references.get(node, 0) > 1
+        ):
+            return False
+        out = self._out
+        if self._is_list(node):
+            out.append(" (\n")
+            self._write_list(node)
+            out.append("\n" + self.depth * INDENT + ")")
+        else:
+            self.serialized.add(node)
+            out.append("\n" + (self.depth + 1) * INDENT + "[\n")
+            self.depth += 1
+            self._write_predicates(node)
+            self.depth -= 1
+            out.append("\n" + (self.depth + 1) * INDENT + "]")
+        return True
+
+    def _value(self, node: Node, predicate: URIRef) -> Optional[Node]:
+        objects = self.properties.get(node, {}).get(predicate)
+        return objects[0] if objects else None
+
+    def _is_list(self, node: Node) -> bool:
+        if self._value(node, RDF.first) is None:
+            return False
+        while node:
+            if node != RDF_NIL and (
+                sum(len(o) for o in self.properties.get(node, {}).values()) != 2
+            ):
+                return False
+            node = self._value(node, RDF.rest)
+        return True
+
+    def _write_list(self, node: Node):
+        i = 0
+        while node:
+            item = self._value(node, RDF.first)
+            if item is not None:
+                indent = (self.depth + 1) * INDENT
+                self._out.append(indent if i == 0 else "\n" + indent)
+                self._write_node(item, newline=True)
+                self.serialized.add(node)
+            node = self._value(node, RDF.rest)
+            i += 1
+
+    def _write_predicates(self, subject: Node):
+        properties = self._sorted_properties(subject)
+        if not properties:
+            return
+        out = self._out
+        for i, (p, objects) in enumerate(properties):
+            indent = (self.depth + 1) * INDENT
+            out.append(indent if i == 0 else " ;\n" + indent)
+            out.append(self._label(p, verb=True))
+            self._write_objects(objects)
+        out.append(" ;")
+
+    def _write_objects(self, objects: List[Node]):
+        out = self._out
+        # rdflib's serializer indents the objects of every predicate one more level, however many there are
+        self.depth += 1
+        if len(objects) == 1:
+            self._write_node(objects[0], newline=False)
+            self.depth -= 1
+            return
+        indent = "\n" + (self.depth + 1) * INDENT
+        for i, o in enumerate(objects):
+            if i:
+                out.append(" ,")
+            if not isinstance(o, BNode):
+                out.append(indent)
+            elif i == 0:
+                out.append(" ")
+            self._write_node(o, newline=True)
+        self.depth -= 1
+
+    def _flush(self, stream: IO[bytes], force: bool = False):
+        if force or self._size() >= BLOCK_SIZE:
+            stream.write("".join(self._out).encode("utf-8", "replace"))
+            self._out.clear()
+
+    def _size(self) -> int:
+        return sum(len(s) for s in self._out)
+
+    def write(self, stream: IO[bytes]):
+        """Writes the graph, UTF-8 encoded, to a binary stream"""
+        self._index()
+        subjects = self._subjects()
+        self.serialized = set()
+        self.depth = 0
+        self._out: List[str] = [
+            f"PREFIX {prefix}: <{namespace}>\n"
+            for prefix, namespace in sorted(self.namer.namespaces.items())
+        ]
+        out = self._out
+        written = 0
+        for subject in subjects:
+            if subject in self.serialized:
+                continue
+            self.serialized.add(subject)
+            if isinstance(subject, BNode) and not self.references.get(subject, 0):
+                out.append("\n[]")
+            else:
+                out.append("\n" + self._label(subject) + "\n")
+            self._write_predicates(subject)
+            out.append("\n.\n")
+            written += 1
+            if written % 256 == 0:
+                self._flush(stream)
+        self._flush(stream, force=True)
+
+
+def write_longturtle(
+    graph: Graph,
+    destination: Union[Path, str, IO, None] = None,
+) -> Optional[str]:
+    """Writes graph as longturtle to destination: a file path or an open binary or text stream. If no destination is
+    given, returns the text instead
+    """
+    if not LongTurtleWriter.supports(graph):
+        if destination is None:
+            return graph.serialize(format="longturtle")
+        if isinstance(destination, (Path, str)):
+            graph.serialize(destination=str(destination), format="longturtle")
+        elif isinstance(destination, io.TextIOBase):
+            destination.write(graph.serialize(format="longturtle"))
+        else:
+            graph.serialize(destination=destination, format="longturtle")
+        return None
+
+    writer = LongTurtleWriter(graph)
+    if destination is None:
+        stream = io.BytesIO()
+        writer.write(stream)
+        return stream.getvalue().decode("utf-8")
+    if isinstance(destination, (Path, str)):
+        with open(destination, "wb") as f:
+            writer.write(f)
+    elif isinstance(destination, io.TextIOBase):
+        writer.write(_TextWriter(destination))
+    else:
+        writer.write(destination)
+    return None
+
+
+class _TextWriter:
+    """A binary stream writing UTF-8 to a text stream"""
+
+    def __init__(self, stream: IO[str]):
+        self.stream = stream
+
+    def write(self, data: bytes):
+        self.stream.write(data.decode("utf-8"))
@@ -1,6 +1,6 @@
 import datetime
 from itertools import chain
-from typing import List, Union
+from typing import Iterator, List, Optional, Union
 
 from openpyxl import Workbook
 from pydantic import BaseModel, validator
@@ -8,12 +8,18 @@ from rdflib import Graph, Literal, URIRef
 from rdflib.namespace import DCAT, DCTERMS, OWL, RDF, RDFS, SKOS, XSD
 
 try:
-    from utils import all_strings_in_list_are_iris, string_is_http_iri
+    from hierarchy import HierarchyIndex
+    from utils import add_triples, all_strings_in_list_are_iris, string_is_http_iri
 except ImportError:
     import sys
 
     sys.path.append("..")
-    from vocexcel.utils import all_strings_in_list_are_iris, string_is_http_iri
+    from vocexcel.hierarchy import HierarchyIndex
+    from vocexcel.utils import (
+        add_triples,
+        all_strings_in_list_are_iris,
+        string_is_http_iri,
+    )
 
 ORGANISATIONS = {
     "CGI": URIRef("https://linked.data.gov.au/org/cgi"),
@@ -52,47 +58,46 @@ class ConceptScheme(BaseModel):
             )
         return v
 
-    def to_graph(self):
-        g = Graph()
+    def triples(self) -> Iterator[tuple]:
         v = URIRef(self.uri)
         # For dcterms:identifier
         if "#" in v:
             identifier = v.split("#")[-1]
         else:
             identifier = v.split("/")[-1]
-        g.add((v, DCTERMS.identifier, Literal(identifier, datatype=XSD.token)))
+        yield v, DCTERMS.identifier, Literal(identifier, datatype=XSD.token)
 
-        g.add((v, RDF.type, SKOS.ConceptScheme))
-        g.add((v, SKOS.prefLabel, Literal(self.title, lang="en")))
-        g.add((v, SKOS.definition, Literal(self.description, lang="en")))
-        g.add((v, DCTERMS.created, Literal(self.created, datatype=XSD.date)))
+        yield v, RDF.type, SKOS.ConceptScheme
+        yield v, SKOS.prefLabel, Literal(self.title, lang="en")
+        yield v, SKOS.definition, Literal(self.description, lang="en")
+        yield v, DCTERMS.created, Literal(self.created, datatype=XSD.date)
         if self.modified is not None:
-            g.add((v, DCTERMS.modified, Literal(self.created, datatype=XSD.date)))
+            yield v, DCTERMS.modified, Literal(self.created, datatype=XSD.date)
         else:
-            g.add(
-                (
-                    v,
-                    DCTERMS.modified,
-                    Literal(
-                        datetime.datetime.now().strftime("%Y-%m-%d"), datatype=XSD.date
-                    ),
-                )
+            yield (
+                v,
+                DCTERMS.modified,
+                Literal(
+                    datetime.datetime.now().strftime("%Y-%m-%d"), datatype=XSD.date
+                ),
             )
-        g.add((v, DCTERMS.creator, ORGANISATIONS[self.creator]))
-        g.add((v, DCTERMS.publisher, ORGANISATIONS[self.publisher]))
+        yield v, DCTERMS.creator, ORGANISATIONS[self.creator]
+        yield v, DCTERMS.publisher, ORGANISATIONS[self.publisher]
         if self.version is not None:
-            g.add((v, OWL.versionInfo, Literal(self.version)))
-        g.add((v, DCTERMS.provenance, Literal(self.provenance, lang="en")))
+            yield v, OWL.versionInfo, Literal(self.version)
+        yield v, DCTERMS.provenance, Literal(self.provenance, lang="en")
         if self.custodian is not None:
-            g.add((v, DCAT.contactPoint, Literal(self.custodian)))
+            yield v, DCAT.contactPoint, Literal(self.custodian)
         if self.pid is not None:
             # adding to the graph depending on if the pid is a URI or a literal
             if string_is_http_iri(self.pid)[0]:
-                g.add((v, RDFS.seeAlso, URIRef(self.pid)))
+                yield v, RDFS.seeAlso, URIRef(self.pid)
             else:
-                g.add((v, RDFS.seeAlso, Literal(self.pid)))
+                yield v, RDFS.seeAlso, Literal(self.pid)
 
+    def bind_prefixes(self, g: Graph):
         # bind non-core prefixes
+        v = URIRef(self.uri)
         g.bind("cs", v)
         g.bind(
             "",
@@ -103,6 +108,11 @@ class ConceptScheme(BaseModel):
         g.bind("skos", SKOS)
         g.bind("owl", OWL)
 
+    def to_graph(self):
+        g = Graph()
+        add_triples(g, self.triples())
+        self.bind_prefixes(g)
+
         return g
 
     def to_excel(self, wb: Workbook):
@@ -173,56 +183,59 @@ class Concept(BaseModel):
         assert r[0], r[1]
         return elem
 
-    def to_graph(self):
-        g = Graph()
+    def triples(self) -> Iterator[tuple]:
         c = URIRef(self.uri)
 
-        g.add((c, RDF.type, SKOS.Concept))
+        yield c, RDF.type, SKOS.Concept
         # For dcterms:identifier
         if "#" in c:
             identifier = c.split("#")[-1]
         else:
             identifier = c.split("/")[-1]
-        g.add((c, DCTERMS.identifier, Literal(identifier, datatype=XSD.token)))
+        yield c, DCTERMS.identifier, Literal(identifier, datatype=XSD.token)
 
         if not self.pl_language_code:
-            g.add((c, SKOS.prefLabel, Literal(self.pref_label, lang="en")))
+            yield c, SKOS.prefLabel, Literal(self.pref_label, lang="en")
         else:
             for lang_code in self.pl_language_code:
-                g.add((c, SKOS.prefLabel, Literal(self.pref_label, lang=lang_code)))
+                yield c, SKOS.prefLabel, Literal(self.pref_label, lang=lang_code)
         if self.alt_labels is not None:
             for alt_label in self.alt_labels:
-                g.add((c, SKOS.altLabel, Literal(alt_label, lang="en")))
+                yield c, SKOS.altLabel, Literal(alt_label, lang="en")
         if not self.def_language_code:
-            g.add((c, SKOS.definition, Literal(self.definition, lang="en")))
+            yield c, SKOS.definition, Literal(self.definition, lang="en")
         else:
             for lang_code in self.def_language_code:
-                g.add((c, SKOS.definition, Literal(self.definition, lang=lang_code)))
+                yield c, SKOS.definition, Literal(self.definition, lang=lang_code)
         for child in self.children:
-            g.add((c, SKOS.narrower, URIRef(child)))
-            g.add((URIRef(child), SKOS.broader, c))
+            yield c, SKOS.narrower, URIRef(child)
+            yield URIRef(child), SKOS.broader, c
         if self.other_ids is not None:
             for other_id in self.other_ids:
-                g.add((c, SKOS.notation, Literal(other_id)))
+                yield c, SKOS.notation, Literal(other_id)
         if self.home_vocab_uri is not None:
-            g.add((c, RDFS.isDefinedBy, URIRef(self.home_vocab_uri)))
+            yield c, RDFS.isDefinedBy, URIRef(self.home_vocab_uri)
         if self.provenance is not None:
-            g.add((c, DCTERMS.provenance, Literal(self.provenance, lang="en")))
+            yield c, DCTERMS.provenance, Literal(self.provenance, lang="en")
         if self.related_match is not None:
             for related_match in self.related_match:
-                g.add((c, SKOS.relatedMatch, URIRef(related_match)))
+                yield c, SKOS.relatedMatch, URIRef(related_match)
         if self.close_match:
             for close_match in self.close_match:
-                g.add((c, SKOS.closeMatch, URIRef(close_match)))
+                yield c, SKOS.closeMatch, URIRef(close_match)
         if self.exact_match is not None:
             for exact_match in self.exact_match:
-                g.add((c, SKOS.exactMatch, URIRef(exact_match)))
+                yield c, SKOS.exactMatch, URIRef(exact_match)
         if self.narrow_match is not None:
             for narrow_match in self.narrow_match:
-                g.add((c, SKOS.narrowMatch, URIRef(narrow_match)))
+                yield c, SKOS.narrowMatch, URIRef(narrow_match)
         if self.broad_match is not None:
             for broad_match in self.broad_match:
-                g.add((c, SKOS.broadMatch, URIRef(broad_match)))
+                yield c, SKOS.broadMatch, URIRef(broad_match)
+
+    def to_graph(self):
+        g = Graph()
+        add_triples(g, self.triples())
 
         return g
 
@@ -300,23 +313,26 @@ class Collection(BaseModel):
             raise ValueError("The members of a Collection must be a list of IRIs")
         return v
 
-    def to_graph(self):
-        g = Graph()
+    def triples(self) -> Iterator[tuple]:
         c = URIRef(self.uri)
-        g.add((c, RDF.type, SKOS.Collection))
+        yield c, RDF.type, SKOS.Collection
         # for dcterms:identifier
         if "#" in c:
             identifier = c.split("#")[-1]
         else:
             identifier = c.split("/")[-1]
-        g.add((c, DCTERMS.identifier, Literal(identifier, datatype=XSD.token)))
+        yield c, DCTERMS.identifier, Literal(identifier, datatype=XSD.token)
 
-        g.add((c, SKOS.prefLabel, Literal(self.pref_label, lang="en")))
-        g.add((c, SKOS.definition, Literal(self.definition, lang="en")))
+        yield c, SKOS.prefLabel, Literal(self.pref_label, lang="en")
+        yield c, SKOS.definition, Literal(self.definition, lang="en")
         for member in self.members:
-            g.add((c, SKOS.member, URIRef(member)))
+            yield c, SKOS.member, URIRef(member)
         if self.provenance is not None:
-            g.add((c, DCTERMS.provenance, Literal(self.provenance, lang="en")))
+            yield c, DCTERMS.provenance, Literal(self.provenance, lang="en")
+
+    def to_graph(self):
+        g = Graph()
+        add_triples(g, self.triples())
 
         return g
 
@@ -334,24 +350,35 @@ class Vocabulary(BaseModel):
     concepts: List[Concept]
     collections: List[Collection]
 
-    def to_graph(self):
-        g = self.concept_scheme.to_graph()
+    def triples(self, hierarchy: Optional[HierarchyIndex] = None) -> Iterator[tuple]:
+        """Yields the vocabulary's triples. The Concept hierarchy is indexed into hierarchy, if given, on the way"""
+        if hierarchy is None:
+            hierarchy = HierarchyIndex()
         cs = URIRef(self.concept_scheme.uri)
+        yield from self.concept_scheme.triples()
         for concept in self.concepts:
-            g += concept.to_graph()
-            g.add((URIRef(concept.uri), SKOS.inScheme, cs))
+            yield from concept.triples()
+            c = URIRef(concept.uri)
+            yield c, SKOS.inScheme, cs
+            hierarchy.add_concept(c)
+            for child in concept.children:
+                hierarchy.add_narrower(c, URIRef(child))
         for collection in self.collections:
-            g += collection.to_graph()
-            g.add((URIRef(collection.uri), DCTERMS.isPartOf, cs))
-            g.add((cs, DCTERMS.hasPart, URIRef(collection.uri)))
-
-        # create as Top Concepts those Concepts that have no skos:narrower properties with them as objects
-        for s in g.subjects(SKOS.inScheme, cs):
-            is_tc = True
-            for _ in g.objects(s, SKOS.broader):
-                is_tc = False
-            if is_tc:
-                g.add((cs, SKOS.hasTopConcept, s))
-                g.add((s, SKOS.topConceptOf, cs))
+            yield from collection.triples()
+            yield URIRef(collection.uri), DCTERMS.isPartOf, cs
+            yield cs, DCTERMS.hasPart, URIRef(collection.uri)
+
+        # create as Top Concepts those Concepts that no other Concept has as a child, i.e. that have no skos:broader
+        yield from hierarchy.top_concept_triples(cs)
+
+    def to_graph(self, g=None, hierarchy: Optional[HierarchyIndex] = None):
+        """Returns the vocabulary as a Graph or, if g - a Graph or sinks.TripleSink - is given, adds its triples to g
+
+        All triples go into the one graph in a single batch, rather than each model making a graph of its own to
+        merge"""
+        if g is None:
+            g = Graph()
+        self.concept_scheme.bind_prefixes(g)
+        add_triples(g, self.triples(hierarchy))
 
         return g
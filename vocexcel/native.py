@@ -0,0 +1,627 @@
+"""Native validation of vocabularies against profiles that use only simple SHACL
+
+Most of vocpub's requirements are counts, datatypes, languages, node kinds and classes of a node's values, which
+pyshacl checks one generic constraint component at a time. A NativeValidator compiles a shapes graph that uses only
+those SHACL Core features into plain Python checks and runs them over subject -> predicate -> values maps of the data
+graph, built in one pass. It reports what pyshacl would: the same results, severities and messages in a results graph
+of the same shape, and the same conformance, with or without allow_warnings.
+
+Compiling a shapes graph that uses anything else, such as a custom profile's might, raises UnsupportedShapes, and
+validate_native() validates with pyshacl instead. parity() cross-checks the two on a data graph.
+"""
+from collections import Counter
+from datetime import date, datetime, time
+from decimal import Decimal
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+import pyshacl
+from pyshacl.rdfutil import clone_blank_node, stringify_node
+from rdflib import BNode, ConjunctiveGraph, Graph, Literal, URIRef
+from rdflib.collection import Collection
+from rdflib.namespace import OWL, RDF, RDFS, SH, XSD
+from rdflib.term import Node
+
+from vocexcel.report import Results, finish_results, new_results_graph
+from vocexcel.shapes import SHAPES
+from vocexcel.timing import ShapeTimings, recording
+
+# the parameters a NativeValidator checks, and the other SHACL predicates it knows to be harmless on a shape
+CONSTRAINT_PARAMETERS = {
+    SH.property,
+    SH["or"],
+    SH.minCount,
+    SH.maxCount,
+    SH.uniqueLang,
+    SH.datatype,
+    SH.nodeKind,
+    SH["class"],
+}
+SHAPE_PREDICATES = CONSTRAINT_PARAMETERS | {
+    SH.path,
+    SH.targetClass,
+    SH.targetNode,
+    SH.targetObjectsOf,
+    SH.targetSubjectsOf,
+    SH.severity,
+    SH.message,
+    SH.deactivated,
+    SH.name,
+    SH.description,
+    SH.order,
+    SH.group,
+    SH.defaultValue,
+}
+TARGETS = (SH.targetClass, SH.targetNode, SH.targetObjectsOf, SH.targetSubjectsOf)
+NODE_KINDS = {
+    SH.IRI: (URIRef,),
+    SH.BlankNode: (BNode,),
+    SH.Literal: (Literal,),
+    SH.BlankNodeOrIRI: (BNode, URIRef),
+    SH.BlankNodeOrLiteral: (BNode, Literal),
+    SH.IRIOrLiteral: (URIRef, Literal),
+}
+# the Python types of well-formed values of the datatypes pyshacl checks
+DATATYPE_VALUES = {
+    XSD.string: (str, bytes),
+    RDF.langString: (str, bytes),
+    XSD.integer: (int,),
+    XSD.float: (float,),
+    XSD.decimal: (Decimal,),
+    XSD.boolean: (bool,),
+    XSD.date: (date,),
+    XSD.time: (time,),
+    XSD.dateTime: (datetime,),
+}
+
+
+# namespace attribute lookups are slow, so the terms used for every value node are looked up once
+OR = SH.OrConstraintComponent
+MIN_COUNT = SH.MinCountConstraintComponent
+MAX_COUNT = SH.MaxCountConstraintComponent
+UNIQUE_LANG = SH.UniqueLangConstraintComponent
+DATATYPE = SH.DatatypeConstraintComponent
+NODE_KIND = SH.NodeKindConstraintComponent
+CLASS = SH.ClassConstraintComponent
+XSD_STRING = XSD.string
+RDF_LANG_STRING = RDF.langString
+RDF_TYPE = RDF.type
+RDFS_SUB_CLASS_OF = RDFS.subClassOf
+
+
+class UnsupportedShapes(Exception):
+    pass
+
+
+class _Shape:
+    def __init__(self, node: Node):
+        self.node = node
+        self.severity = SH.Violation
+        self.messages: List[Node] = []
+        self.deactivated = False
+        self.path: Optional[tuple] = None
+        self.path_node: Optional[Node] = None
+        self.targets: Dict[URIRef, List[Node]] = {t: [] for t in TARGETS}
+        self.min_count: Optional[Literal] = None
+        self.max_count: Optional[Literal] = None
+        self.unique_lang = False
+        self.datatype: Optional[URIRef] = None
+        self.node_kind: Optional[URIRef] = None
+        self.classes: List[Node] = []
+        self.ors: List[Node] = []
+        self.or_shapes: List[List["_Shape"]] = []
+        self.properties: List["_Shape"] = []
+
+
+def _single(shape: Node, parameter: URIRef, values: list) -> Node:
+    if len(values) != 1:
+        raise UnsupportedShapes(f"{shape} has {len(values)} values of {parameter}")
+    return values[0]
+
+
+class NativeValidator:
+    """A shapes graph compiled into checks that give the results pyshacl would"""
+
+    def __init__(self, shapes: Graph):
+        self.shapes = shapes
+        if (None, SH.parameter, None) in shapes:
+            raise UnsupportedShapes("the shapes graph declares constraint components")
+        for p in set(shapes.predicates()):
+            if p.startswith(SH) and p not in SHAPE_PREDICATES | {
+                SH.alternativePath,
+                SH.inversePath,
+                SH.declare,
+                SH.prefix,
+                SH.namespace,
+            }:
+                raise UnsupportedShapes(f"{p} is not supported")
+        for kind in (SH.NodeShape, SH.PropertyShape):
+            for s in shapes.subjects(RDF.type, kind):
+                if any((s, RDF.type, c) in shapes for c in (RDFS.Class, OWL.Class)):
+                    raise UnsupportedShapes(f"{s} targets its instances implicitly")
+
+        # predicates whose values, and whose subjects by value, are looked up
+        self.predicates = {RDF.type, RDFS.subClassOf}
+        self.inverse_predicates = {RDF.type, RDFS.subClassOf}
+        self._compiled: Dict[Node, Optional[_Shape]] = {}
+        self.top_level = [
+            self._compile(s)
+            for s in dict.fromkeys(
+                s for target in TARGETS for s in shapes.subjects(target)
+            )
+        ]
+        for shape in self.top_level:
+            self.inverse_predicates.update(shape.targets[SH.targetObjectsOf])
+            self.inverse_predicates.update(shape.targets[SH.targetSubjectsOf])
+
+    def _compile(self, node: Node) -> _Shape:
+        if node in self._compiled:
+            shape = self._compiled[node]
+            if shape is None:
+                raise UnsupportedShapes(f"{node} refers to itself")
+            return shape
+        self._compiled[node] = None
+        shape = _Shape(node)
+        sg = self.shapes
+        parameters: Dict[URIRef, list] = {}
+        for p, o in sg.predicate_objects(node):
+            if p.startswith(SH):
+                parameters.setdefault(p, []).append(o)
+
+        for target in TARGETS:
+            shape.targets[target] = parameters.get(target, [])
+        if SH.severity in parameters:
+            shape.severity = _single(node, SH.severity, parameters[SH.severity])
+        shape.messages = parameters.get(SH.message, [])
+        if SH.deactivated in parameters:
+            shape.deactivated = bool(
+                _single(node, SH.deactivated, parameters[SH.deactivated])
+            )
+        if SH.path in parameters:
+            shape.path_node = _single(node, SH.path, parameters[SH.path])
+            shape.path = self._compile_path(shape.path_node)
+        if SH.minCount in parameters or SH.maxCount in parameters:
+            if shape.path is None:
+                raise UnsupportedShapes(f"{node} counts values but has no path")
+        if SH.minCount in parameters:
+            shape.min_count = _single(node, SH.minCount, parameters[SH.minCount])
+        if SH.maxCount in parameters:
+            shape.max_count = _single(node, SH.maxCount, parameters[SH.maxCount])
+        for count in (shape.min_count, shape.max_count):
+            if count is not None and not isinstance(count.value, int):
+                raise UnsupportedShapes(f"{node} has a count that is not an integer")
+        if SH.uniqueLang in parameters:
+            shape.unique_lang = bool(
+                _single(node, SH.uniqueLang, parameters[SH.uniqueLang])
+            )
+        if SH.datatype in parameters:
+            shape.datatype = _single(node, SH.datatype, parameters[SH.datatype])
+        if SH.nodeKind in parameters:
+            shape.node_kind = _single(node, SH.nodeKind, parameters[SH.nodeKind])
+            if shape.node_kind not in NODE_KINDS:
+                raise UnsupportedShapes(f"{node} has an unknown node kind")
+        shape.classes = parameters.get(SH["class"], [])
+        shape.ors = parameters.get(SH["or"], [])
+        shape.or_shapes = [
+            [self._compile(o) for o in Collection(sg, or_list)] for or_list in shape.ors
+        ]
+        for p in parameters.get(SH.property, []):
+            property_shape = self._compile(p)
+            if property_shape.path is None:
+                raise UnsupportedShapes(f"{p} is not a property shape")
+            shape.properties.append(property_shape)
+
+        self._compiled[node] = shape
+        return shape
+
+    def _compile_path(self, path: Node) -> tuple:
+        sg = self.shapes
+        if isinstance(path, URIRef):
+            self.predicates.add(path)
+            return "predicate", path
+        if not isinstance(path, BNode):
+            raise UnsupportedShapes(f"{path} is not a path")
+        inverse = sg.value(path, SH.inversePath)
+        if isinstance(inverse, URIRef):
+            self.inverse_predicates.add(inverse)
+            return "inverse", inverse
+        alternatives = sg.value(path, SH.alternativePath)
+        if alternatives is not None:
+            return "alternative", [
+                self._compile_path(p) for p in Collection(sg, alternatives)
+            ]
+        if sg.value(path, RDF.first) is not None:
+            return "sequence", [self._compile_path(p) for p in Collection(sg, path)]
+        raise UnsupportedShapes(f"{path} is not a supported path")
+
+    def validate(
+        self,
+        data_graph: Graph,
+        allow_warnings: bool = False,
+        timings: Optional[ShapeTimings] = None,
+    ) -> Results:
+        """Validates data_graph, recording the time spent validating with each shape in timings, if given"""
+        run = _Run(self, data_graph, allow_warnings, timings)
+        conforms = True
+        results: list = []
+        for shape in self.top_level:
+            start = perf_counter()
+            focus = run.focus_nodes(shape)
+            if timings is not None:
+                timings.record(shape.node, perf_counter() - start, 0, calls=0)
+            shape_conforms, shape_results = run.validate(shape, focus)
+            conforms = conforms and shape_conforms
+            results.extend(shape_results)
+        return run.report(conforms, results)
+
+
+class _Run:
+    """The indexes and state of one validation"""
+
+    def __init__(
+        self,
+        validator: NativeValidator,
+        g: Graph,
+        allow_warnings: bool,
+        timings: Optional[ShapeTimings] = None,
+    ):
+        self.shapes = validator.shapes
+        self.timings = timings
+        self.data_graph = g
+        self.allowed = {SH.Info, SH.Warning} if allow_warnings else set()
+        self.values: Dict[Node, Dict[Node, list]] = {}
+        self.subjects: Dict[Node, Dict[Node, list]] = {}
+        for p in validator.predicates:
+            for s, _, o in g.triples((None, p, None)):
+                self.values.setdefault(s, {}).setdefault(p, []).append(o)
+        for p in validator.inverse_predicates:
+            by_object = self.subjects[p] = {}
+            for s, _, o in g.triples((None, p, None)):
+                by_object.setdefault(o, []).append(s)
+        self._superclasses: Dict[Node, set] = {}
+        self._messages: Dict[Tuple[_Shape, URIRef], str] = {}
+
+    def focus_nodes(self, shape: _Shape) -> list:
+        found = dict.fromkeys(shape.targets[SH.targetNode])
+        types = self.subjects[RDF.type]
+        for c in shape.targets[SH.targetClass]:
+            classes = [c]
+            for sub in classes:
+                classes.extend(
+                    s
+                    for s in self.subjects[RDFS.subClassOf].get(sub, ())
+                    if s not in classes
+                )
+            for sub in classes:
+                found.update(dict.fromkeys(types.get(sub, ())))
+        for p in shape.targets[SH.targetSubjectsOf]:
+            for subjects in self.subjects[p].values():
+                found.update(dict.fromkeys(subjects))
+        for p in shape.targets[SH.targetObjectsOf]:
+            found.update(dict.fromkeys(self.subjects[p]))
+        return list(found)
+
+    def path_values(self, path: tuple, node: Node) -> list:
+        kind, arg = path
+        if kind == "predicate":
+            return self.values.get(node, {}).get(arg, [])
+        if kind == "inverse":
+            return self.subjects[arg].get(node, [])
+        if kind == "alternative":
+            return list(
+                dict.fromkeys(v for p in arg for v in self.path_values(p, node))
+            )
+        nodes = [node]
+        for p in arg:
+            nodes = list(
+                dict.fromkeys(v for n in nodes for v in self.path_values(p, n))
+            )
+        return nodes
+
+    def superclasses(self, c: Node) -> set:
+        if c not in self._superclasses:
+            found = {c}
+            pending = [c]
+            while pending:
+                for sup in self.values.get(pending.pop(), {}).get(
+                    RDFS_SUB_CLASS_OF, ()
+                ):
+                    if sup not in found:
+                        found.add(sup)
+                        pending.append(sup)
+            self._superclasses[c] = found
+        return self._superclasses[c]
+
+    def has_class(self, v: Node, c: Node) -> bool:
+        if isinstance(v, Literal):
+            return False
+        return any(
+            c in self.superclasses(t) for t in self.values.get(v, {}).get(RDF_TYPE, ())
+        )
+
+    @staticmethod
+    def has_datatype(v: Node, datatype: Node) -> bool:
+        if not isinstance(v, Literal):
+            return False
+        if v.datatype == datatype:
+            if getattr(v, "ill_typed", None) is True:
+                return False
+        elif datatype == RDFS.Literal or (datatype == RDFS.Datatype and v.datatype):
+            return True
+        elif not (
+            (v.datatype is None and v.language is None and datatype == XSD_STRING)
+            or (datatype == RDF_LANG_STRING and v.language)
+        ):
+            return False
+        return isinstance(v.value, DATATYPE_VALUES.get(datatype, (object,)))
+
+    def validate(self, shape: _Shape, focus: list) -> Tuple[bool, list]:
+        """Whether the focus nodes conform to the shape, and the results, as pyshacl's Shape.validate() has them"""
+        if self.timings is None:
+            return self._validate(shape, focus)
+        start = perf_counter()
+        try:
+            return self._validate(shape, focus)
+        finally:
+            self.timings.record(shape.node, perf_counter() - start, len(focus))
+
+    def _validate(self, shape: _Shape, focus: list) -> Tuple[bool, list]:
+        if shape.deactivated:
+            return True, []
+        if shape.path is None:
+            value_nodes = [(f, (f,)) for f in focus]
+        else:
+            value_nodes = [(f, self.path_values(shape.path, f)) for f in focus]
+        allow_conform = shape.severity in self.allowed
+
+        non_conformant = False
+        results: list = []
+        for constraint_results in self.evaluate(shape, value_nodes):
+            if constraint_results is None:
+                continue
+            failed, found = constraint_results
+            if failed and not allow_conform:
+                if self.allowed:
+                    # a constraint whose results are all of allowed severities doesn't make the shape fail
+                    non_conformant = non_conformant or any(
+                        r[0].severity not in self.allowed for r in found
+                    )
+                else:
+                    non_conformant = True
+            results.extend(found)
+        return not non_conformant, results
+
+    def evaluate(self, shape: _Shape, value_nodes: list):
+        """(failed, results) for each of the shape's constraint components"""
+        if shape.properties:
+            failed = False
+            found: list = []
+            for property_shape in shape.properties:
+                for _, values in value_nodes:
+                    for v in values:
+                        conforms, results = self.validate(property_shape, [v])
+                        failed = failed or not conforms
+                        found.extend(results)
+            yield failed, found
+        if shape.ors:
+            found = []
+            for alternatives in shape.or_shapes:
+                for f, values in value_nodes:
+                    for v in values:
+                        if not any(self.validate(a, [v])[0] for a in alternatives):
+                            found.append((shape, OR, f, v))
+            yield bool(found), found
+        if shape.min_count is not None:
+            yield self.failures(
+                (shape, MIN_COUNT, f, None)
+                for f, values in value_nodes
+                if len(values) < shape.min_count.value
+            )
+        if shape.max_count is not None:
+            yield self.failures(
+                (shape, MAX_COUNT, f, None)
+                for f, values in value_nodes
+                if len(values) > shape.max_count.value
+            )
+        if shape.unique_lang:
+            found = []
+            for f, values in value_nodes:
+                languages = set()
+                duplicates = set()
+                for v in values:
+                    if isinstance(v, Literal) and v.language:
+                        language = str(v.language).lower()
+                        if language in languages:
+                            duplicates.add(language)
+                        languages.add(language)
+                found.extend((shape, UNIQUE_LANG, f, None) for _ in duplicates)
+            yield bool(found), found
+        if shape.datatype is not None:
+            yield self.failures(
+                (shape, DATATYPE, f, v)
+                for f, values in value_nodes
+                for v in values
+                if not self.has_datatype(v, shape.datatype)
+            )
+        if shape.node_kind is not None:
+            kinds = NODE_KINDS[shape.node_kind]
+            yield self.failures(
+                (shape, NODE_KIND, f, v)
+                for f, values in value_nodes
+                for v in values
+                if not isinstance(v, kinds)
+            )
+        if shape.classes:
+            yield self.failures(
+                (shape, CLASS, f, v)
+                for c in shape.classes
+                for f, values in value_nodes
+                for v in values
+                if not self.has_class(v, c)
+            )
+
+    @staticmethod
+    def failures(results) -> Tuple[bool, list]:
+        found = list(results)
+        return bool(found), found
+
+    def message(
+        self, shape: _Shape, component: URIRef, focus: Node, value: Optional[Node]
+    ) -> Literal:
+        """pyshacl's message for a result of a shape without sh:message"""
+        sg = self.shapes
+        if component == MIN_COUNT:
+            try:
+                focus_string = stringify_node(self.data_graph, focus)
+            except (LookupError, ValueError):
+                focus_string = str(focus)
+            m = f"Less than {shape.min_count.value} values on {focus_string}->{stringify_node(sg, shape.path_node)}"
+        elif component == MAX_COUNT:
+            m = (
+                f"More than {shape.max_count.value} values on "
+                f"{stringify_node(self.data_graph, focus)}->{stringify_node(sg, shape.path_node)}"
+            )
+        elif component == UNIQUE_LANG:
+            m = "More than one String shares the same Language"
+        elif component == DATATYPE:
+            m = f"Value is not Literal with datatype {stringify_node(sg, shape.datatype)}"
+        elif component == NODE_KIND:
+            m = f"Value is not of Node Kind {stringify_node(sg, shape.node_kind)}"
+        elif component == CLASS:
+            if len(shape.classes) == 1:
+                m = f"Value does not have class {stringify_node(sg, shape.classes[0])}"
+            else:
+                classes = ", ".join(stringify_node(sg, c) for c in shape.classes)
+                m = f"Value class is not in classes ({classes})"
+        else:
+            if (shape, component) not in self._messages:
+                if len(shape.ors) < 2:
+                    or_string = " , ".join(
+                        stringify_node(sg, o) for o in sg.items(shape.ors[0])
+                    )
+                else:
+                    or_string = " and ".join(
+                        f"({' , '.join(stringify_node(sg, o) for o in sg.items(a))})"
+                        for a in shape.ors
+                    )
+                self._messages[(shape, component)] = or_string
+            try:
+                value_string = stringify_node(self.data_graph, value)
+            except (LookupError, ValueError):
+                value_string = str(value)
+            m = f"Node {value_string} must conform to one or more shapes in {self._messages[(shape, component)]}"
+        return Literal(m)
+
+    def report(self, conforms: bool, results: list) -> Results:
+        results_graph, report = new_results_graph(self.shapes.namespaces())
+
+        # as pyshacl does, blank nodes are copied into the report with their ids and descriptions
+        cloned: Dict[Tuple[int, Node], Node] = {}
+
+        def clone(source: Graph, node: Node) -> Node:
+            if not isinstance(node, BNode):
+                return node
+            if (id(source), node) not in cloned:
+                cloned[(id(source), node)] = clone_blank_node(
+                    source, node, results_graph, keepid=True
+                )
+            return cloned[(id(source), node)]
+
+        for shape, component, focus, value in results:
+            result = BNode()
+            results_graph.add((report, SH.result, result))
+            results_graph.add((result, RDF.type, SH.ValidationResult))
+            results_graph.add((result, SH.sourceConstraintComponent, component))
+            results_graph.add((result, SH.sourceShape, clone(self.shapes, shape.node)))
+            results_graph.add((result, SH.resultSeverity, shape.severity))
+            results_graph.add((result, SH.focusNode, clone(self.data_graph, focus)))
+            if value is not None:
+                results_graph.add((result, SH.value, clone(self.data_graph, value)))
+            if shape.path_node is not None:
+                results_graph.add(
+                    (result, SH.resultPath, clone(self.shapes, shape.path_node))
+                )
+            for m in shape.messages or [self.message(shape, component, focus, value)]:
+                results_graph.add((result, SH.resultMessage, m))
+
+        return finish_results(results_graph, report, conforms)
+
+
+_VALIDATORS: Dict[str, Tuple[Graph, Optional[NativeValidator]]] = {}
+
+
+def native_validator(profile: str) -> Optional[NativeValidator]:
+    """The profile's NativeValidator, or None if its shapes can't be validated natively"""
+    shapes = SHAPES.get(profile)
+    cached = _VALIDATORS.get(profile)
+    if cached is None or cached[0] is not shapes:
+        try:
+            validator = NativeValidator(shapes)
+        except UnsupportedShapes:
+            validator = None
+        cached = _VALIDATORS[profile] = (shapes, validator)
+    return cached[1]
+
+
+def validate_native(
+    data_graph,
+    profile: str = "vocpub-46",
+    allow_warnings: bool = False,
+    timings: Optional[ShapeTimings] = None,
+) -> Results:
+    """Validates data_graph natively if the profile allows, otherwise with pyshacl
+
+    If given timings, the time spent validating with each shape is recorded in it.
+    """
+    # pyshacl validates each graph of a Dataset separately
+    if isinstance(data_graph, Graph) and not isinstance(data_graph, ConjunctiveGraph):
+        validator = native_validator(profile)
+        if validator is not None:
+            if timings is not None:
+                timings.engine = "native"
+            return validator.validate(data_graph, allow_warnings, timings)
+    if timings is None:
+        return pyshacl.validate(
+            data_graph, shacl_graph=SHAPES.get(profile), allow_warnings=allow_warnings
+        )
+    timings.engine = "pyshacl"
+    with recording(timings):
+        return pyshacl.validate(
+            data_graph, shacl_graph=SHAPES.get(profile), allow_warnings=allow_warnings
+        )
+
+
+def _summary(results_graph: Graph) -> List[tuple]:
+    return list(
+        (
+            str(results_graph.value(r, SH.focusNode)),
+            str(results_graph.value(r, SH.resultPath)),
+            str(results_graph.value(r, SH.sourceShape)),
+            str(results_graph.value(r, SH.sourceConstraintComponent)),
+            str(results_graph.value(r, SH.resultSeverity)),
+            str(results_graph.value(r, SH.value)),
+            tuple(sorted(str(m) for m in results_graph.objects(r, SH.resultMessage))),
+        )
+        for r in results_graph.objects(None, SH.result)
+    )
+
+
+def parity(
+    data_graph: Graph, profile: str = "vocpub-46", allow_warnings: bool = False
+) -> List[str]:
+    """The differences between validating data_graph natively and with pyshacl, if any"""
+    validator = native_validator(profile)
+    if validator is None:
+        return []
+    native_conforms, native_results, _ = validator.validate(data_graph, allow_warnings)
+    conforms, results, _ = pyshacl.validate(
+        data_graph, shacl_graph=SHAPES.get(profile), allow_warnings=allow_warnings
+    )
+    differences = []
+    if native_conforms != conforms:
+        differences.append(f"conforms: native {native_conforms}, pyshacl {conforms}")
+    native_summary = Counter(_summary(native_results))
+    summary = Counter(_summary(results))
+    differences.extend(f"only native: {r}" for r in native_summary - summary)
+    differences.extend(f"only pyshacl: {r}" for r in summary - native_summary)
+    return differences
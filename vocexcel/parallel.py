@@ -0,0 +1,129 @@
+"""Validation of a vocabulary against a profile's shapes in parallel worker processes
+
+pyshacl validates on a single core. validate_parallel() splits the data graph into one part per job, each holding the
+full descriptions of some of its named nodes, validates the parts in a process pool and merges their results into
+one report. A node's results come only from the part that holds its description.
+
+As for incremental validation, the profile's shapes are assumed to look no further than a focus node's own
+description, its blank nodes and the classes of the nodes it refers to, as vocpub's do. So that the classes can be
+tested, and so that no part validates a node it only partly describes, every part also holds the full descriptions of
+all instances of the classes the shapes test with sh:class or target with sh:targetNode: for vocpub, the Concept
+Scheme and its agents. A graph conforms if all of its parts do.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Set, Tuple
+
+import pyshacl
+from rdflib import BNode, Graph
+from rdflib.namespace import RDF, SH
+from rdflib.term import Node
+
+from vocexcel.report import Results, finish_results, new_results_graph
+from vocexcel.shapes import SHAPES
+
+
+def _closure(g: Graph, node: Node, triples: list, owned: set):
+    for p, o in g.predicate_objects(node):
+        triples.append((node, p, o))
+        if isinstance(o, BNode) and o not in owned:
+            owned.add(o)
+            _closure(g, o, triples, owned)
+
+
+def _bnodes(g: Graph, node: Node) -> Set[Node]:
+    bnodes: Set[Node] = set()
+    _closure(g, node, [], bnodes)
+    return bnodes
+
+
+def partition(data_graph: Graph, shapes: Graph, parts: int) -> List[Tuple[list, set]]:
+    """Splits data_graph into parts, each a list of triples and the set of nodes whose results it gives"""
+    target_nodes = set(shapes.objects(None, SH.targetNode))
+    shared_classes = set(shapes.objects(None, SH["class"])) | target_nodes
+    shared: list = []
+    shared_nodes: Set[Node] = set()
+    for c in shared_classes:
+        for s in data_graph.subjects(RDF.type, c):
+            if s not in shared_nodes:
+                shared_nodes.add(s)
+                _closure(data_graph, s, shared, shared_nodes)
+
+    subjects = [s for s in data_graph.subjects(unique=True) if not isinstance(s, BNode)]
+    size = max(-(-len(subjects) // parts), 1)
+    chunks = []
+    for i in range(0, len(subjects), size):
+        triples = list(shared)
+        owned: Set[Node] = set()
+        for s in subjects[i : i + size]:
+            owned.add(s)
+            if s not in shared_nodes:
+                _closure(data_graph, s, triples, owned)
+            else:
+                owned |= _bnodes(data_graph, s)
+        chunks.append((triples, owned))
+    if not chunks:
+        chunks.append((shared, set()))
+    # the nodes targeted directly are in no part of their own
+    chunks[0][1].update(target_nodes)
+    return chunks
+
+
+def _validate_part(args) -> Tuple[bool, List[List[tuple]]]:
+    triples, owned, profile, allow_warnings = args
+    g = Graph()
+    g.addN((s, p, o, g) for s, p, o in triples)
+    conforms, results_graph, _ = pyshacl.validate(
+        g, shacl_graph=SHAPES.get(profile), allow_warnings=allow_warnings
+    )
+    results = []
+    for result in results_graph.objects(None, SH.result):
+        if results_graph.value(result, SH.focusNode) in owned:
+            result_triples: list = []
+            _closure(results_graph, result, result_triples, set())
+            results.append(result_triples)
+    return conforms, results
+
+
+def _sort_key(result_triples: List[tuple]) -> tuple:
+    values: Dict = {p: o for _, p, o in result_triples}
+    return tuple(
+        str(values.get(p, ""))
+        for p in (
+            SH.focusNode,
+            SH.resultPath,
+            SH.sourceShape,
+            SH.sourceConstraintComponent,
+            SH.value,
+            SH.resultMessage,
+        )
+    )
+
+
+def validate_parallel(
+    data_graph: Graph,
+    profile: str = "vocpub-46",
+    allow_warnings: bool = False,
+    jobs: int = 2,
+) -> Results:
+    """Validates data_graph in jobs worker processes
+
+    The results are added to results_graph in a fixed order, whatever order the parts finish in.
+    """
+    parts = partition(data_graph, SHAPES.get(profile), jobs)
+    with ProcessPoolExecutor(jobs) as pool:
+        validated = list(
+            pool.map(
+                _validate_part,
+                [(triples, owned, profile, allow_warnings) for triples, owned in parts],
+            )
+        )
+    conforms = all(part_conforms for part_conforms, _ in validated)
+    results = [r for _, part_results in validated for r in part_results]
+    results.sort(key=_sort_key)
+
+    results_graph, report = new_results_graph(SHAPES.get(profile).namespaces())
+    for result_triples in results:
+        result = result_triples[0][0]
+        results_graph.add((report, SH.result, result))
+        results_graph.addN((s, p, o, results_graph) for s, p, o in result_triples)
+    return finish_results(results_graph, report, conforms)
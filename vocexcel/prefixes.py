@@ -0,0 +1,66 @@
+"""Prefix expansion for the prefixed names, such as ex:thing, used in workbook cells
+
+A PrefixExpander is built once from a workbook's prefixes and shared by everything that expands names while
+converting it. Rather than trying every prefix in turn, it splits a name at its first ':' and looks the prefix up
+in a dict. Prefixes that themselves contain a ':' are tried first, longest first, so that the longest matching
+prefix always wins. Expansions are cached, since the same IRIs recur across the Narrower, Members and additional
+properties columns.
+"""
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Union
+
+from rdflib import Namespace
+
+EXPANSION_CACHE_SIZE = 65536
+
+
+class PrefixExpander(Mapping):
+    """A read-only mapping of prefix to namespace that expands prefixed names.
+
+    Prefixes may be given with or without their trailing ':' - "ex" and "ex:" are the same prefix - and are
+    iterated over without it."""
+
+    def __init__(self, prefixes: Optional[Mapping] = None):
+        self._namespaces: Dict[str, Union[Namespace, str]] = {}
+        for pre, ns in (prefixes or {}).items():
+            self._namespaces[self._normalise(pre)] = ns
+
+        self._lookup: Dict[str, str] = {
+            pre: str(ns) for pre, ns in self._namespaces.items() if ns is not None
+        }
+        self._compound: List[str] = sorted(
+            (pre for pre in self._lookup if ":" in pre), key=len, reverse=True
+        )
+        self.expand = lru_cache(maxsize=EXPANSION_CACHE_SIZE)(self._expand)
+
+    @staticmethod
+    def _normalise(prefix) -> str:
+        prefix = str(prefix)
+        return prefix[:-1] if prefix.endswith(":") else prefix
+
+    def _expand(self, s: str) -> Optional[str]:
+        """Returns s with its prefix replaced by the namespace, or None if s does not start with a known prefix"""
+        for pre in self._compound:
+            if s.startswith(pre + ":"):
+                return self._lookup[pre] + s[len(pre) + 1 :]
+
+        pre, colon, local = s.partition(":")
+        if colon and pre in self._lookup:
+            return self._lookup[pre] + local
+        return None
+
+    def __getitem__(self, prefix) -> Union[Namespace, str]:
+        return self._namespaces[self._normalise(prefix)]
+
+    def __contains__(self, prefix) -> bool:
+        return self._normalise(prefix) in self._namespaces
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._namespaces)
+
+    def __len__(self) -> int:
+        return len(self._namespaces)
+
+    def __repr__(self):
+        return f"PrefixExpander({self._namespaces!r})"
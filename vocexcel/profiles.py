@@ -1,3 +1,24 @@
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from rdflib import Graph, Namespace, URIRef
+from rdflib.namespace import DCTERMS, OWL, RDF, RDFS, SDO, SKOS
+
+PROFILES_DIR = Path(__file__).parent
+PROF = Namespace("http://www.w3.org/ns/dx/prof/")
+LABEL_PREDICATES = [SDO.name, DCTERMS.title, RDFS.label, SKOS.prefLabel]
+COMMENT_PREDICATES = [
+    # not in rdflib's closed schema.org namespace, but used by vocpub
+    URIRef("https://schema.org/definition"),
+    SDO.description,
+    DCTERMS.description,
+    RDFS.comment,
+    SKOS.definition,
+]
+
+
 class Profile:
     """A Profile is a specification that constrains, extends, combines, or provides guidance or explanation about
     the usage of other specifications.
@@ -20,6 +41,7 @@ class Profile:
         languages=None,
         default_language="en",
         is_profile_of=None,
+        shapes_path=None,
     ):
         """
         Constructor
@@ -40,6 +62,8 @@ class Profile:
         :type default_language: str
         :param is_profile_of: A list of URIs (strings) that this Profile is a Profile of
         :type is_profile_of: list
+        :param shapes_path: The path of the Turtle file of the SHACL shapes that validate this Profile
+        :type shapes_path: Path
         """
         self.uri = uri
         self.label = label
@@ -49,6 +73,7 @@ class Profile:
         self.languages = languages if languages is not None else ["en"]
         self.default_language = default_language
         self.is_profile_of = is_profile_of
+        self.shapes_path = shapes_path
 
     def __str__(self):
         return self.uri
@@ -76,7 +101,132 @@ VOC_PUB_PROFILE_46 = Profile(
     languages=["en"],
     default_language="en",
     is_profile_of=["https://www.w3.org/TR/skos-reference/"],
+    shapes_path=PROFILES_DIR / "vocpub-46.ttl",
 )
 
 
-PROFILES = {"vocpub-46": VOC_PUB_PROFILE_46}
+def profile_from_shapes(g: Graph, shapes_path: Path) -> Profile:
+    """A Profile described by the owl:Ontology or prof:Profile in its shapes graph. Profiles without either are
+    named after their shapes file"""
+    node = None
+    for cls in (PROF.Profile, OWL.Ontology):
+        node = next(g.subjects(RDF.type, cls), None)
+        if node is not None:
+            break
+
+    def first(predicates, default):
+        for p in predicates:
+            value = g.value(node, p) if node is not None else None
+            if value is not None:
+                return str(value)
+        return default
+
+    return Profile(
+        str(node) if node is not None else shapes_path.resolve().as_uri(),
+        first(LABEL_PREDICATES, shapes_path.stem),
+        first(COMMENT_PREDICATES, ""),
+        RDF_MEDIA_TYPES,
+        "text/turtle",
+        is_profile_of=[str(o) for o in g.objects(node, PROF.isProfileOf)]
+        if node is not None
+        else None,
+        shapes_path=shapes_path,
+    )
+
+
+class ProfileRegistry(Mapping):
+    """Profile token -> Profile, safe to share between threads
+
+    Holds the profiles shipped in the package and any registered from shapes files, each a Turtle file of a
+    profile's SHACL shapes and named {token}.ttl. Register a directory of them to have profiles added, updated and
+    removed as its files are: the directory is scanned again if a token isn't found, or when refresh() is called.
+    """
+
+    def __init__(self, profiles: Optional[Dict[str, Profile]] = None):
+        self._lock = threading.RLock()
+        self._profiles: Dict[str, Profile] = dict(profiles or {})
+        # directory -> token -> modification time of its shapes file when it was registered
+        self._directories: Dict[Path, Dict[str, int]] = {}
+
+    def register(self, token: str, profile: Profile):
+        with self._lock:
+            self._profiles[token] = profile
+
+    def register_file(self, path: Path, token: Optional[str] = None) -> Profile:
+        """Registers the profile whose shapes are in path, reading its metadata from them"""
+        from vocexcel.shapes import SHAPES
+
+        path = Path(path)
+        token = token or path.stem
+        with self._lock:
+            # the placeholder lets SHAPES find the shapes file, which it keeps loaded
+            self.register(
+                token, Profile(str(path), token, "", [], "", shapes_path=path)
+            )
+            try:
+                profile = profile_from_shapes(SHAPES.get(token), path)
+            except Exception:
+                self.unregister(token)
+                raise
+            self.register(token, profile)
+            return profile
+
+    def register_directory(self, directory: Path) -> List[str]:
+        """Registers the profiles of the shapes files in a directory, returning their tokens"""
+        directory = Path(directory)
+        with self._lock:
+            self._directories.setdefault(directory, {})
+            self._scan(directory)
+            return list(self._directories[directory])
+
+    def _scan(self, directory: Path):
+        registered = self._directories[directory]
+        found = {path.stem: path for path in directory.glob("*.ttl")}
+        for token in set(registered) - set(found):
+            del registered[token]
+            self.unregister(token)
+        for token, path in found.items():
+            mtime = path.stat().st_mtime_ns
+            if registered.get(token) != mtime:
+                self.register_file(path, token)
+                registered[token] = mtime
+
+    def refresh(self):
+        """Registers, updates and unregisters the profiles of registered directories as their files have changed"""
+        with self._lock:
+            for directory in self._directories:
+                self._scan(directory)
+
+    def unregister(self, token: str):
+        with self._lock:
+            self._profiles.pop(token, None)
+
+    def shapes_file(self, token: str) -> Optional[Path]:
+        """The shapes file of a registered profile, or None if it isn't registered or has none"""
+        profile = self.get(token)
+        return profile.shapes_path if profile is not None else None
+
+    def __getitem__(self, token: str) -> Profile:
+        try:
+            return self._profiles[token]
+        except KeyError:
+            if not self._directories:
+                raise
+        self.refresh()
+        return self._profiles[token]
+
+    def __contains__(self, token) -> bool:
+        try:
+            self[token]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._profiles))
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+
+PROFILES = ProfileRegistry({"vocpub-46": VOC_PUB_PROFILE_46})
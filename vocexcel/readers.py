@@ -0,0 +1,242 @@
+"""A lightweight reader for the .xlsx workbooks VocExcel converts
+
+An .xlsx file is a zip of XML parts. This reader opens only the workbook manifest, the sheet parts that are actually
+asked for and the shared strings part. Styles, drawings, images, comments, printer settings and any sheets that are
+not read are never parsed.
+
+Sheets are streamed with iterparse so memory use does not grow with the number of rows. The reader offers the small
+part of the openpyxl Workbook/Worksheet API that the 0.5.0+ extractors use: wb[sheet_name], wb.sheetnames,
+wb.close(), sheet.iter_rows(..., values_only=True) and sheet["B3"].value.
+
+Because styles are not read, date cells are returned as Excel serial date numbers rather than datetime objects.
+Use utils.to_date() to read them.
+"""
+import zipfile
+from collections import namedtuple
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Union
+from xml.etree.ElementTree import iterparse
+
+from openpyxl.utils.cell import column_index_from_string, coordinate_to_tuple
+from openpyxl.utils.datetime import from_ISO8601
+
+SML_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+DOC_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+SHARED_STRINGS_REL_TYPE = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings"
+)
+
+Cell = namedtuple("Cell", ["value"])
+
+
+def _part_path(target: str) -> str:
+    # relationship targets are relative to xl/ unless absolute
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return "xl/" + target
+
+
+class SharedStrings:
+    """The workbook's shared strings table, parsed incrementally as far as the highest index asked for"""
+
+    def __init__(self, archive: zipfile.ZipFile, part: Optional[str]):
+        self._strings: List[str] = []
+        self._parser = self._parse(archive, part) if part is not None else iter(())
+
+    @staticmethod
+    def _parse(archive: zipfile.ZipFile, part: str) -> Iterator[str]:
+        with archive.open(part) as f:
+            sst = None
+            for event, elem in iterparse(f, events=("start", "end")):
+                if event == "start":
+                    if sst is None:
+                        sst = elem
+                    continue
+                if elem.tag == f"{SML_NS}si":
+                    yield _text(elem)
+                    sst.clear()
+
+    def __getitem__(self, index: int) -> str:
+        while index >= len(self._strings):
+            try:
+                self._strings.append(next(self._parser))
+            except StopIteration:
+                raise IndexError(f"No shared string with index {index}")
+        return self._strings[index]
+
+
+def _text(elem) -> str:
+    """The text of a string item: either a plain <t> or rich text runs <r><t>. Phonetic runs, <rPh>, are ignored"""
+    text = []
+    for child in elem:
+        if child.tag == f"{SML_NS}t":
+            text.append(child.text or "")
+        elif child.tag == f"{SML_NS}r":
+            text.extend(t.text or "" for t in child.iter(f"{SML_NS}t"))
+    return "".join(text)
+
+
+def _cell_value(c, shared_strings: SharedStrings):
+    data_type = c.get("t", "n")
+    if data_type == "inlineStr":
+        is_ = c.find(f"{SML_NS}is")
+        return _text(is_) if is_ is not None else None
+
+    v = c.find(f"{SML_NS}v")
+    if v is None or v.text is None:
+        return None
+    value = v.text
+    if data_type == "s":
+        return shared_strings[int(value)]
+    elif data_type == "n":
+        if "." in value or "E" in value or "e" in value:
+            return float(value)
+        return int(value)
+    elif data_type == "b":
+        return bool(int(value))
+    elif data_type == "d":
+        return from_ISO8601(value)
+    # str (formula results) and e (errors)
+    return value
+
+
+class XlsxSheet:
+    """A single worksheet part, streamed on each iteration"""
+
+    def __init__(self, workbook: "XlsxWorkbook", title: str, part: str):
+        self.parent = workbook
+        self.title = title
+        self._part = part
+
+    def _rows(self) -> Iterator[tuple[int, dict[int, object]]]:
+        """Yields (row number, {column number: value}) for each row in the sheet part"""
+        shared_strings = self.parent.shared_strings
+        with self.parent.archive.open(self._part) as f:
+            sheet_data = None
+            last_row = 0
+            for event, elem in iterparse(f, events=("start", "end")):
+                if event == "start":
+                    if elem.tag == f"{SML_NS}sheetData":
+                        sheet_data = elem
+                    continue
+                if elem.tag != f"{SML_NS}row":
+                    if elem.tag == f"{SML_NS}sheetData":
+                        return
+                    continue
+                row_no = int(elem.get("r", last_row + 1))
+                last_row = row_no
+                values = {}
+                last_col = 0
+                for c in elem.iter(f"{SML_NS}c"):
+                    ref = c.get("r")
+                    col = (
+                        column_index_from_string(ref.rstrip("0123456789"))
+                        if ref is not None
+                        else last_col + 1
+                    )
+                    last_col = col
+                    value = _cell_value(c, shared_strings)
+                    if value is not None:
+                        values[col] = value
+                yield row_no, values
+                if sheet_data is not None:
+                    sheet_data.clear()
+
+    def iter_rows(
+        self,
+        min_row: int = 1,
+        max_row: Optional[int] = None,
+        min_col: int = 1,
+        max_col: Optional[int] = None,
+        values_only: bool = True,
+    ) -> Iterator[tuple]:
+        """Yields a tuple of cell values for each row from min_row to max_row, or to the sheet's last row.
+
+        As for openpyxl's read-only worksheets, rows missing from within the sheet part are yielded as empty rows
+        and, if max_col is given, every row is padded to it."""
+        if not values_only:
+            raise ValueError("The xlsx reader can only return cell values")
+
+        def as_tuple(values: dict) -> tuple:
+            last_col = max_col if max_col is not None else max(values, default=0)
+            return tuple(values.get(col) for col in range(min_col, last_col + 1))
+
+        expected_row = min_row
+        for row_no, values in self._rows():
+            if row_no < min_row:
+                continue
+            if max_row is not None and row_no > max_row:
+                break
+            while expected_row < row_no:
+                yield as_tuple({})
+                expected_row += 1
+            yield as_tuple(values)
+            expected_row = row_no + 1
+
+    def cell(self, row: int, column: int) -> Cell:
+        for values in self.iter_rows(
+            min_row=row, max_row=row, min_col=column, max_col=column
+        ):
+            return Cell(values[0])
+        return Cell(None)
+
+    def __getitem__(self, coordinate: str) -> Cell:
+        row, column = coordinate_to_tuple(coordinate)
+        return self.cell(row, column)
+
+    def __repr__(self):
+        return f'<XlsxSheet "{self.title}">'
+
+
+class XlsxWorkbook:
+    """An .xlsx workbook read part by part. Only the manifest is read on opening"""
+
+    def __init__(self, file: Union[Path, str, BinaryIO]):
+        try:
+            self.archive = zipfile.ZipFile(file)
+        except zipfile.BadZipFile as e:
+            raise ValueError(f"The file supplied is not an .xlsx workbook: {e}")
+
+        targets = {}
+        shared_strings_part = None
+        with self.archive.open("xl/_rels/workbook.xml.rels") as f:
+            for _, elem in iterparse(f):
+                if elem.tag == f"{REL_NS}Relationship":
+                    targets[elem.get("Id")] = _part_path(elem.get("Target"))
+                    if elem.get("Type") == SHARED_STRINGS_REL_TYPE:
+                        shared_strings_part = targets[elem.get("Id")]
+
+        self._sheet_parts = {}
+        with self.archive.open("xl/workbook.xml") as f:
+            for _, elem in iterparse(f):
+                if elem.tag == f"{SML_NS}sheet":
+                    self._sheet_parts[elem.get("name")] = targets[
+                        elem.get(f"{DOC_REL_NS}id")
+                    ]
+
+        self._shared_strings_part = shared_strings_part
+        self._shared_strings = None
+
+    @property
+    def shared_strings(self) -> SharedStrings:
+        if self._shared_strings is None:
+            self._shared_strings = SharedStrings(
+                self.archive, self._shared_strings_part
+            )
+        return self._shared_strings
+
+    @property
+    def sheetnames(self) -> List[str]:
+        return list(self._sheet_parts.keys())
+
+    def __getitem__(self, name: str) -> XlsxSheet:
+        if name not in self._sheet_parts:
+            raise KeyError(f"Worksheet {name} does not exist.")
+        return XlsxSheet(self, name, self._sheet_parts[name])
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._sheet_parts
+
+    def close(self):
+        self.archive.close()
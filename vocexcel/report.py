@@ -0,0 +1,214 @@
+"""Structured reports of a vocabulary's validation
+
+pyshacl, and the native validator, give a graph's validation results as an RDF results graph. ValidationReport reads
+them out of it in one pass per result property into typed ValidationResults, grouped by severity and then focus node.
+Nothing is formatted until the report is rendered: as plain text, as text coloured for the console, or as a dict
+ready to be serialised as JSON.
+"""
+from enum import IntEnum
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from colorama import Fore, Style
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.namespace import RDF, SH
+from rdflib.term import Node
+
+
+class Severity(IntEnum):
+    """A result's severity, numbered as VocExcel's error and message levels are"""
+
+    INFO = 1
+    WARNING = 2
+    VIOLATION = 3
+
+    @property
+    def local_name(self) -> str:
+        return self.name.capitalize()
+
+
+SEVERITIES = {
+    SH.Info: Severity.INFO,
+    SH.Warning: Severity.WARNING,
+    SH.Violation: Severity.VIOLATION,
+}
+COLOURS = {
+    Severity.INFO: Fore.BLUE,
+    Severity.WARNING: Fore.YELLOW,
+    Severity.VIOLATION: Fore.RED,
+}
+RESULT_PROPERTIES = {
+    SH.resultSeverity: "severity",
+    SH.focusNode: "focus_node",
+    SH.resultPath: "path",
+    SH.value: "value",
+    SH.sourceShape: "source_shape",
+    SH.sourceConstraintComponent: "constraint_component",
+    SH.resultMessage: "message",
+}
+# what pyshacl.validate() returns, as the native, parallel and incremental validators do: (conforms, results_graph,
+# results_text)
+Results = Tuple[bool, Graph, str]
+
+
+def new_results_graph(namespaces: Iterable[Tuple[str, URIRef]]) -> Tuple[Graph, BNode]:
+    """An empty results graph binding namespaces, and its sh:ValidationReport node to add results to"""
+    results_graph = Graph(bind_namespaces="core")
+    for pre, ns in namespaces:
+        results_graph.bind(pre, ns)
+    report = BNode()
+    results_graph.add((report, RDF.type, SH.ValidationReport))
+    return results_graph, report
+
+
+def finish_results(results_graph: Graph, report: BNode, conforms: bool) -> Results:
+    """Records whether the graph conforms in report, returning the results with their text as pyshacl gives it"""
+    results_graph.add((report, SH.conforms, Literal(conforms)))
+    results_text = f"Validation Report\nConforms: {conforms}\n"
+    results = len(set(results_graph.objects(report, SH.result)))
+    if results > 0:
+        results_text += f"Results ({results}):\n"
+    return conforms, results_graph, results_text
+
+
+class ValidationResult(NamedTuple):
+    severity: Severity
+    focus_node: Node
+    source_shape: Node
+    constraint_component: Node
+    message: str = ""
+    path: Optional[Node] = None
+    value: Optional[Node] = None
+
+    def text(self, coloured: bool = False) -> str:
+        component = str(self.constraint_component)
+        label = f"{self.severity.name}: "
+        if coloured:
+            label = COLOURS[self.severity] + label + Style.RESET_ALL
+        return f"""{label}Validation Result in {component.split(str(SH))[-1]} ({component}):
+\tSeverity: sh:{self.severity.local_name}
+\tSource Shape: <{self.source_shape}>
+\tFocus Node: <{self.focus_node}>
+\tValue Node: <{self.value if self.value is not None else ''}>
+\tMessage: {self.message}
+"""
+
+    def to_dict(self) -> dict:
+        return {
+            "severity": self.severity.local_name,
+            "focusNode": str(self.focus_node),
+            "resultPath": str(self.path) if self.path is not None else None,
+            "value": str(self.value) if self.value is not None else None,
+            "sourceShape": str(self.source_shape),
+            "sourceConstraintComponent": str(self.constraint_component),
+            "message": self.message,
+        }
+
+
+class ValidationReport:
+    """The results of validating a vocabulary against a profile"""
+
+    def __init__(
+        self,
+        conforms: bool,
+        results: List[ValidationResult],
+        profile: Optional[str] = None,
+    ):
+        self.conforms = conforms
+        self.results = results
+        self.profile = profile
+        self._grouped: Optional[
+            Dict[Severity, Dict[Node, List[ValidationResult]]]
+        ] = None
+
+    @classmethod
+    def from_graph(
+        cls,
+        results_graph: Graph,
+        conforms: Optional[bool] = None,
+        profile: Optional[str] = None,
+    ) -> "ValidationReport":
+        """Reads the results of a SHACL validation report's results graph. Results of severities other than
+        sh:Info, sh:Warning and sh:Violation are left out"""
+        values: Dict[Node, dict] = {
+            r: {} for r in results_graph.objects(None, SH.result)
+        }
+        for p, field in RESULT_PROPERTIES.items():
+            for r, o in results_graph.subject_objects(p):
+                result = values.get(r)
+                if result is not None:
+                    result[field] = o
+
+        results = []
+        for result in values.values():
+            severity = SEVERITIES.get(result.get("severity"))
+            if severity is None:
+                continue
+            result["severity"] = severity
+            result["message"] = str(result.get("message", ""))
+            results.append(ValidationResult(**result))
+
+        if conforms is None:
+            conforms = bool(
+                results_graph.value(predicate=SH.conforms, default=Literal(True))
+            )
+        return cls(conforms, results, profile)
+
+    def by_severity(self) -> Dict[Severity, Dict[Node, List[ValidationResult]]]:
+        """The results grouped by severity, most severe first, then by focus node"""
+        if self._grouped is None:
+            grouped: Dict[Severity, Dict[Node, List[ValidationResult]]] = {
+                severity: {} for severity in sorted(Severity, reverse=True)
+            }
+            for result in self.results:
+                grouped[result.severity].setdefault(result.focus_node, []).append(
+                    result
+                )
+            self._grouped = grouped
+        return self._grouped
+
+    def __iter__(self) -> Iterator[ValidationResult]:
+        """The results in the order they are grouped in"""
+        for focus_nodes in self.by_severity().values():
+            for results in focus_nodes.values():
+                yield from results
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def count(self, min_severity: Severity = Severity.INFO) -> int:
+        """The number of results at or above min_severity"""
+        return sum(
+            len(results)
+            for severity, focus_nodes in self.by_severity().items()
+            if severity >= min_severity
+            for results in focus_nodes.values()
+        )
+
+    def text(self, coloured: bool = False) -> str:
+        lines = [f"Validation Report\nConforms: {self.conforms}\n"]
+        if self.results:
+            lines.append(f"Results ({len(self.results)}):\n")
+        lines.extend(result.text(coloured) for result in self)
+        return "".join(lines)
+
+    def __str__(self) -> str:
+        return self.text()
+
+    def to_dict(self) -> dict:
+        """The report as a dict ready to be serialised as JSON, its results grouped by severity and focus node"""
+        grouped = self.by_severity()
+        return {
+            "profile": self.profile,
+            "conforms": self.conforms,
+            "counts": {
+                severity.local_name: sum(len(r) for r in focus_nodes.values())
+                for severity, focus_nodes in grouped.items()
+            },
+            "results": {
+                severity.local_name: {
+                    str(focus_node): [result.to_dict() for result in results]
+                    for focus_node, results in focus_nodes.items()
+                }
+                for severity, focus_nodes in grouped.items()
+            },
+        }
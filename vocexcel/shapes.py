@@ -0,0 +1,124 @@
+"""The SHACL shapes graphs that vocabularies are validated against
+
+Parsing a profile's shapes file costs about as much as validating a small vocabulary, so the parsed graph is kept for
+the life of the process and shared by every validation. A shapes file is read again only if its modification time
+changes. Use SHAPES.get(profile) rather than parsing a profile's file:
+
+    pyshacl.validate(data_graph, shacl_graph=SHAPES.get("vocpub-46"))
+
+Short-lived processes, such as CLI runs in CI, still pay for parsing once, so each profile's Turtle is also compiled
+into a binary artifact, {profile}.shapes, that is shipped in the package and loaded instead. An artifact is a
+vocexcel.snapshot of the shapes graph, which only holds terms and triples, so loading one can't run code, and whose
+content hash is checked before it is decoded. It records the SHA-256 of the Turtle it was compiled from and is
+ignored once the Turtle changes. Artifacts are only written by compiling them, never while validating. To compile
+the artifacts of all profiles, including those registered from other directories, run:
+
+    python -m vocexcel.shapes
+"""
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from pyshacl.shapes_graph import ShapesGraph
+from rdflib import Graph
+
+from vocexcel import profiles
+
+SHAPES_DIR = Path(__file__).parent
+# increment when the layout of compiled shapes changes
+COMPILED_SHAPES_VERSION = 2
+
+
+def shapes_file(profile: str) -> Path:
+    """The shapes file of a registered profile or, for others, {profile}.ttl in SHAPES_DIR"""
+    path = profiles.PROFILES.shapes_file(profile)
+    return path if path is not None else SHAPES_DIR / f"{profile}.ttl"
+
+
+def compiled_shapes_file(profile: str) -> Path:
+    return shapes_file(profile).with_suffix(".shapes")
+
+
+def _sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _metadata(sha256: str) -> dict:
+    return {"compiledShapesVersion": COMPILED_SHAPES_VERSION, "sha256": sha256}
+
+
+def compile_shapes(profile: str) -> Path:
+    """Compiles a profile's shapes file, returning the path of the artifact"""
+    # imported here, as vocexcel.snapshot imports vocexcel.utils, which imports this module
+    from vocexcel.snapshot import snapshot_bytes
+
+    path = shapes_file(profile)
+    g = Graph().parse(path, format="turtle")
+    compiled = compiled_shapes_file(profile)
+    compiled.write_bytes(snapshot_bytes(g, _metadata(_sha256(path))))
+    return compiled
+
+
+def load_compiled_shapes(profile: str) -> Optional[Graph]:
+    """The shapes graph from a profile's artifact, or None if there is no artifact, it is corrupt or it is stale"""
+    from vocexcel.snapshot import SnapshotError, read_snapshot
+
+    try:
+        snapshot = read_snapshot(compiled_shapes_file(profile))
+    except (OSError, SnapshotError):
+        return None
+    if snapshot.metadata != _metadata(_sha256(shapes_file(profile))):
+        return None
+    return snapshot.graph()
+
+
+def load_shapes(profile: str) -> Graph:
+    g = load_compiled_shapes(profile)
+    if g is None:
+        g = Graph().parse(shapes_file(profile), format="turtle")
+    # pyshacl adds a few triples of its own to a shapes graph the first time it validates with it. Add them now so
+    # that the graph is only read, never written, once it is shared.
+    ShapesGraph(g)
+    return g
+
+
+class ShapesCache:
+    """Profile token -> parsed shapes graph, safe to share between threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._graphs: Dict[str, Tuple[Tuple[Path, int], Graph]] = {}
+
+    def get(self, profile: str) -> Graph:
+        path = shapes_file(profile)
+        version = (path, path.stat().st_mtime_ns)
+        with self._lock:
+            cached = self._graphs.get(profile)
+            if cached is None or cached[0] != version:
+                cached = self._graphs[profile] = (version, load_shapes(profile))
+            return cached[1]
+
+    def preload(self, tokens: Optional[Iterable[str]] = None):
+        """Loads the shapes of the given profiles, by default all registered profiles, so that their first
+        validations don't wait for them"""
+        for profile in tokens if tokens is not None else list(profiles.PROFILES):
+            self.get(profile)
+
+    def clear(self):
+        with self._lock:
+            self._graphs.clear()
+
+    def __contains__(self, profile: str) -> bool:
+        return profile in self._graphs
+
+    def __len__(self) -> int:
+        return len(self._graphs)
+
+
+SHAPES = ShapesCache()
+
+
+if __name__ == "__main__":
+    for profile in profiles.PROFILES:
+        print(f"Compiled {compile_shapes(profile)}")
@@ -0,0 +1,153 @@
+"""Triple sinks: destinations that receive triples as a converter produces them
+
+The extractors and models.Vocabulary.to_graph() accept either an rdflib Graph or a sink. Sinks offer the two Graph
+methods that converters use, add()/addN() and bind(), so either can be passed.
+
+Streaming sinks write each triple out as soon as it is received. This keeps memory use bounded for any size of
+vocabulary, but triples are not de-duplicated, as a Graph would do.
+"""
+import io
+from pathlib import Path
+from typing import List, Optional, TextIO, Union
+
+from rdflib import Graph, URIRef
+from rdflib.namespace import RDF, SKOS
+from rdflib.plugins.serializers.nquads import _nq_row
+from rdflib.plugins.serializers.nt import _nt_row
+
+from vocexcel.utils import open_file
+
+STREAMING_FORMATS = ["nt", "nquads"]
+
+
+class TripleSink:
+    """Base class for triple sinks. Subclasses must implement add()"""
+
+    def add(self, triple):
+        raise NotImplementedError
+
+    def addN(self, quads):
+        # the context of each quad is the sink itself
+        for s, p, o, _ in quads:
+            self.add((s, p, o))
+
+    def bind(self, prefix, namespace, override=True, replace=False):
+        # line-based formats have no prefixes
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class GraphSink(TripleSink):
+    """Collects triples in an in-memory Graph"""
+
+    def __init__(self, graph: Optional[Graph] = None):
+        self.graph = graph if graph is not None else Graph(bind_namespaces="rdflib")
+
+    def add(self, triple):
+        self.graph.add(triple)
+
+    def addN(self, quads):
+        self.graph.addN((s, p, o, self.graph) for s, p, o, _ in quads)
+
+    def bind(self, prefix, namespace, override=True, replace=False):
+        self.graph.bind(prefix, namespace, override=override, replace=replace)
+
+
+class NTriplesSink(TripleSink):
+    """Writes triples as N-Triples to destination: a file path, compressed if it ends with a compression suffix such
+    as .gz, an open text stream or, if None, an in-memory buffer that getvalue() returns
+    """
+
+    def __init__(self, destination: Union[Path, str, TextIO, None] = None):
+        self._owns_destination = isinstance(destination, (Path, str))
+        if destination is None:
+            self.destination = io.StringIO()
+        elif self._owns_destination:
+            self.destination = open_file(destination, "wt")
+        else:
+            self.destination = destination
+
+    def add(self, triple):
+        self.destination.write(_nt_row(triple))
+
+    def getvalue(self) -> str:
+        return self.destination.getvalue()
+
+    def close(self):
+        if self._owns_destination:
+            self.destination.close()
+
+
+class NQuadsSink(NTriplesSink):
+    """Writes triples as N-Quads in a named graph, one per vocabulary.
+
+    If no graph_name is given, the graph is named for the vocabulary's ConceptScheme: triples are held back until
+    the ConceptScheme is declared.
+    """
+
+    def __init__(
+        self,
+        destination: Union[Path, str, TextIO, None] = None,
+        graph_name: Optional[URIRef] = None,
+    ):
+        super().__init__(destination)
+        self.graph_name = graph_name
+        self._pending: List[tuple] = []
+
+    def add(self, triple):
+        if self.graph_name is None:
+            if triple[1] == RDF.type and triple[2] == SKOS.ConceptScheme:
+                self.graph_name = triple[0]
+            else:
+                self._pending.append(triple)
+                return
+            self._flush()
+        self.destination.write(_nq_row(triple, self.graph_name))
+
+    def _flush(self):
+        for triple in self._pending:
+            self.destination.write(_nq_row(triple, self.graph_name))
+        self._pending = []
+
+    def getvalue(self) -> str:
+        self._flush()
+        return super().getvalue()
+
+    def close(self):
+        self._flush()
+        super().close()
+
+
+def make_sink(
+    output_format: str, destination: Union[Path, str, TextIO, None] = None
+) -> TripleSink:
+    """Returns a streaming sink writing output_format to destination"""
+    if output_format == "nt":
+        return NTriplesSink(destination)
+    elif output_format == "nquads":
+        return NQuadsSink(destination)
+    raise ValueError(
+        f"The streaming output format must be one of '{', '.join(STREAMING_FORMATS)}' "
+        f"but you selected {output_format}"
+    )
+
+
+def write_graph(
+    g: Graph,
+    output_format: str,
+    destination: Union[Path, str, TextIO, None] = None,
+) -> Optional[str]:
+    """Writes an already-built graph through a streaming sink. Returns the output if no destination is given"""
+    with make_sink(output_format, destination) as sink:
+        for triple in g:
+            sink.add(triple)
+        if destination is None:
+            return sink.getvalue()
@@ -0,0 +1,329 @@
+"""A compact binary snapshot of a converted vocabulary, for services that load it again and again
+
+Parsing a vocabulary's Turtle with rdflib is slow: every term is tokenised, unescaped and looked up in a prefix map
+anew. A snapshot holds the graph as a dictionary of its distinct terms and its triples as integers indexing into it,
+which are read back as machine arrays, so reloading it only costs making each term once and adding the triples:
+
+    excel_to_rdf(path, output_format="snapshot", output_file_path=Path("vocab.vocsnap"))
+    g = load_snapshot(Path("vocab.vocsnap"))
+
+read_snapshot() returns a Snapshot instead, which answers triple patterns from the arrays without building a Graph.
+
+The layout, all integers little-endian, is:
+
+* the magic bytes b"VXSNAP", the version as an unsigned short and the length of the header as an unsigned int
+* the header: UTF-8 JSON holding the ConceptScheme's IRI, the graph's prefixes, the numbers of strings, terms and
+  triples, the length of the strings' text, the SHA-256 of the compressed body and any metadata given when writing
+* the body, compressed with zlib: the strings' offsets into their text, as unsigned ints; their text, UTF-8 encoded; a
+  byte per term for its kind; for each term its value's, datatype's and language's string, as ints, -1 for none; and
+  three unsigned ints per triple, its terms' indexes
+"""
+import hashlib
+import json
+import struct
+import sys
+import zlib
+from array import array
+from pathlib import Path
+from typing import IO, Dict, Iterator, List, Optional, Tuple, Union
+
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.namespace import RDF, SKOS
+from rdflib.term import Node
+
+from vocexcel.utils import ConversionError, open_file
+
+MAGIC = b"VXSNAP"
+SNAPSHOT_VERSION = 1
+PREAMBLE = struct.Struct("<6sHI")
+
+URI, BLANK, LITERAL = 0, 1, 2
+
+
+def _little_endian(a: array) -> array:
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a
+
+
+def _read_array(typecode: str, data: memoryview, offset: int, count: int):
+    a = array(typecode)
+    end = offset + count * a.itemsize
+    a.frombytes(data[offset:end])
+    return _little_endian(a), end
+
+
+class SnapshotError(ConversionError):
+    pass
+
+
+def snapshot_bytes(g: Graph, metadata: Optional[dict] = None) -> bytes:
+    """g as a snapshot, with metadata, a dict that can be written as JSON, in its header"""
+    strings: Dict[str, int] = {}
+    terms: Dict[Node, int] = {}
+    kinds = bytearray()
+    values = array("I")
+    datatypes = array("i")
+    languages = array("i")
+    triples = array("I")
+
+    def string(s: Optional[str]) -> int:
+        if s is None:
+            return -1
+        i = strings.get(s)
+        if i is None:
+            i = strings[s] = len(strings)
+        return i
+
+    def term(t: Node) -> int:
+        i = terms.get(t)
+        if i is None:
+            i = terms[t] = len(terms)
+            if isinstance(t, Literal):
+                kinds.append(LITERAL)
+                datatypes.append(string(t.datatype))
+                languages.append(string(t.language))
+            else:
+                kinds.append(BLANK if isinstance(t, BNode) else URI)
+                datatypes.append(-1)
+                languages.append(-1)
+            values.append(string(str(t)))
+        return i
+
+    for s, p, o in g:
+        triples.append(term(s))
+        triples.append(term(p))
+        triples.append(term(o))
+
+    offsets = array("I", [0])
+    total = 0
+    for s in strings:
+        total += len(s)
+        offsets.append(total)
+    text = "".join(strings).encode("utf-8")
+    body = zlib.compress(
+        b"".join(
+            [
+                _little_endian(offsets).tobytes(),
+                text,
+                bytes(kinds),
+                _little_endian(values).tobytes(),
+                _little_endian(datatypes).tobytes(),
+                _little_endian(languages).tobytes(),
+                _little_endian(triples).tobytes(),
+            ]
+        ),
+        6,
+    )
+
+    header = json.dumps(
+        {
+            "scheme": next(
+                (str(s) for s in g.subjects(RDF.type, SKOS.ConceptScheme)), None
+            ),
+            "namespaces": [[prefix, str(ns)] for prefix, ns in g.namespaces()],
+            "strings": len(strings),
+            "textBytes": len(text),
+            "terms": len(terms),
+            "triples": len(triples) // 3,
+            "sha256": hashlib.sha256(body).hexdigest(),
+            "metadata": metadata or {},
+        }
+    ).encode("utf-8")
+    return PREAMBLE.pack(MAGIC, SNAPSHOT_VERSION, len(header)) + header + body
+
+
+def write_snapshot(
+    g: Graph, destination: Union[Path, str, IO[bytes], None] = None
+) -> Optional[bytes]:
+    """Writes g as a snapshot to destination, a path or an open binary stream, or returns it if no destination is
+    given"""
+    data = snapshot_bytes(g)
+    if destination is None:
+        return data
+    if isinstance(destination, (Path, str)):
+        with open_file(destination, "wb") as f:
+            f.write(data)
+    else:
+        destination.write(data)
+
+
+class Snapshot:
+    """A snapshot's terms and triples, answering triple patterns read-only
+
+    Triples are given as rdflib terms, each made once, the first time it is needed. A term's triples are found in
+    an index made the first time a pattern is matched with a term in its position."""
+
+    def __init__(self, data: bytes, verify: bool = True):
+        view = memoryview(data)
+        if len(view) < PREAMBLE.size:
+            raise SnapshotError("This is not a VocExcel snapshot")
+        magic, version, header_length = PREAMBLE.unpack_from(view)
+        if magic != MAGIC:
+            raise SnapshotError("This is not a VocExcel snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(
+                f"This snapshot is of version {version}, but only version {SNAPSHOT_VERSION} snapshots can be read"
+            )
+        offset = PREAMBLE.size
+        try:
+            header = json.loads(bytes(view[offset : offset + header_length]))
+        except ValueError as e:
+            raise SnapshotError(f"This snapshot is corrupt: {e}") from e
+        offset += header_length
+        compressed = view[offset:]
+        if verify and hashlib.sha256(compressed).hexdigest() != header["sha256"]:
+            raise SnapshotError("This snapshot is corrupt: its content hash differs")
+
+        self.scheme: Optional[URIRef] = (
+            URIRef(header["scheme"]) if header["scheme"] is not None else None
+        )
+        self.namespaces: List[Tuple[str, URIRef]] = [
+            (prefix, URIRef(ns)) for prefix, ns in header["namespaces"]
+        ]
+        self.sha256: str = header["sha256"]
+        self.metadata: dict = header.get("metadata", {})
+        try:
+            body = memoryview(zlib.decompress(compressed))
+            n_terms = header["terms"]
+            offsets, offset = _read_array("I", body, 0, header["strings"] + 1)
+            text_end = offset + header["textBytes"]
+            self._text = str(body[offset:text_end], "utf-8")
+            self._offsets = offsets
+            self._kinds = bytes(body[text_end : text_end + n_terms])
+            offset = text_end + n_terms
+            self._values, offset = _read_array("I", body, offset, n_terms)
+            self._datatypes, offset = _read_array("i", body, offset, n_terms)
+            self._languages, offset = _read_array("i", body, offset, n_terms)
+            self._triples, offset = _read_array(
+                "I", body, offset, 3 * header["triples"]
+            )
+        except (KeyError, ValueError, UnicodeDecodeError, zlib.error) as e:
+            raise SnapshotError(f"This snapshot is corrupt: {e}") from e
+        if offset != len(body):
+            raise SnapshotError("This snapshot is corrupt: its body is truncated")
+
+        self._terms: List[Optional[Node]] = [None] * n_terms
+        self._ids: Optional[Dict[Node, int]] = None
+        self._indexes: Dict[int, Dict[int, List[int]]] = {}
+
+    def _string(self, i: int) -> Optional[str]:
+        if i < 0:
+            return None
+        return self._text[self._offsets[i] : self._offsets[i + 1]]
+
+    def term(self, i: int) -> Node:
+        t = self._terms[i]
+        if t is None:
+            value = self._string(self._values[i])
+            kind = self._kinds[i]
+            if kind == URI:
+                t = URIRef(value)
+            elif kind == BLANK:
+                t = BNode(value)
+            else:
+                datatype = self._string(self._datatypes[i])
+                t = Literal(
+                    value,
+                    lang=self._string(self._languages[i]),
+                    datatype=URIRef(datatype) if datatype is not None else None,
+                )
+            self._terms[i] = t
+        return t
+
+    def terms(self) -> List[Node]:
+        """All the snapshot's terms, in the order of their ids"""
+        return [self.term(i) for i in range(len(self._terms))]
+
+    def _id(self, t: Node) -> Optional[int]:
+        if self._ids is None:
+            self._ids = {term: i for i, term in enumerate(self.terms())}
+        return self._ids.get(t)
+
+    def _index(self, position: int) -> Dict[int, List[int]]:
+        index = self._indexes.get(position)
+        if index is None:
+            index = self._indexes[position] = {}
+            triples = self._triples
+            for n in range(0, len(triples), 3):
+                index.setdefault(triples[n + position], []).append(n)
+        return index
+
+    def triples(
+        self, pattern: Tuple[Optional[Node], Optional[Node], Optional[Node]]
+    ) -> Iterator[Tuple[Node, Node, Node]]:
+        """The triples matching pattern, None matching any term"""
+        ids = []
+        for t in pattern:
+            if t is None:
+                ids.append(None)
+                continue
+            i = self._id(t)
+            if i is None:
+                return
+            ids.append(i)
+
+        triples = self._triples
+        bound = [position for position, i in enumerate(ids) if i is not None]
+        if bound:
+            # look up the most selective of the bound terms
+            candidates = min(
+                (self._index(position).get(ids[position], []) for position in bound),
+                key=len,
+            )
+        else:
+            candidates = range(0, len(triples), 3)
+        term = self.term
+        for n in candidates:
+            if all(triples[n + position] == ids[position] for position in bound):
+                yield term(triples[n]), term(triples[n + 1]), term(triples[n + 2])
+
+    def value(self, subject: Node, predicate: Node) -> Optional[Node]:
+        for _, _, o in self.triples((subject, predicate, None)):
+            return o
+        return None
+
+    def __iter__(self) -> Iterator[Tuple[Node, Node, Node]]:
+        return self.triples((None, None, None))
+
+    def __contains__(self, triple) -> bool:
+        return next(self.triples(triple), None) is not None
+
+    def __len__(self) -> int:
+        return len(self._triples) // 3
+
+    def graph(self) -> Graph:
+        """The snapshot as an rdflib Graph, with its prefixes"""
+        g = Graph(bind_namespaces="none")
+        for prefix, namespace in self.namespaces:
+            g.bind(prefix, namespace)
+        terms = self.terms()
+        triples = self._triples
+        # the terms are known to be valid, so the store is given them without Graph.addN()'s checks
+        g.store.addN(
+            (terms[triples[n]], terms[triples[n + 1]], terms[triples[n + 2]], g)
+            for n in range(0, len(triples), 3)
+        )
+        return g
+
+
+def read_snapshot(
+    source: Union[Path, str, bytes, IO[bytes]], verify: bool = True
+) -> Snapshot:
+    """Reads a snapshot from source: a path, the snapshot's bytes or an open binary stream. Its content hash is
+    checked unless verify is False"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        data = source
+    elif isinstance(source, (Path, str)):
+        with open_file(source, "rb") as f:
+            data = f.read()
+    else:
+        data = source.read()
+    return Snapshot(data, verify)
+
+
+def load_snapshot(
+    source: Union[Path, str, bytes, IO[bytes]], verify: bool = True
+) -> Graph:
+    """Reads a snapshot from source, as read_snapshot() does, into an rdflib Graph"""
+    return read_snapshot(source, verify).graph()
@@ -0,0 +1,56 @@
+"""Interning of the RDF terms VocExcel creates while converting
+
+The same IRIs and Literals are made over and over during a conversion: the ConceptScheme IRI on every inScheme and
+isDefinedBy triple, narrower IRIs that are also Concepts, agents' IRIs, and Literals such as history notes and
+citations that repeat across rows. A TermFactory hands back the one term object for equal inputs, so repeated terms
+are neither re-validated nor re-allocated.
+
+The factory is bounded: once it holds maxsize terms of a kind, the least recently used ones are dropped. It is safe
+to share between threads. TERMS is the factory the converters use; TERMS.stats() reports how well it is doing.
+"""
+from functools import lru_cache
+from typing import Any, Dict
+
+from rdflib import Literal, URIRef
+
+TERM_CACHE_SIZE = 65536
+
+
+class TermFactory:
+    """Makes URIRefs and Literals, returning previously made terms for equal inputs"""
+
+    def __init__(self, maxsize: int = TERM_CACHE_SIZE):
+        self.maxsize = maxsize
+        # the caches are the factory methods themselves, so a hit costs no more than a dict lookup
+        self.uriref = lru_cache(maxsize=maxsize)(URIRef)
+        # typed, as 1, 1.0 and True are otherwise the same key
+        self.literal = lru_cache(maxsize=maxsize, typed=True)(Literal)
+
+    @property
+    def hits(self) -> int:
+        return self.uriref.cache_info().hits + self.literal.cache_info().hits
+
+    @property
+    def misses(self) -> int:
+        return self.uriref.cache_info().misses + self.literal.cache_info().misses
+
+    @property
+    def hit_rate(self) -> float:
+        hits, misses = self.hits, self.misses
+        return hits / (hits + misses) if hits + misses else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "urirefs": self.uriref.cache_info().currsize,
+            "literals": self.literal.cache_info().currsize,
+        }
+
+    def clear(self):
+        self.uriref.cache_clear()
+        self.literal.cache_clear()
+
+
+TERMS = TermFactory()
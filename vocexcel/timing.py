@@ -0,0 +1,215 @@
+"""Per-shape timings of a validation, to find the shapes that make it slow
+
+Pass a ShapeTimings to validate_with_profile() to have it record, for each NodeShape and PropertyShape of the profile,
+the wall time spent validating with it and the number of focus nodes it was given:
+
+    timings = ShapeTimings()
+    validate_with_profile(g, timings=timings)
+    print(timings.table())
+
+A shape's time includes that of the shapes it refers to, such as its property shapes or the alternatives of its sh:or,
+and, for shapes with targets, the time taken to find their focus nodes. Both the native validator and pyshacl are
+instrumented: pyshacl's Shape is patched while any thread is recording timings with it, and the patch only records in
+threads that are.
+"""
+import inspect
+import threading
+from time import perf_counter
+from typing import Dict, List, Optional
+
+from pyshacl.rdfutil import stringify_node
+from pyshacl.shape import Shape
+from rdflib import BNode, Graph
+from rdflib.namespace import RDF, SH
+from rdflib.term import Node
+
+
+class ShapeTiming:
+    __slots__ = ("seconds", "focus_nodes", "calls")
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.focus_nodes = 0
+        self.calls = 0
+
+
+class ShapeTimings:
+    """Shape node -> the time spent validating with the shape and the focus nodes it was given"""
+
+    def __init__(self):
+        self.shapes: Optional[Graph] = None
+        self.engine: Optional[str] = None
+        self.total_seconds = 0.0
+        self.timings: Dict[Node, ShapeTiming] = {}
+
+    def record(self, shape: Node, seconds: float, focus_nodes: int, calls: int = 1):
+        timing = self.timings.get(shape)
+        if timing is None:
+            timing = self.timings[shape] = ShapeTiming()
+        timing.seconds += seconds
+        timing.focus_nodes += focus_nodes
+        timing.calls += calls
+
+    def name(self, shape: Node) -> str:
+        """A shape's IRI or, for a blank node shape, its sh:name, the shape it is a property of and its path, or the
+        shape it is an sh:or alternative of and its description"""
+        if not isinstance(shape, BNode):
+            return stringify_node(self.shapes, shape)
+        name = self.shapes.value(shape, SH.name)
+        if name is not None:
+            return str(name)
+        parent = self.shapes.value(predicate=SH.property, object=shape)
+        if parent is not None:
+            path = self.shapes.value(shape, SH.path)
+            return f"{self.name(parent)} / {stringify_node(self.shapes, path)}"
+        # an alternative of an sh:or: find the head of the list it is in
+        head = self.shapes.value(predicate=RDF.first, object=shape)
+        while head is not None:
+            previous = self.shapes.value(predicate=RDF.rest, object=head)
+            if previous is None:
+                break
+            head = previous
+        owner = (
+            self.shapes.value(predicate=SH["or"], object=head)
+            if head is not None
+            else None
+        )
+        description = stringify_node(self.shapes, shape)
+        if owner is None:
+            return description
+        return f"{self.name(owner)} / sh:or {description}"
+
+    def rows(self) -> List[dict]:
+        """The shapes' timings, slowest first"""
+        rows = []
+        for shape, timing in self.timings.items():
+            path = self.shapes.value(shape, SH.path)
+            rows.append(
+                {
+                    "shape": self.name(shape),
+                    "kind": "PropertyShape" if path is not None else "NodeShape",
+                    "path": stringify_node(self.shapes, path)
+                    if path is not None
+                    else None,
+                    "seconds": timing.seconds,
+                    "focusNodes": timing.focus_nodes,
+                    "calls": timing.calls,
+                }
+            )
+        rows.sort(key=lambda row: row["seconds"], reverse=True)
+        return rows
+
+    def table(self, limit: Optional[int] = None) -> str:
+        """The timings as a text table, slowest first"""
+        rows = self.rows()[:limit]
+        header = ("Milliseconds", "%", "Focus nodes", "Calls", "Kind", "Shape")
+        lines = [
+            (
+                f"{1000 * row['seconds']:.1f}",
+                f"{100 * row['seconds'] / self.total_seconds:.1f}"
+                if self.total_seconds
+                else "",
+                str(row["focusNodes"]),
+                str(row["calls"]),
+                row["kind"],
+                row["shape"],
+            )
+            for row in rows
+        ]
+        widths = [max(len(x) for x in column) for column in zip(header, *lines)]
+        formatted = [
+            "  ".join(
+                x.ljust(w) if i >= 4 else x.rjust(w)
+                for i, (x, w) in enumerate(zip(line, widths))
+            ).rstrip()
+            for line in [header] + lines
+        ]
+        formatted.insert(1, "  ".join("-" * w for w in widths))
+        formatted.append(
+            f"Validated with {self.engine} in {self.total_seconds:.3f} seconds"
+        )
+        return "\n".join(formatted)
+
+    def to_dict(self) -> dict:
+        return {
+            "engine": self.engine,
+            "seconds": self.total_seconds,
+            "shapes": self.rows(),
+        }
+
+
+_recording = threading.local()
+_patch_lock = threading.Lock()
+# the recording blocks entered in any thread and not yet exited, and Shape's own methods while they are patched
+_recordings = 0
+_originals = None
+
+
+def _timed_validate(validate):
+    """Shape.validate, recording its timings. Its parameters differ between pyshacl versions, 0.18's having no
+    executor, so the focus nodes are found by the name of their parameter rather than by position
+    """
+    # the position of focus among the arguments after self
+    parameters = list(inspect.signature(validate).parameters)
+    focus_index = parameters.index("focus") - 1 if "focus" in parameters else None
+
+    def timed_validate(self, *args, **kwargs):
+        timings = getattr(_recording, "timings", None)
+        if timings is None:
+            return validate(self, *args, **kwargs)
+        start = perf_counter()
+        try:
+            return validate(self, *args, **kwargs)
+        finally:
+            if focus_index is not None and len(args) > focus_index:
+                focus = args[focus_index]
+            else:
+                focus = kwargs.get("focus")
+            if focus is None:
+                focus_nodes = 0
+            elif isinstance(focus, (list, tuple, set)):
+                focus_nodes = len(focus)
+            else:
+                focus_nodes = 1
+            timings.record(self.node, perf_counter() - start, focus_nodes)
+
+    return timed_validate
+
+
+def _counted_focus_nodes(focus_nodes):
+    def counted_focus_nodes(self, *args, **kwargs):
+        found = focus_nodes(self, *args, **kwargs)
+        timings = getattr(_recording, "timings", None)
+        if timings is not None:
+            timings.record(self.node, 0.0, len(found), calls=0)
+        return found
+
+    return counted_focus_nodes
+
+
+class recording:
+    """Records the timings of pyshacl's shapes in this thread while in the block"""
+
+    def __init__(self, timings: ShapeTimings):
+        self.timings = timings
+
+    def __enter__(self):
+        global _recordings, _originals
+        with _patch_lock:
+            if _recordings == 0:
+                _originals = (Shape.validate, Shape.focus_nodes)
+                Shape.validate = _timed_validate(Shape.validate)
+                Shape.focus_nodes = _counted_focus_nodes(Shape.focus_nodes)
+            _recordings += 1
+        self._previous = getattr(_recording, "timings", None)
+        _recording.timings = self.timings
+        return self.timings
+
+    def __exit__(self, *exc):
+        global _recordings, _originals
+        _recording.timings = self._previous
+        with _patch_lock:
+            _recordings -= 1
+            if _recordings == 0:
+                Shape.validate, Shape.focus_nodes = _originals
+                _originals = None
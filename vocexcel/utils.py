@@ -1,18 +1,25 @@
-import logging
+import bz2
+import datetime
+import gzip
+import lzma
 import re
+from functools import partial
 from pathlib import Path
 from tempfile import SpooledTemporaryFile
-from typing import Dict, Tuple, Union
+from typing import IO, Any, BinaryIO, Dict, Iterable, Iterator, Optional, Tuple, Union
 
-import pyshacl
-from colorama import Fore, Style
 from openpyxl import load_workbook as _load_workbook
+from openpyxl.utils.cell import get_column_letter, range_boundaries
+from openpyxl.utils.datetime import from_excel
 from openpyxl.workbook.workbook import Workbook
-from pyshacl.pytypes import GraphLike
+from openpyxl.worksheet.worksheet import Worksheet
 from rdflib import BNode, Graph, Literal, Namespace, URIRef
 from rdflib.namespace import DCAT, DCTERMS, PROV, RDF, RDFS, SDO, SKOS, XSD
 
-from vocexcel import profiles
+from vocexcel.hierarchy import HierarchyIndex
+from vocexcel.prefixes import PrefixExpander
+from vocexcel.readers import XlsxWorkbook
+from vocexcel.terms import TERMS
 
 EXCEL_FILE_ENDINGS = ["xlsx"]
 RDF_FILE_ENDINGS = {
@@ -24,6 +31,13 @@ RDF_FILE_ENDINGS = {
     ".nt": "nt",
     ".n3": "n3",
 }
+# a compression suffix after an RDF file's own, as in vocab.ttl.gz, compresses it as it is written and decompresses it
+# as it is read
+COMPRESSION_FILE_ENDINGS = {
+    ".gz": partial(gzip.open, compresslevel=6),
+    ".bz2": bz2.open,
+    ".xz": lzma.open,
+}
 KNOWN_FILE_ENDINGS = [str(x) for x in RDF_FILE_ENDINGS.keys()] + EXCEL_FILE_ENDINGS
 KNOWN_TEMPLATE_VERSIONS = [
     "0.2.1",
@@ -40,7 +54,6 @@ KNOWN_TEMPLATE_VERSIONS = [
     "0.7.0",
 ]
 LATEST_TEMPLATE = KNOWN_TEMPLATE_VERSIONS[-1]
-
 STATUSES = {
     "Accepted": "https://linked.data.gov.au/def/reg-statuses/accepted",
     "Deprecated": "https://linked.data.gov.au/def/reg-statuses/deprecated",
@@ -68,16 +81,71 @@ VOCDERMODS = {
 }
 
 
+# Workbook reader backends:
+#   openpyxl - openpyxl's Workbook, in full or in read-only mode. Supports every template version
+#   xlsx - VocExcel's own streaming reader of the .xlsx sheet parts, see readers.py. Templates 0.5.0+ only
+READER_BACKENDS = ["openpyxl", "xlsx"]
+DEFAULT_READER_BACKEND = "openpyxl"
+
+
 class ConversionError(Exception):
     pass
 
 
-def load_workbook(file_path: Path) -> Workbook:
+def load_workbook(
+    file_path: Path, read_only: bool = False, backend: str = DEFAULT_READER_BACKEND
+) -> Union[Workbook, XlsxWorkbook]:
+    """Loads an Excel workbook for conversion to RDF
+
+    If read_only is set, the workbook is opened in openpyxl's read-only mode: sheet rows are parsed as they are
+    iterated, rather than all cells being loaded up front, so memory use does not grow with the size of the
+    workbook. Read-only workbooks hold their file open and must be closed with wb.close() after use.
+
+    The xlsx backend only ever reads the sheets asked for, plus the shared strings, and always streams them.
+    """
+    _check_excel_file(file_path)
+    if backend == "openpyxl":
+        return _load_workbook(filename=file_path, data_only=True, read_only=read_only)
+    elif backend == "xlsx":
+        return XlsxWorkbook(file_path)
+    raise ValueError(
+        f"The workbook reader backend must be one of '{', '.join(READER_BACKENDS)}' but you selected {backend}"
+    )
+
+
+def compression_file_ending(file_path: Union[Path, str]) -> Optional[str]:
+    """The compression suffix of file_path, if it has one"""
+    suffix = Path(file_path).suffix.lower()
+    return suffix if suffix in COMPRESSION_FILE_ENDINGS else None
+
+
+def rdf_file_format(file_path: Union[Path, str]) -> Optional[str]:
+    """The RDF format of a file, by its ending, compressed or not, or None if it isn't an RDF file"""
+    name = Path(file_path).name.lower()
+    ending = compression_file_ending(file_path)
+    if ending is not None:
+        name = name[: -len(ending)]
+    for rdf_ending, rdf_format in RDF_FILE_ENDINGS.items():
+        if name.endswith(rdf_ending):
+            return rdf_format
+    return None
+
+
+def open_file(file_path: Union[Path, str], mode: str = "rb") -> IO:
+    """Opens a file, compressing what is written to it or decompressing what is read from it if its name ends with a
+    compression suffix. Text is UTF-8 encoded"""
+    encoding = "utf-8" if "t" in mode else None
+    ending = compression_file_ending(file_path)
+    if ending is None:
+        return open(file_path, mode, encoding=encoding)
+    return COMPRESSION_FILE_ENDINGS[ending](file_path, mode, encoding=encoding)
+
+
+def _check_excel_file(file_path: Union[Path, BinaryIO]):
     if not isinstance(
         file_path, SpooledTemporaryFile
     ) and not file_path.name.lower().endswith(tuple(EXCEL_FILE_ENDINGS)):
         raise ValueError("Files for conversion to RDF must be Excel files ending .xlsx")
-    return _load_workbook(filename=file_path, data_only=True)
 
 
 def load_template(file_path: Path) -> Workbook:
@@ -115,11 +183,81 @@ def get_template_version(wb: Workbook) -> str:
             f"The version of your template, {version}, is not supported"
         )
     # if we get here, the template version is either unknown or can't be located
-    raise Exception(
+    raise ConversionError(
         "The version of the Excel template you are using cannot be determined"
     )
 
 
+def sniff_template_version(file_path: Union[Path, BinaryIO]) -> str:
+    """Returns the template version of an Excel workbook without loading the workbook.
+
+    Only the workbook manifest and the sheet holding the version - Introduction or, for 0.2.1 & 0.3.0 templates,
+    program info - are read from the .xlsx zip, and that sheet only as far as the version cell, so unsupported
+    templates can be rejected before paying for a full load.
+    """
+    _check_excel_file(file_path)
+    try:
+        wb = XlsxWorkbook(file_path)
+    except (ValueError, KeyError) as e:
+        raise ConversionError(f"The file you supplied is not an Excel workbook: {e}")
+    try:
+        return get_template_version(wb)
+    finally:
+        wb.close()
+
+
+def read_sheet_values(sheet: Worksheet, cell_range: str) -> Dict[str, Any]:
+    """Reads the values of a block of cells, e.g. "B3:B16", in a single pass over the sheet's rows and returns them
+    keyed by cell coordinate. Unlike repeated sheet["B3"] lookups, this does not re-scan read-only worksheets
+    """
+    min_col, min_row, max_col, max_row = range_boundaries(cell_range)
+    values = {
+        f"{get_column_letter(col)}{row}": None
+        for row in range(min_row, max_row + 1)
+        for col in range(min_col, max_col + 1)
+    }
+    for row, row_values in enumerate(
+        sheet.iter_rows(
+            min_row=min_row,
+            max_row=max_row,
+            min_col=min_col,
+            max_col=max_col,
+            values_only=True,
+        ),
+        start=min_row,
+    ):
+        for col, value in enumerate(row_values, start=min_col):
+            values[f"{get_column_letter(col)}{row}"] = value
+    return values
+
+
+def iter_sheet_rows(sheet: Worksheet, min_row: int, max_col: int) -> Iterator[tuple]:
+    """Yields the values of a sheet's rows, starting at min_row, as plain tuples of max_col values.
+
+    Iteration stops at the first row with no value in its first column, the IRI or prefix column of the
+    0.5.0+ templates' tabular sheets"""
+    for row in sheet.iter_rows(min_row=min_row, max_col=max_col, values_only=True):
+        if row[0] is None:
+            return
+        yield row
+
+
+def to_date(value) -> datetime.date:
+    """Returns the date of a date cell's value. Readers that don't load cell styles, such as the xlsx backend,
+    return dates as Excel serial date numbers. Text cells holding ISO 8601 dates are also accepted
+    """
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    elif isinstance(value, datetime.date):
+        return value
+    elif isinstance(value, (int, float)):
+        return from_excel(value).date()
+    try:
+        return datetime.date.fromisoformat(str(value).strip()[:10])
+    except ValueError:
+        raise ConversionError(f"The value {value} is not a date")
+
+
 def split_and_tidy_to_strings(s: str):
     # note this may not work in list of things that contain commas. Need to consider revising
     # to allow comma-seperated values where it'll split in commas but not in things enclosed in quotes.
@@ -172,17 +310,21 @@ def all_strings_in_list_are_iris(l_: []) -> Tuple[bool, str]:
         return True, ""
 
 
-def expand_namespaces(s: str, prefixes: dict[str, Namespace]) -> Union[URIRef, str]:
-    for pre in prefixes.keys():
-        if s.startswith(pre):
-            return URIRef(s.replace(pre, prefixes[pre]))
+def expand_namespaces(
+    s: str, prefixes: Union[PrefixExpander, dict[str, Namespace]]
+) -> Union[URIRef, str]:
+    if not isinstance(prefixes, PrefixExpander):
+        prefixes = PrefixExpander(prefixes)
+    iri = prefixes.expand(s)
+    if iri is not None:
+        return TERMS.uriref(iri)
     if s.startswith("http"):
-        return URIRef(s)
+        return TERMS.uriref(s)
     else:
         return s
 
 
-def bind_namespaces(g: Graph, prefixes: dict[str, Namespace]):
+def bind_namespaces(g: Graph, prefixes: Union[PrefixExpander, dict[str, Namespace]]):
     for pre, ns in prefixes.items():
         g.bind(pre.rstrip(":"), ns)
 
@@ -201,8 +343,14 @@ def id_from_iri(iri):
     return Literal(id, datatype=XSD.token)
 
 
-def make_agent(agent_value, agent_role, prefixes, iri_of_subject) -> Graph:
-    ag = Graph()
+def add_triples(g, triples: Iterable[tuple]):
+    """Adds triples to g, a Graph or sinks.TripleSink, in a single batched addN() call"""
+    g.addN((s, p, o, g) for s, p, o in triples)
+
+
+def make_agent(agent_value, agent_role, prefixes, iri_of_subject, g=None) -> Graph:
+    """Makes the triples for an Agent and its role. They are added to g, a Graph or sinks.TripleSink, if given"""
+    ag = Graph() if g is None else g
     iri = expand_namespaces(agent_value, prefixes)
     creator_iri_conv = string_is_http_iri(str(iri))
     if not creator_iri_conv[0]:
@@ -214,8 +362,8 @@ def make_agent(agent_value, agent_role, prefixes, iri_of_subject) -> Graph:
         agent_type = SDO.Organization
         url_email = SDO.url
     ag.add((iri, RDF.type, agent_type))
-    ag.add((iri, url_email, Literal("", datatype=XSD.anyURI)))
-    ag.add((iri, SDO.name, Literal(string_from_iri(agent_value))))
+    ag.add((iri, url_email, TERMS.literal("", datatype=XSD.anyURI)))
+    ag.add((iri, SDO.name, TERMS.literal(string_from_iri(agent_value))))
     if agent_role in [
         DCTERMS.creator,
         DCTERMS.publisher,
@@ -234,7 +382,7 @@ def make_agent(agent_value, agent_role, prefixes, iri_of_subject) -> Graph:
     return ag
 
 
-def make_iri(s: str, prefixes: dict[str, Namespace]):
+def make_iri(s: str, prefixes: Union[PrefixExpander, dict[str, Namespace]]):
     iri = expand_namespaces(s, prefixes)
     iri_conv = string_is_http_iri(str(iri))
     if not iri_conv[0]:
@@ -242,131 +390,23 @@ def make_iri(s: str, prefixes: dict[str, Namespace]):
     return iri
 
 
-def add_top_concepts(g: Graph) -> Graph:
-    """For every Concept that no other Concept indicat as being narrower than it, indicate that it is a top concept"""
+def add_top_concepts(g: Graph, hierarchy: Optional[HierarchyIndex] = None) -> Graph:
+    """For every Concept that no other Concept indicates as being narrower than it, indicate that it is a top concept.
+
+    The Concepts and their hierarchy are read from hierarchy, if given, or else indexed from g in a single pass
+    """
     cs = None
     for x in g.subjects(RDF.type, SKOS.ConceptScheme):
         cs = x
     if cs is None:
         raise ValueError("The input graph declares no SKOS ConceptScheme")
 
-    for c in g.subjects(RDF.type, SKOS.Concept):
-        if not g.value(None, SKOS.narrower, c):
-            g.add((c, SKOS.topConceptOf, cs))
-            g.add((cs, SKOS.hasTopConcept, c))
+    if hierarchy is None:
+        hierarchy = HierarchyIndex()
+        for c in g.subjects(RDF.type, SKOS.Concept):
+            hierarchy.add_concept(c)
+        for c, n in g.subject_objects(SKOS.narrower):
+            hierarchy.add_narrower(c, n)
+    add_triples(g, hierarchy.top_concept_triples(cs))
 
     return g
-
-
-def validate_with_profile(
-    data_graph: Union[GraphLike, str, bytes],
-    profile="vocpub-46",
-    error_level=1,
-    message_level=1,
-    log_file=None,
-):
-    if profile not in profiles.PROFILES.keys():
-        raise ValueError(
-            f"The profile chosen for conversion must be one of '{', '.join(profiles.PROFILES.keys())}' "
-            f"but you selected {profile}"
-        )
-    allow_warnings = True if error_level > 1 else False
-
-    # validate the RDF file
-    conforms, results_graph, results_text = pyshacl.validate(
-        data_graph,
-        shacl_graph=str(Path(__file__).parent / f"{profile}.ttl"),
-        allow_warnings=allow_warnings,
-    )
-
-    logging_level = logging.INFO
-
-    if message_level == 3:
-        logging_level = logging.ERROR
-    elif message_level == 2:
-        logging_level = logging.WARNING
-
-    if log_file:
-        logging.basicConfig(
-            level=logging_level, format="%(message)s", filename=log_file, force=True
-        )
-    else:
-        logging.basicConfig(level=logging_level, format="%(message)s")
-
-    info_list = []
-    warning_list = []
-    violation_list = []
-
-    from rdflib.namespace import RDF, SH
-
-    for report in results_graph.subjects(RDF.type, SH.ValidationReport):
-        for result in results_graph.objects(report, SH.result):
-            result_dict = {}
-            for p, o in results_graph.predicate_objects(result):
-                if p == SH.focusNode:
-                    result_dict["focusNode"] = str(o)
-                elif p == SH.resultMessage:
-                    result_dict["resultMessage"] = str(o)
-                elif p == SH.resultSeverity:
-                    result_dict["resultSeverity"] = str(o)
-                elif p == SH.sourceConstraintComponent:
-                    result_dict["sourceConstraintComponent"] = str(o)
-                elif p == SH.sourceShape:
-                    result_dict["sourceShape"] = str(o)
-                elif p == SH.value:
-                    result_dict["value"] = str(o)
-            result_message_formatted = log_msg(result_dict, log_file)
-            result_message = log_msg(result_dict, "placeholder")
-            if result_dict["resultSeverity"] == str(SH.Info):
-                logging.info(result_message_formatted)
-                info_list.append(result_message)
-            elif result_dict["resultSeverity"] == str(SH.Warning):
-                logging.warning(result_message_formatted)
-                warning_list.append(result_message)
-            elif result_dict["resultSeverity"] == str(SH.Violation):
-                logging.error(result_message_formatted)
-                violation_list.append(result_message)
-
-    if error_level == 3:
-        error_messages = violation_list
-    elif error_level == 2:
-        error_messages = warning_list + violation_list
-    else:  # error_level == 1
-        error_messages = info_list + warning_list + violation_list
-
-    if len(error_messages) > 0:
-        raise ConversionError(
-            f"The file you supplied is not valid according to the {profile} profile."
-        )
-
-
-def log_msg(result: Dict, log_file: str) -> str:
-    from rdflib.namespace import SH
-
-    formatted_msg = ""
-    message = f"""Validation Result in {result['sourceConstraintComponent'].split(str(SH))[1]} ({result['sourceConstraintComponent']}):
-\tSeverity: sh:{result['resultSeverity'].split(str(SH))[1]}
-\tSource Shape: <{result['sourceShape']}>
-\tFocus Node: <{result['focusNode']}>
-\tValue Node: <{result.get('value', '')}>
-\tMessage: {result['resultMessage']}
-"""
-    if result["resultSeverity"] == str(SH.Info):
-        formatted_msg = (
-            f"INFO: {message}"
-            if log_file
-            else Fore.BLUE + "INFO: " + Style.RESET_ALL + message
-        )
-    elif result["resultSeverity"] == str(SH.Warning):
-        formatted_msg = (
-            f"WARNING: {message}"
-            if log_file
-            else Fore.YELLOW + "WARNING: " + Style.RESET_ALL + message
-        )
-    elif result["resultSeverity"] == str(SH.Violation):
-        formatted_msg = (
-            f"VIOLATION: {message}"
-            if log_file
-            else Fore.RED + "VIOLATION: " + Style.RESET_ALL + message
-        )
-    return formatted_msg
@@ -0,0 +1,205 @@
+"""Validation of vocabularies' RDF against the profiles' shapes, with pyshacl or natively, and the logging of its
+results
+
+If validate_with_profile() is given an IncrementalValidation, only what changed since the graph it last validated is
+validated again. Otherwise, graphs are validated in jobs worker processes if jobs is more than 1, or else by engine:
+"native" validates natively if the profile's shapes allow and with pyshacl if not, "pyshacl" always with pyshacl and
+"parity" with both, logging any differences and reporting pyshacl's results.
+
+Reports are cached in a ValidationCache, by default VALIDATION_CACHE, and a graph that has been validated before isn't
+validated again unless engine is "parity" or an IncrementalValidation is given, which has to see every graph to keep
+track of what changed. Given a ShapeTimings, the graph is always validated, in this process and by engine, pyshacl for
+"parity", and the time spent validating with each of the profile's shapes is recorded in it.
+"""
+import logging
+import os
+from time import perf_counter
+from typing import Dict, Optional, Union
+
+import pyshacl
+from pyshacl.pytypes import GraphLike
+from rdflib import Graph, URIRef
+
+from vocexcel import profiles
+from vocexcel.cache import VALIDATION_CACHE, ValidationCache
+from vocexcel.incremental import IncrementalValidation
+from vocexcel.native import parity, validate_native
+from vocexcel.parallel import validate_parallel
+from vocexcel.report import SEVERITIES, Severity, ValidationReport, ValidationResult
+from vocexcel.shapes import SHAPES
+from vocexcel.timing import ShapeTimings, recording
+from vocexcel.utils import ConversionError
+
+LOGGING_LEVELS = {
+    Severity.INFO: logging.INFO,
+    Severity.WARNING: logging.WARNING,
+    Severity.VIOLATION: logging.ERROR,
+}
+# the handler of the log file validation messages were last logged to
+_log_handler: Optional[logging.FileHandler] = None
+
+
+class ValidationFailed(ConversionError):
+    """A vocabulary that is not valid according to a profile, with the report of its validation"""
+
+    def __init__(self, message: str, report: ValidationReport):
+        super().__init__(message)
+        self.report = report
+
+
+def validate_with_profile(
+    data_graph: Union[GraphLike, str, bytes],
+    profile="vocpub-46",
+    error_level=1,
+    message_level=1,
+    log_file=None,
+    incremental: Optional[IncrementalValidation] = None,
+    jobs: int = 1,
+    engine: str = "native",
+    cache: Optional[ValidationCache] = VALIDATION_CACHE,
+    timings: Optional[ShapeTimings] = None,
+) -> ValidationReport:
+    """Validates data_graph against the profile's shapes, logging and returning the results' ValidationReport
+
+    error_level: the severity, 1 to 3, at or above which results raise a ValidationFailed error holding the report
+    incremental: an IncrementalValidation, to only validate what changed since the graph it last validated
+    jobs: the number of worker processes to validate in
+    engine: "native", "pyshacl" or "parity", which validates with both and logs any differences
+    cache: the ValidationCache to look reports up in and keep them in, or None to always validate
+    timings: a ShapeTimings to record the time spent validating with each shape in. The graph is then always validated
+    """
+    if profile not in profiles.PROFILES.keys():
+        raise ValueError(
+            f"The profile chosen for conversion must be one of '{', '.join(profiles.PROFILES.keys())}' "
+            f"but you selected {profile}"
+        )
+    if engine not in ("native", "pyshacl", "parity"):
+        raise ValueError(
+            f"The validation engine must be one of 'native', 'pyshacl', 'parity' but you selected {engine}"
+        )
+    allow_warnings = True if error_level > 1 else False
+
+    key = None
+    report = None
+    if timings is not None:
+        report = _timed_validation(data_graph, profile, allow_warnings, engine, timings)
+    elif cache is not None and engine != "parity" and incremental is None:
+        key = cache.key(data_graph, profile, error_level, engine)
+        if key is not None:
+            report = cache.get(key)
+
+    if report is None:
+        report = _validate(
+            data_graph, profile, allow_warnings, incremental, jobs, engine
+        )
+        if key is not None:
+            cache.put(key, report)
+
+    _configure_logging(message_level, log_file)
+    coloured = not log_file
+    for result in report:
+        level = LOGGING_LEVELS[result.severity]
+        # results are only formatted if they are logged
+        if logging.root.isEnabledFor(level):
+            logging.log(level, result.text(coloured))
+
+    # as before error levels were severities, any level but 2 or 3 fails on every result
+    failing = Severity(error_level) if error_level in (2, 3) else Severity.INFO
+    if report.count(failing) > 0:
+        raise ValidationFailed(
+            f"The file you supplied is not valid according to the {profile} profile.",
+            report,
+        )
+
+    return report
+
+
+def _validate(
+    data_graph, profile, allow_warnings, incremental, jobs, engine
+) -> ValidationReport:
+    # validate the RDF file
+    if incremental is not None:
+        conforms, results_graph, results_text = incremental.validate(
+            data_graph, profile, allow_warnings
+        )
+    elif jobs > 1 and isinstance(data_graph, Graph):
+        conforms, results_graph, results_text = validate_parallel(
+            data_graph, profile, allow_warnings, jobs
+        )
+    elif engine == "native":
+        conforms, results_graph, results_text = validate_native(
+            data_graph, profile, allow_warnings
+        )
+    else:
+        if engine == "parity" and isinstance(data_graph, Graph):
+            for difference in parity(data_graph, profile, allow_warnings):
+                logging.warning(f"Native and pyshacl validation differ: {difference}")
+        conforms, results_graph, results_text = pyshacl.validate(
+            data_graph,
+            shacl_graph=SHAPES.get(profile),
+            allow_warnings=allow_warnings,
+        )
+
+    return ValidationReport.from_graph(results_graph, conforms, profile)
+
+
+def _timed_validation(
+    data_graph, profile, allow_warnings, engine, timings: ShapeTimings
+) -> ValidationReport:
+    timings.shapes = SHAPES.get(profile)
+    start = perf_counter()
+    if engine == "native":
+        conforms, results_graph, results_text = validate_native(
+            data_graph, profile, allow_warnings, timings
+        )
+    else:
+        timings.engine = "pyshacl"
+        with recording(timings):
+            conforms, results_graph, results_text = pyshacl.validate(
+                data_graph,
+                shacl_graph=timings.shapes,
+                allow_warnings=allow_warnings,
+            )
+    timings.total_seconds = perf_counter() - start
+    return ValidationReport.from_graph(results_graph, conforms, profile)
+
+
+def _configure_logging(message_level=1, log_file=None):
+    """Configures the root logger for validation messages. A log file's handler is only replaced if the log file or
+    message level has changed"""
+    global _log_handler
+    logging_level = logging.INFO
+
+    if message_level == 3:
+        logging_level = logging.ERROR
+    elif message_level == 2:
+        logging_level = logging.WARNING
+
+    if log_file:
+        if (
+            _log_handler is not None
+            and _log_handler in logging.root.handlers
+            and _log_handler.baseFilename == os.path.abspath(log_file)
+            and logging.root.level == logging_level
+        ):
+            return
+        logging.basicConfig(
+            level=logging_level, format="%(message)s", filename=log_file, force=True
+        )
+        _log_handler = logging.root.handlers[0]
+    else:
+        logging.basicConfig(level=logging_level, format="%(message)s")
+
+
+def log_msg(result: Dict, log_file: str) -> str:
+    severity = SEVERITIES.get(URIRef(result["resultSeverity"]))
+    if severity is None:
+        return ""
+    return ValidationResult(
+        severity,
+        result["focusNode"],
+        result["sourceShape"],
+        result["sourceConstraintComponent"],
+        result["resultMessage"],
+        value=result.get("value"),
+    ).text(coloured=not log_file)
@@ -5,6 +5,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 
+from vocexcel import profiles
+from vocexcel.shapes import SHAPES
 from vocexcel.web import router
 from vocexcel.web.settings import Settings
 
@@ -39,6 +41,14 @@ def register_middlewares(app: FastAPI) -> None:
     )
 
 
+def load_profiles() -> None:
+    """Registers the profiles in VOCEXCEL_PROFILES_DIR and loads the shapes of all profiles, so that requests don't
+    wait for them. Shapes files changed later are reloaded when next used."""
+    if Settings.VOCEXCEL_PROFILES_DIR:
+        profiles.PROFILES.register_directory(Path(Settings.VOCEXCEL_PROFILES_DIR))
+    SHAPES.preload()
+
+
 def create_app() -> FastAPI:
     app = FastAPI(
         title="VocExcel",
@@ -55,6 +65,7 @@ def create_app() -> FastAPI:
         ),
     )
 
+    load_profiles()
     register_routers(app)
     register_middlewares(app)
 
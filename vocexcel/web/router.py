@@ -1,11 +1,16 @@
 from textwrap import dedent
+from typing import Literal
 
 from fastapi import APIRouter, Body, HTTPException, UploadFile, status
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from jinja2 import Template
 from rdflib import Graph
 
 from vocexcel.convert import ConversionError, excel_to_rdf
+from vocexcel.jsonld import iter_vocab_jsonld
+from vocexcel.longturtle import write_longturtle
+from vocexcel.timing import ShapeTimings
+from vocexcel.validation import ValidationFailed, validate_with_profile
 from vocexcel.web.response import TurtleResponse
 from vocexcel.web.settings import Settings
 
@@ -19,10 +24,21 @@ def version_route():
 
 
 @router.post("/convert", response_class=TurtleResponse)
-async def convert_route(upload_file: UploadFile):
-    """Convert a VocExcel file to RDF Turtle."""
+async def convert_route(
+    upload_file: UploadFile,
+    output_format: Literal["longturtle", "vocab-json-ld"] = "longturtle",
+):
+    """Convert a VocExcel file to RDF Turtle, or with output_format vocab-json-ld, to JSON-LD with the Concepts
+    nested under the ConceptScheme, streamed concept by concept.
+    """
     try:
+        # excel_to_rdf() rejects files that aren't supported templates before loading the whole workbook
         file = upload_file.file
+        if output_format == "vocab-json-ld":
+            graph = excel_to_rdf(file, output_format="graph")
+            return StreamingResponse(
+                iter_vocab_jsonld(graph), media_type="application/ld+json"
+            )
         result = excel_to_rdf(file)
         return TurtleResponse(result)
     except ConversionError as err:
@@ -41,12 +57,37 @@ async def convert_route(upload_file: UploadFile):
         ) from err
 
 
+@router.post("/validate")
+async def validate_route(
+    upload_file: UploadFile, profile: str = "vocpub-46", timings: bool = False
+):
+    """Validate a VocExcel file against a profile, returning the validation report as JSON. With timings, the time
+    spent validating with each of the profile's shapes is also returned, slowest first.
+    """
+    shape_timings = ShapeTimings() if timings else None
+    try:
+        graph = excel_to_rdf(upload_file.file, output_format="graph")
+        report = validate_with_profile(
+            graph, profile=profile, message_level=3, timings=shape_timings
+        )
+    except ValidationFailed as err:
+        report = err.report
+    except (ConversionError, ValueError) as err:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(err)
+        ) from err
+    result = report.to_dict()
+    if shape_timings is not None:
+        result["timings"] = shape_timings.to_dict()
+    return result
+
+
 @router.post("/format", response_class=TurtleResponse)
 def format_route(payload: str = Body(media_type="application/n-triples")):
     """Format N-Triples as Turtle in the `longturtle` style."""
     graph = Graph()
     graph.parse(data=payload, format="ntriples")
-    return graph.serialize(format="longturtle")
+    return write_longturtle(graph)
 
 
 @router.get("/construct-query", response_class=PlainTextResponse)
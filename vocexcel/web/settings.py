@@ -7,3 +7,5 @@ class Settings(BaseSettings):
     VOCEXCEL_WEB_STATIC_DIR = environ.get(
         "VOCEXCEL_WEB_STATIC_DIR", "vocexcel/web/static"
     )
+    # a directory of the shapes files of profiles to offer besides those shipped with VocExcel
+    VOCEXCEL_PROFILES_DIR = environ.get("VOCEXCEL_PROFILES_DIR")